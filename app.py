@@ -2,369 +2,502 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import base64
+import hashlib
+import io
+import json
+import os
+
+from coilcalc import profiling
+from coilcalc.core import DesignError, optimize_pancake_coil
+from coilcalc.export import FORMATS as EXPORT_FORMATS, download_type
+from coilcalc.pareto import pareto_front
+from coilcalc.schematic import generate_cross_section_svg
+from coilcalc.turns import turn_table
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="Dynamic Coil Designer", page_icon="⚡", layout="wide")
 
-# --- SVG GENERATION FUNCTION ---
-def generate_cross_section_svg(res, a_mm, b_max_mm, rad_dim_mode, plate_margin_mm, cooling_plates_list, num_pancakes):
-    """Generates a proportional SVG cross-section drawing with dynamic Light/Dark mode and adaptive labels."""
-    
-    max_dim_mm = max(b_max_mm * 1.1, res['ax_total_mm'] * 1.1)
-    target_svg_size = 600 
-    scale = target_svg_size / max_dim_mm 
-    
-    pad_left = 80
-    pad_right = 150
-    pad_top = 50
-    pad_bottom = 50
-
-    svg_width = (b_max_mm * scale) + pad_left + pad_right
-    svg_height = (res['ax_total_mm'] * scale) + pad_top + pad_bottom
-    
-    origin_x = pad_left
-    origin_y = svg_height - pad_bottom
-
-    svg_elements = []
-
-    def draw_rect(x_mm, y_start_mm, w_mm, h_mm, css_class, label=None, opacity=1.0):
-        x_px = origin_x + (x_mm * scale)
-        y_px = origin_y - ((y_start_mm + h_mm) * scale) 
-        w_px = w_mm * scale
-        h_px = h_mm * scale
-        rect = f'<rect x="{x_px:.1f}" y="{y_px:.1f}" width="{w_px:.1f}" height="{h_px:.1f}" class="{css_class} box-border" fill-opacity="{opacity}" />'
-        svg_elements.append(rect)
-        if label:
-             svg_elements.append(f'<text x="{x_px + w_px/2:.1f}" y="{y_px + h_px/2 + 5:.1f}" class="label-text" text-anchor="middle">{label}</text>')
-
-    def draw_dim_line(x1_mm, y1_mm, x2_mm, y2_mm, label_text, offset_mm=0, is_vertical=False):
-        x1_px = origin_x + (x1_mm * scale)
-        y1_px = origin_y - (y1_mm * scale)
-        x2_px = origin_x + (x2_mm * scale)
-        y2_px = origin_y - (y2_mm * scale)
-        off_px = offset_mm * scale
-        
-        if is_vertical:
-            svg_elements.append(f'<line x1="{x1_px+off_px}" y1="{y1_px}" x2="{x2_px+off_px}" y2="{y2_px}" class="dim-line" marker-start="url(#arrow)" marker-end="url(#arrow)"/>')
-            svg_elements.append(f'<line x1="{x1_px}" y1="{y1_px}" x2="{x1_px+off_px+5}" y2="{y1_px}" class="dim-line-thin"/>')
-            svg_elements.append(f'<line x1="{x2_px}" y1="{y2_px}" x2="{x2_px+off_px+5}" y2="{y2_px}" class="dim-line-thin"/>')
-            svg_elements.append(f'<text x="{x1_px+off_px+10}" y="{(y1_px+y2_px)/2}" class="dim-text" dominant-baseline="middle">{label_text}</text>')
-        else:
-            svg_elements.append(f'<line x1="{x1_px}" y1="{y1_px+off_px}" x2="{x2_px}" y2="{y2_px+off_px}" class="dim-line" marker-start="url(#arrow)" marker-end="url(#arrow)"/>')
-            svg_elements.append(f'<line x1="{x1_px}" y1="{y1_px}" x2="{x1_px}" y2="{y1_px+off_px+5}" class="dim-line-thin"/>')
-            svg_elements.append(f'<line x1="{x2_px}" y1="{y2_px}" x2="{x2_px}" y2="{y2_px+off_px+5}" class="dim-line-thin"/>')
-            svg_elements.append(f'<text x="{(x1_px+x2_px)/2}" y="{y1_px+off_px+15}" class="dim-text" text-anchor="middle">{label_text}</text>')
-
-    # Background / Mold Limits
-    svg_elements.append(f'<line x1="{origin_x}" y1="{pad_top}" x2="{origin_x}" y2="{svg_height-pad_bottom}" class="dim-line" stroke-dasharray="5,5"/>')
-    draw_rect(a_mm, 0, b_max_mm-a_mm, res['ax_total_mm'], "epoxy", opacity=0.5) 
-    svg_elements.append(f'<line x1="{origin_x + a_mm*scale}" y1="{pad_top}" x2="{origin_x + a_mm*scale}" y2="{svg_height-pad_bottom}" class="mold-line"/>')
-    svg_elements.append(f'<line x1="{origin_x + b_max_mm*scale}" y1="{pad_top}" x2="{origin_x + b_max_mm*scale}" y2="{svg_height-pad_bottom}" class="mold-line"/>')
-
-    # Draw The Stack
-    current_y_mm = 0.0
-    pancake_height_mm = res['ax_pancakes_mm'] / num_pancakes
-    insul_height_mm = res['ax_insul_mm'] / (num_pancakes * 2)
-
-    plate_idx = 0
-    for i in range(num_pancakes):
-        if plate_idx < len(cooling_plates_list):
-             h_plate = cooling_plates_list[plate_idx]
-             draw_rect(a_mm, current_y_mm, b_max_mm-a_mm, h_plate, "al")
-             current_y_mm += h_plate
-             plate_idx += 1
-        
-        draw_rect(a_mm, current_y_mm, b_max_mm-a_mm, insul_height_mm, "insul")
-        current_y_mm += insul_height_mm
-
-        draw_rect(res['winding_a_mm'], current_y_mm, res['build_mm'], pancake_height_mm, "cu", label="Cu")
-        current_y_mm += pancake_height_mm
-        
-        draw_rect(a_mm, current_y_mm, b_max_mm-a_mm, insul_height_mm, "insul")
-        current_y_mm += insul_height_mm
-        
-    if plate_idx < len(cooling_plates_list):
-         h_plate = cooling_plates_list[plate_idx]
-         draw_rect(a_mm, current_y_mm, b_max_mm-a_mm, h_plate, "al")
-         current_y_mm += h_plate
-
-    # Adaptive Labels
-    if rad_dim_mode == "Diameter":
-        label_in = f"Plate ID: {a_mm*2:.1f}"
-        label_out = f"Plate OD: {b_max_mm*2:.1f}"
-        label_wind = f"Winding OD: {res['winding_b_actual_mm']*2:.1f}"
-    else:
-        label_in = f"Plate Inner Rad: {a_mm:.1f}"
-        label_out = f"Plate Max Rad: {b_max_mm:.1f}"
-        label_wind = f"Winding Outer Rad: {res['winding_b_actual_mm']:.1f}"
-
-    draw_dim_line(0, 0, a_mm, 0, label_in, offset_mm=-20)
-    draw_dim_line(0, 0, res['winding_b_actual_mm'], 0, label_wind, offset_mm=-45)
-    draw_dim_line(0, 0, b_max_mm, 0, label_out, offset_mm=-70)
-    draw_dim_line(b_max_mm, 0, b_max_mm, res['ax_total_mm'], f"Total Axial: {res['ax_total_mm']:.1f} mm", offset_mm=20, is_vertical=True)
-
-    svg_header = f"""<svg width="{svg_width}" height="{svg_height}" xmlns="http://www.w3.org/2000/svg">
-    <style>
-        .cu {{ fill: #B87333; }}
-        .al {{ fill: #A0A0A4; }}
-        .epoxy {{ fill: #E0E0E0; }}
-        .insul {{ fill: #F0E68C; }}
-        .mold-line {{ stroke: #FF0000; stroke-width: 2px; }}
-        .box-border {{ stroke: #000000; stroke-width: 1px; }}
-        .dim-line {{ stroke: #000000; stroke-width: 1px; }}
-        .dim-line-thin {{ stroke: #000000; stroke-width: 0.5px; }}
-        .dim-text {{ font-family: Arial; font-size: 14px; fill: #000000; }}
-        .label-text {{ font-family: Arial; font-size: 12px; fill: #000000; font-weight: bold; }}
-        .title-text {{ font-family: Arial; font-size: 20px; font-weight: bold; fill: #000000; }}
-        .arrow-head {{ fill: #000000; }}
-
-        @media (prefers-color-scheme: dark) {{
-            .cu {{ fill: #C88343; }}
-            .al {{ fill: #606064; }}
-            .epoxy {{ fill: #303030; }}
-            .insul {{ fill: #B3A95B; }}
-            .mold-line {{ stroke: #FF5555; }}
-            .box-border {{ stroke: #E0E0E0; }}
-            .dim-line {{ stroke: #E0E0E0; }}
-            .dim-line-thin {{ stroke: #A0A0A0; }}
-            .dim-text {{ fill: #E0E0E0; }}
-            .label-text {{ fill: #1E1E1E; }}
-            .title-text {{ fill: #FFFFFF; }}
-            .arrow-head {{ fill: #E0E0E0; }}
-        }}
-    </style>
-    <defs>
-        <marker id="arrow" markerWidth="10" markerHeight="10" refX="9" refY="3" orient="auto" markerUnits="strokeWidth">
-            <path d="M0,0 L0,6 L9,3 z" class="arrow-head" />
-        </marker>
-    </defs>
-    <text x="{svg_width/2}" y="30" class="title-text" text-anchor="middle">Dynamic Cross-Section Schematic</text>
-    """
-    svg_footer = "</svg>"
-    
-    return svg_header + "".join(svg_elements) + svg_footer
+# --- HEATMAP RENDERING ---
+HEATMAP_STOPS = np.array([[0, 0, 4], [87, 16, 110], [188, 55, 84], [249, 142, 9], [252, 255, 164]], dtype=float)
+
+def render_heatmap_rgb(field, r_edges_mm, z_edges_mm, width_px=600):
+    """Resamples a cell field (nz, nr) on a non-uniform r-z mesh to a proportional RGB image, z up."""
+    height_px = max(1, int(round(width_px * (z_edges_mm[-1] - z_edges_mm[0]) / (r_edges_mm[-1] - r_edges_mm[0]))))
+    r_px = r_edges_mm[0] + (np.arange(width_px) + 0.5) * (r_edges_mm[-1] - r_edges_mm[0]) / width_px
+    z_px = z_edges_mm[-1] - (np.arange(height_px) + 0.5) * (z_edges_mm[-1] - z_edges_mm[0]) / height_px
+    i = np.clip(np.searchsorted(r_edges_mm, r_px) - 1, 0, field.shape[1] - 1)
+    j = np.clip(np.searchsorted(z_edges_mm, z_px) - 1, 0, field.shape[0] - 1)
+    img = field[j[:, None], i[None, :]]
+    span = np.ptp(field) or 1.0
+    t = (img - field.min()) / span * (len(HEATMAP_STOPS) - 1)
+    k = np.minimum(t.astype(int), len(HEATMAP_STOPS) - 2)
+    frac = (t - k)[..., None]
+    return ((1 - frac) * HEATMAP_STOPS[k] + frac * HEATMAP_STOPS[k + 1]).astype(np.uint8)
+
+
+# ================= PERFORMANCE INSTRUMENTATION =================
+# Off unless switched on in the debug panel (open the app with ?debug=1) or with
+# COILCALC_PROFILE=1; then every rerun's stages are timed and aggregated across sessions.
+debug_mode = st.query_params.get("debug") == "1"
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id[:8] if ctx else ""
+
+profiling.begin_run(_session_id())
+
+def render_debug_panel(container):
+    """Stage timings aggregated over every session's reruns, the trace export and kept profiles."""
+    settings = profiling.settings()
+    with container.expander("🛠️ Performance", expanded=True):
+        col_d1, col_d2, col_d3 = st.columns(3)
+        col_d1.toggle("Record stage timings", value=settings["enabled"], key="prof_enabled",
+                      on_change=lambda: profiling.configure(enabled=st.session_state["prof_enabled"]),
+                      help="Process-wide: times every session's reruns from the next rerun on.")
+        col_d2.toggle("Track allocations", value=settings["allocations"], key="prof_allocations", disabled=not settings["enabled"],
+                      on_change=lambda: profiling.configure(allocations=st.session_state["prof_allocations"]),
+                      help="tracemalloc: slows allocation-heavy stages 2-3x and counts every session's allocations.")
+        col_d3.number_input("Profile reruns slower than (s, 0 = off)", min_value=0.0, value=float(settings["profile_over_s"] or 0.0),
+                            step=0.5, key="prof_over_s", disabled=not settings["enabled"],
+                            on_change=lambda: profiling.configure(profile_over_s=st.session_state["prof_over_s"]),
+                            help="Runs every rerun under cProfile and keeps the profiles of slow ones.")
+
+        rows = profiling.summary()
+        if not rows:
+            st.caption("No reruns recorded yet." if settings["enabled"] else "Recording is off.")
+            return
+        rerun_s = sum(r['total_s'] for r in rows if r['depth'] == 0) or 1.0
+        df_prof = pd.DataFrame({
+            "Stage": ["  " * r['depth'] + r['stage'] for r in rows],
+            "Calls": [r['count'] for r in rows],
+            "Mean (ms)": [r['mean_s'] * 1e3 for r in rows],
+            "p50 (ms)": [r['p50_s'] * 1e3 for r in rows],
+            "p95 (ms)": [r['p95_s'] * 1e3 for r in rows],
+            "Max (ms)": [r['max_s'] * 1e3 for r in rows],
+            "Share of Rerun": [r['total_s'] / rerun_s for r in rows],
+            "Mean Net Alloc (KiB)": [r['alloc_net_bytes'] / 1024 for r in rows],
+            "Max Peak Alloc (KiB)": [r['alloc_peak_bytes'] / 1024 for r in rows],
+        })
+        runs = profiling.recent_runs()
+        st.caption(f"Reruns kept for the trace: {rows[0]['runs']:,}; last rerun {runs[0]['seconds'] * 1e3:.1f} ms.")
+        st.dataframe(df_prof.style.format({"Mean (ms)": "{:.2f}", "p50 (ms)": "{:.2f}", "p95 (ms)": "{:.2f}", "Max (ms)": "{:.2f}",
+                                           "Share of Rerun": "{:.1%}", "Mean Net Alloc (KiB)": "{:,.0f}", "Max Peak Alloc (KiB)": "{:,.0f}"}),
+                     hide_index=True)
+
+        col_e1, col_e2 = st.columns(2)
+        col_e1.download_button("📥 Download Trace (chrome://tracing, Perfetto)", data=json.dumps(profiling.chrome_trace()),
+                               file_name="coilcalc_trace.json", mime="application/json")
+        col_e2.button("Reset Timings", on_click=profiling.reset)
+
+        kept = profiling.profiles()
+        if kept:
+            pick = st.selectbox("Slow Rerun Profile", range(len(kept)),
+                                format_func=lambda i: f"{pd.Timestamp(kept[i]['wall_time'], unit='s'):%H:%M:%S} — {kept[i]['seconds'] * 1e3:.0f} ms (session {kept[i]['session']})")
+            st.code(kept[pick]['text'], language=None)
+            st.download_button("📥 Download .prof (pstats, snakeviz)", data=kept[pick]['prof'],
+                               file_name="coilcalc_rerun.prof", mime="application/octet-stream")
+
+def finish_run():
+    """Records this rerun's timings and, in debug mode, fills the performance panel."""
+    profiling.end_run()
+    if debug_mode:
+        render_debug_panel(debug_area)
+
+def stop_run():
+    """st.stop() that records the rerun's timings first."""
+    finish_run()
+    st.stop()
 
 
 # ================= MAIN STREAMLIT APP =================
 
 st.title("⚡ Pancake Coil Designer & Optimizer")
 st.markdown("Design stacked, potted pancake coils. Adjust parameters to see instant results and download a complete BOM.")
+debug_area = st.container() if debug_mode else None
 
 # --- SIDEBAR / INPUTS ---
+# Inputs the app can set itself (a stock catalog pick, a design reloaded from the result
+# store) are keyed widgets whose defaults live in session state.
+WIDGET_DEFAULTS = {
+    "constraint_mode": 2, "target_turns_per_pancake": 172,
+    "plate_id_mm": 100.0, "plate_od_mm": 259.0, "plate_ir_mm": 50.0, "plate_or_mm": 129.5, "plate_margin_mm": 0.5,
+    "num_pancakes": 2, "plates_input": "6.0, 6.0, 6.0",
+    "t_cu_mm": 0.381, "w_cu_mm": 38.1, "t_mylar_mm": 0.0762, "w_mylar_mm": 38.8, "t_fiberglass_mm": 0.23,
+    "fiberglass_layers": 2, "MLT_input_m": 0.0, "turn_model": "mlt", "I_const": 50.0, "dT_water": 10.0,
+}
+for key, value in WIDGET_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+
 with st.sidebar:
     st.header("⚙️ Design Parameters")
     
     st.subheader("1. Goal & Constraints")
+    goal_labels = {1: "Maximize Turns (Fill Space)", 2: "Target Specific Turns", 3: "Pareto Front (Design Search)"}
     constraint_mode = st.radio(
         "Optimization Goal:", 
-        [1, 2], 
-        index=1,
-        format_func=lambda x: "Maximize Turns (Fill Space)" if x == 1 else "Target Specific Turns"
+        [1, 2, 3], 
+        format_func=lambda x: goal_labels[x],
+        key="constraint_mode",
     )
     if constraint_mode == 2:
-        target_turns_per_pancake = st.number_input("Target Turns per Pancake", min_value=1, value=172, step=1)
+        target_turns_per_pancake = st.number_input("Target Turns per Pancake", min_value=1, step=1, key="target_turns_per_pancake")
     else:
         target_turns_per_pancake = 172 
 
+    if constraint_mode == 3:
+        st.caption("Every combination below is wound to fill the space. Plate ID, margin, materials and operating point come from the sections below.")
+
+        def range_input(label, lo, hi, steps, fmt, step):
+            c_lo, c_hi, c_n = st.columns([1, 1, 0.8])
+            v_lo = c_lo.number_input(f"{label} min", value=lo, step=step, format=fmt)
+            v_hi = c_hi.number_input(f"{label} max", value=hi, step=step, format=fmt)
+            n = c_n.number_input(f"{label} steps", min_value=1, value=steps, step=1)
+            return np.linspace(v_lo, v_hi, int(n))
+
+        search_t_cu = range_input("Cu Tk.", 0.1, 1.0, 19, "%.3f", 0.01)
+        search_w_cu = range_input("Cu W.", 10.0, 60.0, 21, "%.1f", 1.0)
+        search_t_mylar = range_input("Mylar Tk.", 0.025, 0.2, 8, "%.4f", 0.005)
+        col_p1, col_p2 = st.columns(2)
+        search_np_lo = col_p1.number_input("Pancakes min", min_value=1, value=1, step=1)
+        search_np_hi = col_p2.number_input("Pancakes max", min_value=1, value=10, step=1)
+        search_od = range_input("Plate OD", 150.0, 400.0, 26, "%.1f", 5.0)
+
     st.subheader("2. Radial Geometry (mm)")
     rad_dim_mode = st.radio("Input Mode:", ["Diameter", "Radius"], horizontal=True)
     
     col_r1, col_r2 = st.columns(2)
     
     if rad_dim_mode == "Diameter":
-        plate_in_mm = col_r1.number_input("Cooling Plate ID", value=100.0, step=1.0, format="%.1f")
-        plate_out_mm = col_r2.number_input("Cooling Plate OD", value=259.0, step=1.0, format="%.1f")
+        plate_in_mm = col_r1.number_input("Cooling Plate ID", step=1.0, format="%.1f", key="plate_id_mm")
+        plate_out_mm = col_r2.number_input("Cooling Plate OD", step=1.0, format="%.1f", key="plate_od_mm")
         a_mm = plate_in_mm / 2.0
         b_max_mm = plate_out_mm / 2.0
         plate_id_mm = plate_in_mm
         plate_od_mm = plate_out_mm
     else:
-        plate_in_mm = col_r1.number_input("Cooling Plate Inner Radius", value=50.0, step=1.0, format="%.1f")
-        plate_out_mm = col_r2.number_input("Cooling Plate Outer Radius", value=129.5, step=1.0, format="%.1f")
+        plate_in_mm = col_r1.number_input("Cooling Plate Inner Radius", step=1.0, format="%.1f", key="plate_ir_mm")
+        plate_out_mm = col_r2.number_input("Cooling Plate Outer Radius", step=1.0, format="%.1f", key="plate_or_mm")
         a_mm = plate_in_mm
         b_max_mm = plate_out_mm
         plate_id_mm = a_mm * 2.0
         plate_od_mm = b_max_mm * 2.0
         
-    plate_margin_mm = st.number_input("Epoxy Edge Margin", value=0.5, step=0.1, format="%.1f", help="Clearance to allow 2 layers of fiberglass between copper and inner/outer mold walls.")
+    plate_margin_mm = st.number_input("Epoxy Edge Margin", step=0.1, format="%.1f", key="plate_margin_mm", help="Clearance to allow 2 layers of fiberglass between copper and inner/outer mold walls.")
 
     st.subheader("3. Stack Config")
-    num_pancakes = st.number_input("Number of Pancakes", min_value=1, value=2, step=1)
-    plates_input = st.text_input("Cooling Plates (mm, comma-separated)", value="6.0, 6.0, 6.0", help="Define thickness of plates from bottom to top.")
+    num_pancakes = st.number_input("Number of Pancakes", min_value=1, step=1, key="num_pancakes")
+    plates_input = st.text_input("Cooling Plates (mm, comma-separated)", key="plates_input", help="Define thickness of plates from bottom to top.")
     
     try:
         cooling_plates_mm = [float(x.strip()) for x in plates_input.split(',')]
     except ValueError:
         st.error("Invalid format for cooling plates. Use numbers separated by commas.")
-        st.stop()
+        stop_run()
 
     with st.expander("4. Material Details (Advanced)", expanded=False):
         st.markdown("**Conductor & Turn Insulation**")
         col_m1, col_m2 = st.columns(2)
-        t_cu_mm = col_m1.number_input("Cu Thickness", value=0.381, format="%.4f")
-        w_cu_mm = col_m2.number_input("Cu Width", value=38.1, format="%.2f")
-        t_mylar_mm = col_m1.number_input("Mylar Thickness", value=0.0762, format="%.4f")
-        w_mylar_mm = col_m2.number_input("Mylar Width", value=38.8, format="%.2f")
+        t_cu_mm = col_m1.number_input("Cu Thickness", format="%.4f", key="t_cu_mm")
+        w_cu_mm = col_m2.number_input("Cu Width", format="%.2f", key="w_cu_mm")
+        t_mylar_mm = col_m1.number_input("Mylar Thickness", format="%.4f", key="t_mylar_mm")
+        w_mylar_mm = col_m2.number_input("Mylar Width", format="%.2f", key="w_mylar_mm")
         
         st.markdown("**Interface Insulation**")
         col_i1, col_i2 = st.columns(2)
-        t_fiberglass_mm = col_i1.number_input("Fiberglass Tk.", value=0.23, format="%.3f")
-        fiberglass_layers = col_i2.number_input("Layers/Interface", min_value=1, value=2)
+        t_fiberglass_mm = col_i1.number_input("Fiberglass Tk.", format="%.3f", key="t_fiberglass_mm")
+        fiberglass_layers = col_i2.number_input("Layers/Interface", min_value=1, key="fiberglass_layers")
         
         st.markdown("**Other**")
-        MLT_input_m = st.number_input("Fixed MLT (m) [0=Auto]", value=0.0, format="%.3f", help="Set >0 for non-circular coils.")
+        MLT_input_m = st.number_input("Fixed MLT (m) [0=Auto]", format="%.3f", key="MLT_input_m", help="Set >0 for non-circular coils.")
+        turn_model = st.radio(
+            "Turn Length Model", ["mlt", "spiral"], horizontal=True,
+            format_func=lambda x: "Mean Turn (MLT)" if x == "mlt" else "Per-Turn Spiral",
+            help="Per-Turn Spiral sums the exact Archimedean spiral length of every turn instead of using one mean turn length.",
+            key="turn_model",
+        )
 
     with st.expander("5. Operating Conditions", expanded=False):
-        I_const = st.number_input("Operating Current (A)", value=50.0, step=1.0, format="%.1f")
-        dT_water = st.number_input("Allowed Water Temp Rise (°C)", value=10.0, step=1.0, format="%.1f")
+        I_const = st.number_input("Operating Current (A)", step=1.0, format="%.1f", key="I_const")
+        dT_water = st.number_input("Allowed Water Temp Rise (°C)", step=1.0, format="%.1f", key="dT_water")
+        T_water_in = st.number_input("Coolant Inlet Temp (°C)", value=20.0, step=1.0, format="%.1f")
+        hot_resistance = st.checkbox("Hot Resistance (ρ follows winding temp)", value=False, help="Solves resistance, power and winding temperature self-consistently (copper α = 0.393 %/K, lumped stack thermal resistance) instead of using 20 °C resistivity.")
+
+    export_fmt = st.selectbox("Download Format", list(EXPORT_FORMATS), format_func=lambda x: {"csv": "CSV (gzip)", "parquet": "Parquet (zstd)", "arrow": "Arrow IPC (zstd)"}[x], help="Applies to every download. Parquet and Arrow keep column types and load straight into pandas/pyarrow.")
 
     # --- SIGNATURE ---
     st.divider()
     st.caption("⚡ **Pancake Coil Optimizer v1.0**")
     st.caption("Designed by Bimo Adhi Prastya")
 
-# --- CONSTANTS ---
-rho = 1.68e-8
-density_cu = 8960.0       # kg/m^3
-density_al = 2700.0       # kg/m^3
-density_epoxy = 1150.0    # kg/m^3
-density_mylar = 1390.0    # kg/m^3 
-cp_water = 4186.0
-rho_water = 1000.0
-
-# ================= CALCULATION LOGIC =================
-def optimize_pancake_coil():
-    if w_mylar_mm < w_cu_mm:
-        st.error(f"**Design Error:** Mylar width ({w_mylar_mm} mm) cannot be smaller than copper width ({w_cu_mm} mm).")
-        return None
-        
-    winding_a_mm = a_mm + plate_margin_mm
-    winding_b_max_mm = b_max_mm - plate_margin_mm
-    available_build_mm = winding_b_max_mm - winding_a_mm
-    layer_thickness_mm = t_cu_mm + t_mylar_mm
-    
-    if constraint_mode == 1:
-        N_per_pancake = int(np.floor(available_build_mm / layer_thickness_mm))
-        constraint_type = "Space Constrained (Max Turns)"
-    else:
-        N_per_pancake = int(target_turns_per_pancake)
-        constraint_type = "Turns Constrained"
-        
-    if N_per_pancake <= 0:
-        st.error("**Design Error:** Available radial space is too small for even one turn.")
+profiling.lap("sidebar inputs")
+
+# ================= CACHED STAGES =================
+# Each stage is keyed on exactly the inputs it reads, so a rerun only redoes the stages whose
+# inputs changed. The caches are process-wide (shared by every session) and LRU-bounded.
+@st.cache_resource(show_spinner=False)
+def get_result_store():
+    """The persistent result store, or None when its file can't be opened (read-only home etc.)."""
+    import sqlite3
+    from coilcalc.store import ResultStore
+    try:
+        return ResultStore()
+    except (OSError, sqlite3.Error):
         return None
-        
-    actual_build_mm = N_per_pancake * layer_thickness_mm
-    winding_b_actual_mm = winding_a_mm + actual_build_mm
-    unused_space_mm = available_build_mm - actual_build_mm
-    fits_window = actual_build_mm <= available_build_mm
-    
-    if MLT_input_m > 0:
-        MLT_m = MLT_input_m
-        shape_type = "Irregular (Fixed MLT)"
-    else:
-        mean_radius_mm = winding_a_mm + (actual_build_mm / 2.0)
-        MLT_m = (2 * np.pi * mean_radius_mm) / 1000.0
-        shape_type = "Circular (Dynamic MLT)"
-        
-    w_pancake_axial_mm = w_mylar_mm
-    total_pancakes_axial_mm = num_pancakes * w_pancake_axial_mm
-    total_plates_axial_mm = sum(cooling_plates_mm)
-    interface_thickness_mm = fiberglass_layers * t_fiberglass_mm
-    num_interfaces = num_pancakes * 2
-    total_insulation_axial_mm = num_interfaces * interface_thickness_mm
-    total_assembly_axial_mm = total_pancakes_axial_mm + total_plates_axial_mm + total_insulation_axial_mm
-    
-    total_turns = N_per_pancake * num_pancakes
-    total_length_m = total_turns * MLT_m
-    length_per_pancake_m = total_length_m / num_pancakes
-    
-    # Weight, Volume & Current Density Math
-    t_cu_m = t_cu_mm / 1000.0
-    w_cu_m = w_cu_mm / 1000.0
-    A_cu = t_cu_m * w_cu_m
-    A_cu_mm2 = t_cu_mm * w_cu_mm
-    J_A_mm2 = I_const / A_cu_mm2
-    
-    volume_cu_m3 = A_cu * total_length_m
-    weight_cu_kg = volume_cu_m3 * density_cu
-
-    # Mylar Weight Math
-    t_mylar_m = t_mylar_mm / 1000.0
-    w_mylar_m = w_mylar_mm / 1000.0
-    A_mylar = t_mylar_m * w_mylar_m
-    volume_mylar_m3 = A_mylar * total_length_m
-    weight_mylar_kg = volume_mylar_m3 * density_mylar
-    
-    r_in_m = a_mm / 1000.0
-    plate_r_out_m = (winding_a_mm + actual_build_mm + plate_margin_mm) / 1000.0
-    area_plate_m2 = np.pi * (plate_r_out_m**2 - r_in_m**2)
-    total_plates_axial_m = total_plates_axial_mm / 1000.0
-    volume_al_m3 = area_plate_m2 * total_plates_axial_m
-    weight_al_kg = volume_al_m3 * density_al
-    
-    r_out_max_m = b_max_mm / 1000.0
-    v_gross_mold_m3 = np.pi * (r_out_max_m**2 - r_in_m**2) * (total_assembly_axial_mm / 1000.0)
-    winding_a_m = winding_a_mm / 1000.0
-    winding_b_m = winding_b_actual_mm / 1000.0
-    v_winding_block_m3 = np.pi * (winding_b_m**2 - winding_a_m**2) * (total_pancakes_axial_mm / 1000.0)
-    v_plates_insul_m3 = np.pi * (plate_r_out_m**2 - r_in_m**2) * ((total_plates_axial_mm + total_insulation_axial_mm) / 1000.0)
-    
-    volume_epoxy_m3 = max(0.0, v_gross_mold_m3 - v_winding_block_m3 - v_plates_insul_m3)
-    vol_epoxy_L = volume_epoxy_m3 * 1000.0
-    weight_epoxy_kg = volume_epoxy_m3 * density_epoxy
-    
-    total_weight_kg = weight_cu_kg + weight_al_kg + weight_mylar_kg + weight_epoxy_kg
-    
-    # Electrical Math
-    R_total = rho * (total_length_m / A_cu)
-    V_req = I_const * R_total
-    P_total = (I_const ** 2) * R_total
-    NI_total = total_turns * I_const
-    mass_flow_kg_per_s = P_total / (cp_water * dT_water)
-    vol_flow_L_per_min = (mass_flow_kg_per_s / rho_water) * 1000.0 * 60.0
-    
-    return {
-        "constraint_type": constraint_type,
-        "winding_a_mm": winding_a_mm,
-        "winding_b_actual_mm": winding_b_actual_mm,
-        "available_space_mm": available_build_mm,
-        "unused_space_mm": unused_space_mm,
-        "fits_window": fits_window,
-        "turns_per_pancake": N_per_pancake,
-        "total_turns": total_turns,
-        "MLT_m": MLT_m,
-        "shape_type": shape_type,
-        "length_m": total_length_m,
-        "length_per_pancake_m": length_per_pancake_m,
-        "A_cu_mm2": A_cu_mm2,
-        "J_A_mm2": J_A_mm2,
-        "build_mm": actual_build_mm,
-        "wt_cu_kg": weight_cu_kg,
-        "wt_al_kg": weight_al_kg,
-        "wt_mylar_kg": weight_mylar_kg,
-        "vol_epoxy_L": vol_epoxy_L,
-        "wt_epoxy_kg": weight_epoxy_kg,
-        "wt_total_kg": total_weight_kg,
-        "R": R_total,
-        "V": V_req,
-        "P": P_total,
-        "NI": NI_total,
-        "Flow_LPM": vol_flow_L_per_min,
-        "ax_pancakes_mm": total_pancakes_axial_mm,
-        "ax_plates_mm": total_plates_axial_mm,
-        "ax_insul_mm": total_insulation_axial_mm,
-        "ax_total_mm": total_assembly_axial_mm
-    }
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def compute_design(**design):
+    store = get_result_store()
+    if store is None:
+        return optimize_pancake_coil(**design)
+    from coilcalc.store import optimize_cached
+    return optimize_cached(store, **design)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def compute_hot_design(T_water_in, **design):
+    from coilcalc.electrothermal import electrothermal_batch
+    hot = electrothermal_batch(T_water_in_C=T_water_in, **design)
+    return {k: hot[k].item() for k in ("R", "V", "P", "Flow_LPM", "R20", "T_winding_C", "theta_K_per_W", "runaway")}
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def build_export(columns, fmt):
+    """Compressed download of a table of columns; returns (data, file suffix, MIME type)."""
+    from coilcalc.export import export_bytes, iter_chunks
+    return export_bytes(iter_chunks(columns), fmt)
+
+# The Results Browser only opens exported tables under this directory (off when unset), so
+# users of a deployed app can't have the server read arbitrary files.
+RESULTS_DIR = os.environ.get("COILCALC_RESULTS_DIR")
+
+def resolve_results_file(root, name):
+    """Real path of results file `name` under `root`; ValueError if it leaves root or isn't a table."""
+    from pathlib import Path
+    from coilcalc.export import format_of
+    base = Path(root).resolve()
+    path = (base / name).resolve()
+    if not path.is_relative_to(base) or not path.is_file():
+        raise ValueError(f"{name}: not a file in the results directory")
+    format_of(path.name)
+    return path
+
+@st.cache_data(ttl=30, show_spinner=False)
+def list_results_files(root):
+    """Exported tables under root, as paths relative to it."""
+    from pathlib import Path
+    found = []
+    for path in Path(root).resolve().rglob("*"):
+        name = str(path.relative_to(Path(root).resolve()))
+        try:
+            resolve_results_file(root, name)
+        except ValueError:
+            continue
+        found.append(name)
+    return sorted(found)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def open_results_file(path, mtime):
+    from coilcalc.export import open_table
+    return open_table(path)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def render_schematic_html(res, a_mm, b_max_mm, rad_dim_mode, plate_margin_mm, cooling_plates_list, num_pancakes, show_turns=False):
+    svg_xml = generate_cross_section_svg(res, a_mm, b_max_mm, rad_dim_mode, plate_margin_mm, cooling_plates_list, num_pancakes, show_turns=show_turns)
+    b64 = base64.b64encode(svg_xml.encode('utf-8')).decode("utf-8")
+    return r'<img src="data:image/svg+xml;base64,%s" width="100%%"/>' % b64
+
+# Result keys that fix a design's geometry. Stages that only depend on geometry are cached
+# on these, not on the whole result: current and coolant changes just rescale their output.
+GEOMETRY_KEYS = ("winding_a_mm", "winding_b_actual_mm", "build_mm", "turns_per_pancake", "ax_pancakes_mm", "ax_insul_mm", "ax_total_mm")
+
+def design_geometry(res):
+    return tuple((k, res[k]) for k in GEOMETRY_KEYS)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def compute_turn_table(winding_a_mm, t_cu_mm, t_mylar_mm, w_cu_mm, turns_per_pancake, num_pancakes, I_const):
+    return turn_table(winding_a_mm, t_cu_mm, t_mylar_mm, w_cu_mm, turns_per_pancake, num_pancakes, I_const)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def compute_inductance(geometry, cooling_plates_list, num_pancakes, t_cu_mm, w_cu_mm, t_mylar_mm):
+    from coilcalc.inductance import coil_inductance
+    return coil_inductance(dict(geometry), cooling_plates_list, num_pancakes, t_cu_mm, w_cu_mm, t_mylar_mm)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def build_thermal_model(geometry, a_mm, b_max_mm, plate_margin_mm, cooling_plates_list, num_pancakes, t_cu_mm, t_mylar_mm, h_plate, target_cells):
+    from coilcalc.thermal import StackThermalModel
+    return StackThermalModel(dict(geometry), a_mm, b_max_mm, plate_margin_mm, cooling_plates_list, num_pancakes,
+                             t_cu_mm, t_mylar_mm, h_plate=h_plate, target_cells=target_cells)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def compute_field_map(geometry, cooling_plates_list, num_pancakes, t_cu_mm, t_mylar_mm, lumped, grid_n):
+    """Field map at 1 A: B is linear in the current, so the display scales it by I_const."""
+    from coilcalc.field import field_grid
+    return field_grid(dict(geometry), cooling_plates_list, num_pancakes, t_cu_mm, t_mylar_mm, 1.0, lumped, grid_n)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def run_tolerances(design, tolerances, samples):
+    from coilcalc.tolerance import run_tolerance_analysis
+    return run_tolerance_analysis(design, tolerances, samples=samples)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def parse_waveform(name, digest, _data):
+    """Current samples of an uploaded file, parsed once per file content (digest)."""
+    from coilcalc.transient import load_waveform
+    source = io.BytesIO(_data)
+    source.name = name
+    return np.concatenate([np.zeros(0)] + list(load_waveform(source)))
+
+def run_transient(waveform, dt_s, R20, heat_capacity_J_K, theta, T_coolant, dT_water, trace_every):
+    """Runs on request only: the result is kept in session state with its inputs."""
+    from coilcalc.transient import pulse_train, simulate_transient
+    chunks = pulse_train(dt_s=dt_s, **waveform) if isinstance(waveform, dict) else waveform
+    return simulate_transient(chunks, dt_s, R20, heat_capacity_J_K, theta, T_coolant_C=T_coolant,
+                              dT_water=dT_water, trace_every=trace_every)
+
+@st.cache_resource(show_spinner=False)
+def get_stock_catalog():
+    from coilcalc.catalog import load_catalog
+    return load_catalog()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_stock_search(**search_params):
+    from coilcalc.catalog import best_fit
+    return best_fit(get_stock_catalog(), **search_params)
+
+def apply_stock(choice):
+    """Button callback: puts a catalog pick into the sidebar widgets before the rerun."""
+    for key, value in choice.items():
+        st.session_state[key] = value
+
+def load_stored_design(entry):
+    """Button callback: puts a design from the result store back into the sidebar widgets."""
+    plates = entry.get("cooling_plates_mm")
+    if not plates:
+        # Batch rows only keep the total plate thickness: spread it over N+1 equal plates
+        n_plates = int(entry['num_pancakes']) + 1
+        plates = [entry['plates_axial_mm'] / n_plates] * n_plates
+    choice = {k: float(entry[k]) for k in ("t_cu_mm", "w_cu_mm", "t_mylar_mm", "w_mylar_mm", "t_fiberglass_mm",
+                                           "plate_margin_mm", "MLT_input_m", "I_const", "dT_water")}
+    choice.update(
+        constraint_mode=int(entry['constraint_mode']), num_pancakes=int(entry['num_pancakes']),
+        fiberglass_layers=int(entry['fiberglass_layers']), turn_model=entry['turn_model'],
+        plate_id_mm=2.0 * entry['a_mm'], plate_od_mm=2.0 * entry['b_max_mm'],
+        plate_ir_mm=float(entry['a_mm']), plate_or_mm=float(entry['b_max_mm']),
+        plates_input=", ".join(f"{p:g}" for p in plates),
+    )
+    if choice["constraint_mode"] == 2:
+        choice["target_turns_per_pancake"] = max(1, int(entry['target_turns_per_pancake']))
+    apply_stock(choice)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def run_design_search(**search_params):
+    return pareto_front(**search_params)
+
+design_inputs = dict(
+    constraint_mode=constraint_mode, target_turns_per_pancake=target_turns_per_pancake,
+    a_mm=a_mm, b_max_mm=b_max_mm, plate_margin_mm=plate_margin_mm,
+    num_pancakes=num_pancakes, cooling_plates_mm=tuple(cooling_plates_mm),
+    t_cu_mm=t_cu_mm, w_cu_mm=w_cu_mm, t_mylar_mm=t_mylar_mm, w_mylar_mm=w_mylar_mm,
+    t_fiberglass_mm=t_fiberglass_mm, fiberglass_layers=fiberglass_layers,
+    MLT_input_m=MLT_input_m, I_const=I_const, dT_water=dT_water, turn_model=turn_model,
+)
+
+# ================= PARETO DESIGN SEARCH =================
+if constraint_mode == 3:
+    search_params = dict(
+        t_cu_mm=search_t_cu, w_cu_mm=search_w_cu, t_mylar_mm=search_t_mylar,
+        num_pancakes=np.arange(search_np_lo, max(search_np_lo, search_np_hi) + 1),
+        plate_od_mm=search_od, plate_thickness_mm=float(np.mean(cooling_plates_mm)),
+        mylar_overhang_mm=w_mylar_mm - w_cu_mm, a_mm=a_mm, plate_margin_mm=plate_margin_mm,
+        t_fiberglass_mm=t_fiberglass_mm, fiberglass_layers=fiberglass_layers,
+        MLT_input_m=MLT_input_m, I_const=I_const, dT_water=dT_water, turn_model=turn_model,
+    )
+    search_key = repr(sorted((k, np.asarray(v).tolist()) for k, v in search_params.items()))
+    n_candidates = search_t_cu.size * search_w_cu.size * search_t_mylar.size * search_params["num_pancakes"].size * search_od.size
+
+    st.subheader("Pareto Front: Ampere-Turns vs. Mass, Power & Cooling")
+    st.caption(f"{n_candidates:,} candidate designs. Plate stack: N+1 plates of {search_params['plate_thickness_mm']:.1f} mm; Mylar width = Cu width + {search_params['mylar_overhang_mm']:.2f} mm.")
+
+    if st.button("🔍 Run Design Search", type="primary"):
+        if w_mylar_mm < w_cu_mm:
+            st.error(f"**Design Error:** Mylar width ({w_mylar_mm} mm) cannot be smaller than copper width ({w_cu_mm} mm).")
+            stop_run()
+        with st.spinner("Searching design space..."):
+            st.session_state["pareto"] = (search_key, run_design_search(**search_params))
+
+    if st.session_state.get("pareto", (None,))[0] != search_key:
+        st.info("Adjust the search space in the sidebar, then run the search.")
+        stop_run()
+
+    front, stats = st.session_state["pareto"][1]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Candidates", f"{stats['candidates']:,}")
+    col2.metric("Evaluated", f"{stats['evaluated']:,}", f"{stats['blocks_pruned']:,} blocks pruned", delta_color="off")
+    col3.metric("Pareto-Optimal Designs", f"{stats['front_size']:,}")
+    col4.metric("Search Time", f"{stats['seconds']:.2f} s")
+
+    if stats["front_size"] == 0:
+        st.error("**Design Error:** No design in the search space fits even one turn.")
+        stop_run()
+
+    df_front = pd.DataFrame({
+        "Ampere-Turns (AT)": front["NI"],
+        "Total Assembly Mass (kg)": front["wt_total_kg"],
+        "Power (W)": front["P"],
+        "Required Cooling (LPM)": front["Flow_LPM"],
+        "Pancakes in Series": front["num_pancakes"],
+        "Turns per Pancake": front["turns_per_pancake"],
+        "Cu Thickness (mm)": front["t_cu_mm"],
+        "Cu Width (mm)": front["w_cu_mm"],
+        "Mylar Thickness (mm)": front["t_mylar_mm"],
+        "Mylar Width (mm)": front["w_mylar_mm"],
+        "Cooling Plate OD (mm)": front["plate_od_mm"],
+        "Current Density (A/mm^2)": front["J_A_mm2"],
+        "Resistance (Ohms)": front["R"],
+        "Voltage Drop (V)": front["V"],
+        "Remaining Radial Slack (mm)": front["unused_space_mm"],
+        "Total Axial Height (mm)": front["ax_total_mm"],
+        "Total Copper Mass (kg)": front["wt_cu_kg"],
+    })
+
+    st.scatter_chart(df_front.iloc[::max(1, len(df_front) // 5000)], x="Total Assembly Mass (kg)", y="Ampere-Turns (AT)", color="Power (W)")
+    st.dataframe(df_front, use_container_width=True, hide_index=True)
+    front_data, front_suffix, front_mime = build_export({k: df_front[k].to_numpy() for k in df_front.columns}, export_fmt)
+    st.download_button(
+        label="📥 Download Pareto Front",
+        data=front_data,
+        file_name="pancake_coil_pareto_front" + front_suffix,
+        mime=front_mime
+    )
+    profiling.lap("pareto front")
+    stop_run()
 
 # ================= OUTPUT & VISUALIZATION =================
 
-res = optimize_pancake_coil()
+try:
+    with profiling.stage("optimize_pancake_coil"):
+        res = compute_design(**design_inputs)
+except DesignError as e:
+    st.error(f"**Design Error:** {e}")
+    res = None
+
+hot = None
+if res and hot_resistance:
+    with profiling.stage("hot resistance"):
+        hot = compute_hot_design(T_water_in, **design_inputs)
+    if hot['runaway']:
+        st.error(f"**Thermal Runaway:** at {I_const} A the resistance rises faster with temperature than the cooling can remove the extra heat; there is no steady state. Results below are at 20 °C.")
+        hot = None
+    else:
+        res = {**res, **{k: hot[k] for k in ("R", "V", "P", "Flow_LPM")}}
 
 if res:
     if not res['fits_window']:
         st.warning(f"⚠️ **Warning:** Winding build exceeds available space by {abs(res['unused_space_mm']):.2f} mm!")
     
+    with profiling.stage("inductance"):
+        inductance = compute_inductance(design_geometry(res), tuple(cooling_plates_mm), num_pancakes, t_cu_mm, w_cu_mm, t_mylar_mm)
+    L_H = inductance['L_H']
+
     # --- EXPORT DATA LOGIC ---
     export_dict = {
         "Constraint Mode": [res['constraint_type']],
@@ -377,6 +510,9 @@ if res:
         "Resistance (Ohms)": [res['R']],
         "Voltage Drop (V)": [res['V']],
         "Power (W)": [res['P']],
+        "Resistance Temperature (C)": [hot['T_winding_C'] if hot else 20.0],
+        "Inductance (mH)": [L_H * 1e3],
+        "L/R Time Constant (ms)": [L_H / res['R'] * 1e3],
         "Required Cooling (LPM)": [res['Flow_LPM']],
         "Input Mode Used": [rad_dim_mode],
         "Cooling Plate ID (mm)": [plate_id_mm],
@@ -399,31 +535,39 @@ if res:
         "Total Assembly Mass (kg)": [res['wt_total_kg']]
     }
     
-    df_export = pd.DataFrame(export_dict)
-    csv_data = df_export.to_csv(index=False).encode('utf-8')
+    with profiling.stage("export"):
+        export_data, export_suffix, export_mime = build_export(export_dict, export_fmt)
 
     # --- TOP LEVEL METRICS & EXPORT BUTTON ---
-    col1, col2, col3, col4, col5, col6 = st.columns([1.2, 1, 1, 1, 1, 1.2])
+    col1, col2, col3, col4, col_l, col5, col6 = st.columns([1.2, 1, 1, 1, 1, 1, 1.2])
     col1.metric("Total Ampere-Turns", f"{res['NI']:,.0f} AT", f"{res['total_turns']} turns @ {I_const} A", delta_color="off")
     col2.metric("Current Density", f"{res['J_A_mm2']:.2f} A/mm²", f"{I_const} A / {res['A_cu_mm2']:.2f} mm²", delta_color="off")
     col3.metric("Power Dissipation", f"{res['P']:.1f} W", f"{res['V']:.1f} V @ {I_const} A", delta_color="off")
-    col4.metric("Total Resistance", f"{res['R']:.4f} Ω", f"{res['length_per_pancake_m']:.1f} m/pancake × {num_pancakes}", delta_color="off")
+    if hot:
+        col4.metric("Total Resistance", f"{res['R']:.4f} Ω", f"at {hot['T_winding_C']:.1f} °C (20 °C: {hot['R20']:.4f} Ω)", delta_color="off")
+    else:
+        col4.metric("Total Resistance", f"{res['R']:.4f} Ω", f"{res['length_per_pancake_m']:.1f} m/pancake × {num_pancakes}", delta_color="off")
+    col_l.metric("Inductance", f"{L_H * 1e3:.3g} mH", f"τ = L/R = {L_H / res['R'] * 1e3:.3g} ms", delta_color="off", help="Circular turns assumed; with a fixed MLT this is an estimate for a round coil of the same build.")
     col5.metric("Required Cooling", f"{res['Flow_LPM']:.1f} L/min", f"ΔT = {dT_water}°C", delta_color="off")
     
     with col6:
         st.write("") 
         st.download_button(
-            label="📥 Download CSV",
-            data=csv_data,
-            file_name="pancake_coil_design.csv",
-            mime="text/csv",
+            label="📥 Download",
+            data=export_data,
+            file_name="pancake_coil_design" + export_suffix,
+            mime=export_mime,
             use_container_width=True
         )
         
     st.divider()
     
+    profiling.lap("design, metrics & export")
+
     # --- TABS ---
-    tab1, tab2, tab3 = st.tabs(["📊 Specs & Data", "📐 Engineering Schematic", "⚖️ Bill of Materials"])
+    # The heavy tabs compute on request, so editing an input only reruns the summary and schematic
+    COMPUTE_HELP = "Stays on for this session: while on, the tab recomputes whenever its inputs change."
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs(["📊 Specs & Data", "📐 Engineering Schematic", "⚖️ Bill of Materials", "🌀 Per-Turn Profile", "🌡️ Thermal Field", "🧲 Magnetic Field", "🎲 Tolerances", "⚡ Transient", "📦 Stock Catalog", "🗂️ History"])
     
     with tab1:
         col_rad, col_ax = st.columns(2)
@@ -469,15 +613,17 @@ if res:
                 ]
             })
             st.table(df_ax.set_index("Component Stack"))
+    profiling.lap("tab: Specs & Data")
 
     with tab2:
         st.subheader("Cross-Sectional View (Proportional)")
         st.caption("Visual representation of the stack buildup based on current parameters. Epoxy potting dynamically adapts to Dark/Light mode.")
         
-        svg_xml = generate_cross_section_svg(res, a_mm, b_max_mm, rad_dim_mode, plate_margin_mm, cooling_plates_mm, num_pancakes)
-        b64 = base64.b64encode(svg_xml.encode('utf-8')).decode("utf-8")
-        html = r'<img src="data:image/svg+xml;base64,%s" width="100%%"/>' % b64
+        show_turns = st.checkbox("Show turn boundaries", value=False, help="Decimated to every k-th turn when they would be closer than a few pixels.")
+        with profiling.stage("schematic svg + base64"):
+            html = render_schematic_html(res, a_mm, b_max_mm, rad_dim_mode, plate_margin_mm, tuple(cooling_plates_mm), num_pancakes, show_turns)
         st.markdown(html, unsafe_allow_html=True)
+    profiling.lap("tab: Engineering Schematic")
 
     with tab3:
         st.subheader("Estimated Assembly Weights & Volumes")
@@ -492,3 +638,320 @@ if res:
         
         st.divider()
         st.metric("ESTIMATED TOTAL POTTED ASSEMBLY MASS", f"{res['wt_total_kg']:.1f} kg", delta_color="off")
+    profiling.lap("tab: Bill of Materials")
+
+    with tab4:
+        st.subheader("Per-Turn Spiral Profile")
+        if not st.toggle("Compute Per-Turn Profile", key="compute_turns", help=COMPUTE_HELP):
+            st.caption("Off: design changes don't recompute the per-turn table.")
+        else:
+            if MLT_input_m > 0:
+                st.info("A fixed MLT describes a non-circular coil, so there is no spiral to resolve turn by turn. Set Fixed MLT to 0 to see the profile.")
+            else:
+                st.caption("Each turn follows an Archimedean spiral. Pancakes are in series with alternating winding direction (even pancakes inside-out, odd ones outside-in).")
+                turns = compute_turn_table(res['winding_a_mm'], t_cu_mm, t_mylar_mm, w_cu_mm, res['turns_per_pancake'], num_pancakes, I_const)
+
+                col_t1, col_t2, col_t3 = st.columns(3)
+                col_t1.metric("Innermost Turn", f"{turns['length_m'][0, 0]:.3f} m", f"{turns['R_ohm'][0, 0] * 1e3:.3f} mΩ", delta_color="off")
+                col_t2.metric("Outermost Turn", f"{turns['length_m'][0, -1]:.3f} m", f"{turns['R_ohm'][0, -1] * 1e3:.3f} mΩ", delta_color="off")
+                col_t3.metric("Max Turn-to-Turn Voltage", f"{turns['V_turn_V'][0].max():.3f} V", f"{turns['V_cum_V'].max():.1f} V across coil", delta_color="off")
+
+                # Conductor path order: every pancake's turns in the order the current flows through them
+                path = np.argsort(turns['V_cum_V'], axis=None, kind="stable")
+                step = max(1, path.size // 5000)
+                df_path = pd.DataFrame({
+                    "Conductor Position (m)": np.cumsum(turns['length_m'].ravel()[path])[::step],
+                    "Cumulative Voltage (V)": turns['V_cum_V'].ravel()[path][::step],
+                })
+                st.line_chart(df_path, x="Conductor Position (m)", y="Cumulative Voltage (V)")
+
+                v_out = turns['V_cum_V'].max(axis=1)
+                df_pancakes = pd.DataFrame({
+                    "Pancake": np.arange(1, num_pancakes + 1),
+                    "Direction": ["Outside-In" if p % 2 else "Inside-Out" for p in range(num_pancakes)],
+                    "Length (m)": turns['length_m'].sum(axis=1),
+                    "Resistance (Ω)": turns['R_ohm'].sum(axis=1),
+                    "Voltage In (V)": np.r_[0.0, v_out[:-1]],
+                    "Voltage Out (V)": v_out,
+                })
+                st.table(df_pancakes.set_index("Pancake"))
+
+                turn_data, turn_suffix, turn_mime = build_export({
+                    "Pancake": turns['pancake'].ravel() + 1, "Turn": turns['turn'].ravel() + 1,
+                    "Radius (mm)": turns['radius_mm'].ravel(), "Length (m)": turns['length_m'].ravel(),
+                    "Resistance (Ohms)": turns['R_ohm'].ravel(), "Turn Voltage (V)": turns['V_turn_V'].ravel(),
+                    "Cumulative Voltage (V)": turns['V_cum_V'].ravel(),
+                }, export_fmt)
+                st.download_button("📥 Download Per-Turn Table", data=turn_data, file_name="pancake_coil_turns" + turn_suffix, mime=turn_mime)
+    profiling.lap("tab: Per-Turn Profile")
+
+    with tab5:
+        st.subheader("Steady-State Temperature (r–z Cross-Section)")
+        if not st.toggle("Compute Thermal Field", key="compute_thermal", help=COMPUTE_HELP):
+            st.caption("Off: design changes don't recompute the thermal field.")
+        else:
+            col_h1, col_h2 = st.columns(2)
+            h_plate = col_h1.number_input("Plate-to-Water h (W/m²·K)", value=2000.0, step=100.0, format="%.0f", help="Effective heat transfer coefficient of the plate cooling channels, referred to the plate face area.")
+            mesh_cells = col_h2.select_slider("Mesh Cells", options=[10_000, 20_000, 50_000, 100_000], value=50_000, format_func=lambda n: f"{n:,}", help="The solve takes about 0.1 s at 20k cells, 0.3 s at 50k and 0.6 s at 100k, and grows faster than the cell count beyond (10 s at 1M). Temperatures change by well under 0.1% between 10k and 100k cells.")
+            T_coolant = T_water_in + dT_water / 2.0
+
+            try:
+                thermal = build_thermal_model(design_geometry(res), a_mm, b_max_mm, plate_margin_mm, tuple(cooling_plates_mm), num_pancakes, t_cu_mm, t_mylar_mm, h_plate, mesh_cells)
+            except ImportError:
+                st.info("The thermal field solver needs scipy (`pip install scipy`).")
+            except DesignError as e:
+                st.error(f"**Design Error:** {e}")
+            else:
+                col_th1, col_th2, col_th3, col_th4 = st.columns(4)
+                col_th1.metric("Peak Winding Temp", f"{thermal.peak_temperature(res['P'], T_coolant):.1f} °C", f"at r = {thermal.hotspot_mm[0]:.1f} mm, z = {thermal.hotspot_mm[1]:.1f} mm", delta_color="off")
+                col_th2.metric("Mean Winding Temp", f"{T_coolant + res['P'] * thermal.theta_mean:.1f} °C", f"coolant mean {T_coolant:.1f} °C", delta_color="off")
+                col_th3.metric("Hot-Spot Resistance", f"{thermal.theta_peak:.4f} K/W", f"mean {thermal.theta_mean:.4f} K/W", delta_color="off")
+                col_th4.metric("Mesh", f"{thermal.cells:,} cells", f"{thermal.shape[1]} r × {thermal.shape[0]} z", delta_color="off")
+
+                field = thermal.temperature(res['P'], T_coolant)
+                st.image(render_heatmap_rgb(field, thermal.r_edges_mm, thermal.z_edges_mm), caption=f"Plate ID to plate OD (left to right), stack bottom to top. Dark = {field.min():.1f} °C, bright = {field.max():.1f} °C.")
+    profiling.lap("tab: Thermal Field")
+
+    with tab6:
+        st.subheader("Magnetic Flux Density")
+        if not st.toggle("Compute Field Map", key="compute_field", help=COMPUTE_HELP):
+            st.caption("Off: design changes don't recompute the field map.")
+        else:
+            col_b1, col_b2 = st.columns(2)
+            field_model = col_b1.radio("Current Model", ["Per Turn", "Lumped per Pancake"], horizontal=True, help="Per Turn: one circular loop per turn. Lumped: one loop of N·I per pancake at the mean winding radius (much faster, accurate away from the winding).")
+            grid_n = col_b2.select_slider("Map Resolution", options=[40, 80, 160], value=80)
+            if MLT_input_m > 0:
+                st.caption("Fixed MLT: the field is computed for a circular winding with the same inner radius and build.")
+
+            bfield = compute_field_map(design_geometry(res), tuple(cooling_plates_mm), num_pancakes, t_cu_mm, t_mylar_mm, field_model != "Per Turn", grid_n)
+            Bz_axis_T = bfield['Bz_axis_T'] * I_const
+            z_mid_mm = res['ax_total_mm'] / 2.0
+            col_bf1, col_bf2, col_bf3 = st.columns(3)
+            col_bf1.metric("Peak On-Axis Field", f"{np.abs(Bz_axis_T).max() * 1e3:.2f} mT")
+            col_bf2.metric("Field at Stack Center", f"{np.interp(z_mid_mm, bfield['z_axis_mm'], Bz_axis_T) * 1e3:.2f} mT", f"z = {z_mid_mm:.1f} mm", delta_color="off")
+            col_bf3.metric("Current Loops", f"{bfield['loops']:,}", f"{grid_n}×{grid_n} map points", delta_color="off")
+
+            df_axis = pd.DataFrame({"Axial Position z (mm)": bfield['z_axis_mm'], "Bz on Axis (mT)": Bz_axis_T * 1e3})
+            st.line_chart(df_axis, x="Axial Position z (mm)", y="Bz on Axis (mT)")
+
+            # Clip the color scale so the near-singular cells next to each loop don't wash out the map
+            B_mT = bfield['B_T'] * (abs(I_const) * 1e3)
+            B_clip = np.minimum(B_mT, np.percentile(B_mT, 99.5))
+            st.image(render_heatmap_rgb(B_clip, bfield['r_edges_mm'], bfield['z_edges_mm']), caption=f"|B| from the axis (left) to {bfield['r_edges_mm'][-1]:.0f} mm, z = {bfield['z_edges_mm'][0]:.0f} to {bfield['z_edges_mm'][-1]:.0f} mm from the stack bottom. Dark = {B_clip.min():.2f} mT, bright ≥ {B_clip.max():.2f} mT.")
+    profiling.lap("tab: Magnetic Field")
+
+    with tab7:
+        st.subheader("Monte Carlo Tolerance Analysis")
+        st.caption("Samples the material and geometry inputs around their nominal values. The turn count stays at the nominal design's, so thicker foil or mylar eats into the radial slack.")
+        col_d1, col_d2 = st.columns(2)
+        tol_dist = col_d1.selectbox("Distribution", ["Normal (tolerance = ±3σ)", "Uniform", "Triangular"])
+        tol_samples = col_d2.select_slider("Samples", options=[100_000, 1_000_000, 10_000_000], value=100_000, format_func=lambda n: f"{n:,}")
+        kind = {"Normal (tolerance = ±3σ)": "normal", "Uniform": "uniform", "Triangular": "triangular"}[tol_dist]
+
+        col_tol1, col_tol2, col_tol3 = st.columns(3)
+        tol_inputs = {
+            "t_cu_mm": col_tol1.number_input("Copper Thickness ± (mm)", min_value=0.0, value=0.01, step=0.002, format="%.4f"),
+            "t_mylar_mm": col_tol1.number_input("Mylar Thickness ± (mm)", min_value=0.0, value=0.005, step=0.001, format="%.4f"),
+            "w_cu_mm": col_tol2.number_input("Copper Width ± (mm)", min_value=0.0, value=0.1, step=0.05, format="%.3f"),
+            "w_mylar_mm": col_tol2.number_input("Mylar Width ± (mm)", min_value=0.0, value=0.1, step=0.05, format="%.3f"),
+            "t_fiberglass_mm": col_tol3.number_input("Fiberglass Thickness ± (mm)", min_value=0.0, value=0.02, step=0.01, format="%.3f"),
+            "b_max_mm": col_tol3.number_input("Mold Radius ± (mm)", min_value=0.0, value=0.2, step=0.05, format="%.3f"),
+        }
+        tolerances = {k: (kind, v) for k, v in tol_inputs.items() if v > 0}
+
+        tol_key = repr((sorted(design_inputs.items()), sorted(tolerances.items()), tol_samples))
+        if st.button("🎲 Run Tolerance Analysis", type="primary"):
+            with st.spinner(f"Sampling {tol_samples:,} coils..."):
+                st.session_state["tolerance"] = (tol_key, run_tolerances(design_inputs, tolerances, tol_samples))
+
+        if st.session_state.get("tolerance", (None,))[0] != tol_key:
+            st.info("Set the tolerances, then run the analysis. After a design change it runs again on request.")
+        else:
+            mc = st.session_state["tolerance"][1]
+            col_mc1, col_mc2, col_mc3 = st.columns(3)
+            col_mc1.metric("Fit Failure Probability", f"{mc['fit_failure_p']:.2%}", "winding exceeds the mold window", delta_color="off")
+            col_mc2.metric("Invalid Samples", f"{mc['invalid_p']:.2%}", "mylar narrower than copper", delta_color="off")
+            col_mc3.metric("Samples", f"{mc['samples']:,}", f"{mc['seconds']:.2f} s", delta_color="off")
+
+            quantities = {"Resistance (Ω)": "R", "Power (W)": "P", "Total Mass (kg)": "wt_total_kg", "Radial Slack (mm)": "unused_space_mm"}
+            df_tol = pd.DataFrame([
+                {"Quantity": label, "Nominal": mc['nominal'][k],
+                 **dict(zip(["P5", "P50", "P95"], mc['stats'][k].quantile([0.05, 0.5, 0.95]))),
+                 "Std Dev": mc['stats'][k].std}
+                for label, k in quantities.items()
+            ]).set_index("Quantity")
+            st.table(df_tol.style.format("{:.4g}"))
+
+            hist_label = st.radio("Distribution of", list(quantities), horizontal=True)
+            edges, counts = mc['stats'][quantities[hist_label]].rebinned(60)
+            st.bar_chart(pd.DataFrame({hist_label: 0.5 * (edges[1:] + edges[:-1]), "Samples": counts}), x=hist_label, y="Samples")
+    profiling.lap("tab: Tolerances")
+
+    with tab8:
+        st.subheader("Pulsed-Current Transient")
+        st.caption("Lumped winding temperature: the copper's heat capacity, the stack's thermal resistance to the mean coolant temperature, and a resistance that follows the temperature. Starts at the coolant temperature.")
+        wave_source = st.radio("Current Waveform", ["Pulse Train", "Upload (.npy / .csv)"], horizontal=True)
+        col_w1, col_w2, col_w3, col_w4 = st.columns(4)
+        dt_s = col_w4.number_input("Sample Interval (ms)", min_value=0.001, value=1.0, step=0.5, format="%.3f") / 1000.0
+        if wave_source == "Pulse Train":
+            waveform = dict(
+                I_peak=col_w1.number_input("Pulse Current (A)", value=float(I_const), step=10.0, format="%.1f"),
+                I_base=col_w1.number_input("Base Current (A)", value=0.0, step=5.0, format="%.1f"),
+                period_s=col_w2.number_input("Period (s)", min_value=0.001, value=2.0, step=0.5, format="%.3f"),
+                duty=col_w2.slider("Duty Cycle", 0.01, 1.0, 0.3, 0.01),
+                ramp_s=col_w3.number_input("Ramp Time (s)", min_value=0.0, value=0.05, step=0.01, format="%.3f"),
+                duration_s=col_w3.number_input("Duration (s)", min_value=1.0, value=1800.0, step=60.0, format="%.0f"),
+            )
+            n_samples = int(round(waveform["duration_s"] / dt_s))
+        else:
+            upload = col_w1.file_uploader("Current Samples (A)", type=["npy", "csv"], help="A .npy array, or a CSV whose first column is the current; one sample per interval.")
+            waveform = None
+            if upload:
+                data = upload.getvalue()
+                digest = hashlib.sha256(data).hexdigest()
+                try:
+                    waveform = parse_waveform(upload.name, digest, data)
+                except ValueError as e:
+                    st.error(f"**Could not read the waveform:** {e}")
+                else:
+                    wave_id = (upload.name, digest)
+                    n_samples = waveform.size
+
+        if waveform is None:
+            if not upload:
+                st.info("Upload a waveform to simulate.")
+        else:
+            from coilcalc.electrothermal import lumped_theta
+            from coilcalc.transient import cp_cu
+            theta = lumped_theta(res['winding_a_mm'], res['winding_b_actual_mm'], num_pancakes, w_cu_mm, t_cu_mm, t_mylar_mm, t_fiberglass_mm, fiberglass_layers)
+            R20 = hot['R20'] if hot else res['R']
+            T_coolant = T_water_in + dT_water / 2.0
+            transient_args = (dt_s, R20, res['wt_cu_kg'] * cp_cu, float(theta), T_coolant, dT_water, max(1, n_samples // 2000))
+            transient_key = repr((sorted(waveform.items()) if isinstance(waveform, dict) else wave_id, transient_args))
+            if st.button("▶️ Run Transient", type="primary"):
+                with st.spinner(f"Integrating {n_samples:,} samples..."):
+                    st.session_state["transient"] = (transient_key, run_transient(waveform, *transient_args))
+
+            if st.session_state.get("transient", (None,))[0] != transient_key:
+                st.info(f"Run the transient to integrate {n_samples:,} samples. After a design or waveform change it runs again on request.")
+            else:
+                tr = st.session_state["transient"][1]
+                if tr['gain_peak'] >= 1.0:
+                    st.warning(f"At {tr['I_peak_A']:.0f} A the resistance rises faster with temperature than the cooling can keep up: the winding heats without bound for as long as that current is on.")
+                col_tr1, col_tr2, col_tr3, col_tr4 = st.columns(4)
+                col_tr1.metric("Peak Winding Temp", f"{tr['T_peak_C']:.1f} °C", f"at t = {tr['t_peak_s']:.1f} s; final {tr['T_final_C']:.1f} °C", delta_color="off")
+                col_tr2.metric("RMS Current", f"{tr['I_rms_A']:.1f} A", f"peak {tr['I_peak_A']:.1f} A", delta_color="off")
+                col_tr3.metric("Dissipated Energy", f"{tr['energy_J'] / 1e3:,.1f} kJ", f"mean {tr['mean_power_W']:.1f} W", delta_color="off")
+                col_tr4.metric("Required Cooling", f"{tr['Flow_LPM']:.2f} L/min", f"peak {tr['Flow_peak_LPM']:.2f} L/min", delta_color="off")
+                st.caption(f"{tr['samples']:,} samples ({tr['duration_s']:,.1f} s) in {tr['seconds']:.2f} s. Heat capacity {res['wt_cu_kg'] * cp_cu / 1e3:.1f} kJ/K, thermal resistance {float(theta):.4f} K/W (time constant {res['wt_cu_kg'] * cp_cu * float(theta):.0f} s).")
+
+                df_tr = pd.DataFrame({"Time (s)": tr['trace']['t_s'], "Max Winding Temp (°C)": tr['trace']['T_max_C'], "Min Winding Temp (°C)": tr['trace']['T_min_C']})
+                st.line_chart(df_tr, x="Time (s)", y=["Max Winding Temp (°C)", "Min Winding Temp (°C)"])
+    profiling.lap("tab: Transient")
+
+    with tab9:
+        st.subheader("Best-Fit Standard Stock")
+        st.caption(f"Ranks foil × film combinations from the built-in catalog ({len(get_stock_catalog()):,} SKUs) that fit the current radial window, stack and operating point. A target NI winds each combination with just enough turns; without one it fills the space.")
+        col_s1, col_s2, col_s3, col_s4 = st.columns(4)
+        stock_NI = col_s1.number_input("Target Ampere-Turns (0 = fill space)", min_value=0.0, value=float(res['NI']), step=100.0, format="%.0f")
+        stock_J = col_s2.number_input("Max Current Density (A/mm², 0 = any)", min_value=0.0, value=0.0, step=0.5, format="%.2f")
+        stock_mass = col_s3.number_input("Mass Budget (kg, 0 = any)", min_value=0.0, value=0.0, step=1.0, format="%.1f")
+        rank_labels = {"P": "Power", "wt_total_kg": "Total Mass", "Flow_LPM": "Required Cooling", "J_A_mm2": "Current Density", "NI": "Ampere-Turns (max)", "unused_space_mm": "Radial Slack"}
+        stock_rank = col_s4.selectbox("Rank By", list(rank_labels), format_func=rank_labels.get)
+        col_s5, col_s6 = st.columns(2)
+        stock_overhang = col_s5.slider("Mylar Overhang (mm)", 0.0, 5.0, (0.3, 2.0), 0.1, help="Allowed film width minus foil width.")
+        stock_cloth = col_s6.number_input("Min Interface Cloth (mm)", min_value=0.0, value=float(t_fiberglass_mm), step=0.01, format="%.3f", help="The thinnest glass cloth of at least this thickness is used.")
+
+        ranked, stock_stats = run_stock_search(
+            a_mm=a_mm, b_max_mm=b_max_mm, plate_margin_mm=plate_margin_mm, num_pancakes=num_pancakes,
+            cooling_plates_mm=tuple(cooling_plates_mm), I_const=I_const, NI_min=stock_NI or None, J_max=stock_J or None,
+            mass_max_kg=stock_mass or None, min_cloth_mm=stock_cloth, overhang_mm=stock_overhang, rank_by=stock_rank,
+            turn_model=turn_model, MLT_input_m=MLT_input_m, fiberglass_layers=fiberglass_layers, dT_water=dT_water,
+        )
+        st.caption(f"{stock_stats['candidates']:,} combinations, {stock_stats['evaluated']:,} left after pruning on the catalog index, {stock_stats['feasible']:,} meet the limits ({stock_stats['seconds'] * 1e3:.1f} ms).")
+
+        if not ranked['foil_sku'].size:
+            st.warning("No stock combination in the catalog meets these limits.")
+        else:
+            df_stock = pd.DataFrame({
+                "Foil": ranked['foil_sku'], "Film": ranked['film_sku'], "Cloth": ranked['cloth_sku'],
+                "Cu (mm)": [f"{t:.4g} × {w:.4g}" for t, w in zip(ranked['t_cu_mm'], ranked['w_cu_mm'])],
+                "Mylar (mm)": [f"{t:.4g} × {w:.4g}" for t, w in zip(ranked['t_mylar_mm'], ranked['w_mylar_mm'])],
+                "Turns/Pancake": ranked['turns_per_pancake'], "NI (AT)": ranked['NI'], "J (A/mm²)": ranked['J_A_mm2'],
+                "Power (W)": ranked['P'], "Total Mass (kg)": ranked['wt_total_kg'], "Cooling (LPM)": ranked['Flow_LPM'],
+                "Radial Slack (mm)": ranked['unused_space_mm'],
+            }, index=pd.RangeIndex(1, ranked['foil_sku'].size + 1, name="Rank"))
+            st.dataframe(df_stock.style.format({"NI (AT)": "{:,.0f}", "J (A/mm²)": "{:.2f}", "Power (W)": "{:.1f}", "Total Mass (kg)": "{:.2f}", "Cooling (LPM)": "{:.2f}", "Radial Slack (mm)": "{:.2f}"}))
+
+            col_a1, col_a2 = st.columns([3, 1])
+            pick = col_a1.selectbox("Stock Combination", range(ranked['foil_sku'].size), format_func=lambda i: f"#{i + 1}: {ranked['foil_sku'][i]} + {ranked['film_sku'][i]} + {ranked['cloth_sku'][i]}")
+            choice = {k: float(ranked[k][pick]) for k in ("t_cu_mm", "w_cu_mm", "t_mylar_mm", "w_mylar_mm", "t_fiberglass_mm")}
+            choice.update(constraint_mode=2, target_turns_per_pancake=int(ranked['turns_per_pancake'][pick]))
+            col_a2.button("Apply to Design", on_click=apply_stock, args=(choice,), type="primary")
+    profiling.lap("tab: Stock Catalog")
+
+    with tab10:
+        st.subheader("Design History")
+        store = get_result_store()
+        if store is None:
+            st.info("The result store could not be opened, so designs are not being kept between sessions.")
+        else:
+            store_stats = store.stats()
+            st.caption(f"Every evaluated design is kept in {store.path} ({store_stats['designs']:,} designs, {store_stats['bytes'] / 2**20:.1f} of {store_stats['max_bytes'] / 2**20:.0f} MB; least recently used designs are dropped first). This process: {store_stats['hits']:,} hits, {store_stats['misses']:,} misses.")
+            history = store.recent(200)
+            if not history:
+                st.info("No stored designs yet.")
+            else:
+                df_hist = pd.DataFrame({
+                    "Last Used": pd.to_datetime([h['last_access'] for h in history], unit="s"),
+                    "Source": [h['source'] for h in history],
+                    "Pancakes": [h['num_pancakes'] for h in history],
+                    "Plate ID/OD (mm)": [f"{2 * h['a_mm']:g} / {2 * h['b_max_mm']:g}" for h in history],
+                    "Cu (mm)": [f"{h['t_cu_mm']:.4g} × {h['w_cu_mm']:.4g}" for h in history],
+                    "Mylar (mm)": [f"{h['t_mylar_mm']:.4g} × {h['w_mylar_mm']:.4g}" for h in history],
+                    "Current (A)": [h['I_const'] for h in history],
+                    "Turns/Pancake": [h['turns_per_pancake'] for h in history],
+                    "NI (AT)": [h['NI'] for h in history], "Power (W)": [h['P'] for h in history],
+                    "Total Mass (kg)": [h['wt_total_kg'] for h in history], "Cooling (LPM)": [h['Flow_LPM'] for h in history],
+                    "Key": [h['key'] for h in history],
+                })
+                st.dataframe(df_hist.style.format({"Current (A)": "{:.1f}", "NI (AT)": "{:,.0f}", "Power (W)": "{:.1f}", "Total Mass (kg)": "{:.2f}", "Cooling (LPM)": "{:.2f}"}), hide_index=True)
+
+                col_h1, col_h2, col_h3 = st.columns([3, 1, 1])
+                pick = col_h1.selectbox("Stored Design", range(len(history)), format_func=lambda i: f"{history[i]['key']}: {history[i]['num_pancakes']} × {history[i]['turns_per_pancake']} turns, {history[i]['t_cu_mm']:.4g} × {history[i]['w_cu_mm']:.4g} mm Cu, {history[i]['NI']:,.0f} AT")
+                col_h2.button("Load Design", on_click=load_stored_design, args=(history[pick],), type="primary")
+                col_h3.button("Clear Store", on_click=store.clear)
+
+                def export_store():
+                    from coilcalc.export import export_bytes
+                    return export_bytes(store.iter_columns(), export_fmt)[0]
+
+                suffix, mime = download_type(export_fmt)
+                # Built on click, streaming the store chunk by chunk
+                st.download_button(f"📥 Download All {store_stats['designs']:,} Stored Designs", data=export_store,
+                                   file_name="pancake_coil_designs" + suffix, mime=mime, on_click="ignore")
+
+        st.divider()
+        st.subheader("Results Browser")
+        st.caption("Opens a results file from the server's results directory (batch output of `python -m coilcalc`, or any download above). Arrow files are memory-mapped, so only the rows on screen are read, even for millions of designs.")
+        results_name = None
+        if not RESULTS_DIR:
+            st.info("Set `COILCALC_RESULTS_DIR` to a directory of results files (.arrow, .parquet, .csv[.gz]) to browse them here.")
+        else:
+            results_name = st.selectbox("Results File", list_results_files(RESULTS_DIR), index=None, placeholder=f"Files in {RESULTS_DIR}")
+        if results_name:
+            try:
+                results_path = resolve_results_file(RESULTS_DIR, results_name)
+                results = open_results_file(str(results_path), os.path.getmtime(results_path))
+            except (OSError, ValueError) as e:
+                st.error(f"**Could not open results:** {e}")
+            else:
+                page_rows = 1000
+                n_pages = max(1, -(-results.num_rows // page_rows))
+                col_b1, col_b2 = st.columns([1, 3])
+                page = col_b1.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1, step=1)
+                col_b2.caption(f"{results.num_rows:,} rows × {results.num_columns} columns, {results.nbytes / 2**20:,.1f} MB of columns.")
+                st.dataframe(results.slice((page - 1) * page_rows, page_rows).to_pandas(), hide_index=True)
+    profiling.lap("tab: History")
+
+finish_run()
@@ -0,0 +1,375 @@
+"""Headless benchmarks for the calculation core: python -m benchmarks.bench [options]
+
+Covers import time, single-design latency, batch throughput (1e3 to 1e7 designs), SVG
+generation against pancake count, result export size/time, transient throughput (1e6
+and 1e7 waveform samples) and HTTP API request throughput. Every run first checks the physics against
+benchmarks/reference.json, then saves timings to benchmarks/results/<commit>.json;
+--baseline compares against an earlier run and flags anything slower than --threshold.
+Imports are also held to IMPORT_BUDGET.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from coilcalc.batch import iter_batches, optimize_pancake_coil_batch
+from coilcalc.core import DEFAULT_INPUTS, RESULT_FIELDS, optimize_pancake_coil
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REFERENCE_PATH = os.path.join(HERE, "reference.json")
+RESULTS_DIR = os.path.join(HERE, "results")
+
+# Designs whose outputs are pinned in reference.json: one per code path of the physics
+REFERENCE_CASES = {
+    "default": {},
+    "max_turns": {"constraint_mode": 1},
+    "fixed_mlt": {"MLT_input_m": 0.75},
+    "spiral": {"turn_model": "spiral"},
+    "tall_stack": {"num_pancakes": 6, "cooling_plates_mm": [6.0, 4.0, 6.0, 4.0], "I_const": 120.0},
+    "thin_tape": {"t_cu_mm": 0.2, "w_cu_mm": 25.4, "w_mylar_mm": 26.0, "target_turns_per_pancake": 300},
+}
+
+HEAVY_PACKAGES = ("numpy", "pandas", "scipy", "pyarrow", "streamlit")
+
+# Import-time budget per entry point: max ms spent in coilcalc's own modules (numpy and the
+# interpreter excluded, so the figure is comparable across machines) and the third-party
+# packages the import must not pull in. Process-pool workers and the CLI start from these.
+IMPORT_BUDGET = {
+    "coilcalc.core": (10.0, HEAVY_PACKAGES),
+    "coilcalc.schematic": (10.0, HEAVY_PACKAGES),
+    "coilcalc.batch": (15.0, ("pandas", "scipy", "pyarrow", "streamlit")),
+    "coilcalc.cli": (20.0, ("pandas", "scipy", "pyarrow", "streamlit")),
+    "coilcalc.pareto": (20.0, ("pandas", "scipy", "pyarrow", "streamlit")),
+    "coilcalc.server": (20.0, ("pandas", "scipy", "pyarrow", "streamlit")),
+}
+
+
+# --- TIMING ---
+def _time(fn, number=1, repeat=7):
+    """Best and median wall time (s) of one call, over `repeat` rounds of `number` calls."""
+    rounds = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - t0) / number)
+    return {"seconds": min(rounds), "median_seconds": float(np.median(rounds))}
+
+
+def _sweep(n):
+    """Grid of n designs (t_cu x w_cu x turns x current), as broadcastable batch inputs."""
+    n_t = 10
+    n_w = 10 if n >= 1000 else 1
+    n_i = 10 if n >= 100_000 else 1
+    n_turns = n // (n_t * n_w * n_i)
+    return dict(
+        t_cu_mm=np.linspace(0.2, 0.6, n_t)[:, None, None, None],
+        w_cu_mm=np.linspace(20.0, 50.0, n_w)[None, :, None, None],
+        w_mylar_mm=np.linspace(20.7, 50.7, n_w)[None, :, None, None],
+        target_turns_per_pancake=np.arange(10, 10 + n_turns)[None, None, :, None],
+        I_const=np.linspace(20.0, 200.0, n_i)[None, None, None, :],
+        b_max_mm=1000.0,
+    )
+
+
+# --- BENCHMARKS ---
+def _import_profile(module):
+    """Total and coilcalc-only import time (s) of `module` in a fresh interpreter, and heavy packages loaded."""
+    code = f"import sys, {module}; print(','.join(p for p in {HEAVY_PACKAGES!r} if p in sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=os.path.dirname(HERE),
+                          capture_output=True, text=True, check=True)
+    own_us = total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (x.strip() for x in line[len("import time:"):].split("|"))
+        if name.startswith("coilcalc"):
+            own_us += int(self_us)
+        if name == module:
+            total_us = int(cumulative_us)
+    loaded = [p for p in proc.stdout.strip().split(",") if p]
+    return total_us / 1e6, own_us / 1e6, loaded
+
+
+def bench_import(quick):
+    out = {}
+    for module, (budget_ms, forbidden) in IMPORT_BUDGET.items():
+        runs = [_import_profile(module) for _ in range(3 if quick else 7)]
+        total = [r[0] for r in runs]
+        own_ms = min(r[1] for r in runs) * 1e3
+        loaded = runs[0][2]
+        over = [f"{own_ms:.1f} ms > {budget_ms:.0f} ms budget"] if own_ms > budget_ms else []
+        over += [f"loads {p}" for p in loaded if p in forbidden]
+        out[f"import_{module}"] = {"seconds": min(total), "median_seconds": float(np.median(total)),
+                                   "own_ms": own_ms, "budget_ms": budget_ms, "loads": loaded, "over_budget": over}
+    return out
+
+
+def bench_single(quick):
+    out = {}
+    for name, turn_model in (("single_design", "mlt"), ("single_design_spiral", "spiral")):
+        r = _time(lambda: optimize_pancake_coil(**DEFAULT_INPUTS, turn_model=turn_model), number=200 if quick else 2000)
+        out[name] = {**r, "us_per_design": r["seconds"] * 1e6}
+    return out
+
+
+def bench_batch(quick):
+    out = {}
+    sizes = (1_000, 10_000, 100_000, 1_000_000) if quick else (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+    for n in sizes:
+        inputs = _sweep(n)
+
+        def run():
+            if n <= 1_000_000:
+                optimize_pancake_coil_batch(**inputs)
+            else:
+                for _ in iter_batches(chunk_size=1_000_000, **inputs):
+                    pass
+
+        r = _time(run, number=max(1, 100_000 // n), repeat=1 if n >= 1_000_000 else 5)
+        out[f"batch_{n:.0e}".replace("+0", "")] = {**r, "designs": n, "designs_per_s": n / r["seconds"]}
+    return out
+
+
+def bench_svg(quick):
+    from coilcalc.schematic import generate_cross_section_svg
+    out = {}
+    for n in ((2, 20, 200) if quick else (2, 20, 200, 2000)):
+        plates = [6.0] * (n + 1)
+        res = optimize_pancake_coil(**{**DEFAULT_INPUTS, "num_pancakes": n, "cooling_plates_mm": plates})
+        for mode in ("detailed", "compact"):
+            svg = generate_cross_section_svg(res, DEFAULT_INPUTS["a_mm"], DEFAULT_INPUTS["b_max_mm"], "Diameter",
+                                             DEFAULT_INPUTS["plate_margin_mm"], plates, n, mode=mode, show_turns=True)
+            r = _time(lambda: generate_cross_section_svg(res, DEFAULT_INPUTS["a_mm"], DEFAULT_INPUTS["b_max_mm"], "Diameter",
+                                                         DEFAULT_INPUTS["plate_margin_mm"], plates, n, mode=mode, show_turns=True),
+                      number=20 if n < 200 else 2)
+            out[f"svg_{mode}_{n}"] = {**r, "bytes": len(svg.encode("utf-8"))}
+    return out
+
+
+def bench_export(quick):
+    import pandas as pd
+    from coilcalc.cli import evaluate_chunk
+    from coilcalc.export import TableWriter, iter_chunks, open_table
+    out = {}
+
+    # The app's one-row CSV download
+    res = optimize_pancake_coil(**DEFAULT_INPUTS)
+    row = {k: [res[k]] for k in RESULT_FIELDS}
+    r = _time(lambda: pd.DataFrame(row).to_csv(index=False).encode("utf-8"), number=50)
+    out["export_single_csv"] = {**r, "bytes": len(pd.DataFrame(row).to_csv(index=False).encode("utf-8"))}
+
+    # Batch results through the chunked table writers, then read back (Arrow memory-mapped)
+    n = 20_000 if quick else 200_000
+    sweep = _sweep(n)
+    shape = np.broadcast_shapes(*(np.shape(v) for v in sweep.values()))
+    columns = {k: np.broadcast_to(v, shape).ravel() for k, v in sweep.items()}
+    results = evaluate_chunk(columns)
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, suffix in (("csv", ".csv"), ("csv_gz", ".csv.gz"), ("parquet", ".parquet"), ("arrow", ".arrow")):
+            path = os.path.join(tmp, "results" + suffix)
+
+            def write():
+                with TableWriter(path) as writer:
+                    for chunk in iter_chunks(results):
+                        writer.write(chunk)
+
+            try:
+                r = _time(write, repeat=3)
+            except ImportError:
+                continue
+            out[f"export_batch_{fmt}"] = {**r, "rows": n, "bytes": os.path.getsize(path)}
+            if fmt in ("parquet", "arrow"):
+                r = _time(lambda: open_table(path).slice(n // 2, 1000).to_pandas(), repeat=3)
+                out[f"load_slice_{fmt}"] = {**r, "rows": n}
+    return out
+
+
+def bench_transient(quick):
+    from coilcalc.transient import pulse_train, simulate_transient
+    out = {}
+    for n in ((1_000_000,) if quick else (1_000_000, 10_000_000)):
+        r = _time(lambda: simulate_transient(pulse_train(300.0, 0.5, 0.2, n * 1e-3, 1e-3), 1e-3, 0.2247, 9721.0, 0.0116,
+                                             trace_every=n // 1000),
+                  repeat=1 if n > 1_000_000 else 3)
+        out[f"transient_{n:.0e}".replace("+0", "")] = {**r, "samples": n, "samples_per_s": n / r["seconds"]}
+    return out
+
+
+def _load(port, connections, requests, body):
+    """Drives POST /design over keep-alive connections; returns (seconds, latencies)."""
+    import asyncio
+    request = b"POST /design HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+    latencies = []
+
+    async def client():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            writer.write(request)
+            await reader.readline()
+            length = 0
+            while (line := await reader.readline()) != b"\r\n":
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+        writer.close()
+
+    async def run():
+        await asyncio.gather(*(client() for _ in range(connections)))
+
+    t0 = time.perf_counter()
+    asyncio.run(run())
+    return time.perf_counter() - t0, np.array(latencies)
+
+
+def bench_server(quick):
+    """Requests/s of the HTTP API (server in its own process, so client and server don't share a GIL)."""
+    out = {}
+    proc = subprocess.Popen([sys.executable, "-m", "coilcalc.server", "--port", "0", "-j", "1"], cwd=os.path.dirname(HERE),
+                            stderr=subprocess.PIPE, text=True)
+    try:
+        port = int(proc.stderr.readline().split("http://")[1].split()[0].rsplit(":", 1)[1])
+        body = json.dumps({"I_const": 80.0, "num_pancakes": 3}).encode()
+        total = 2_000 if quick else 20_000
+        for connections in (1, 64, 512):
+            seconds, latencies = _load(port, connections, max(1, total // connections), body)
+            out[f"server_design_c{connections}"] = {
+                "seconds": seconds / latencies.size, "requests_per_s": latencies.size / seconds,
+                "p50_ms": float(np.percentile(latencies, 50) * 1e3), "p99_ms": float(np.percentile(latencies, 99) * 1e3),
+            }
+    finally:
+        proc.terminate()
+        proc.wait()
+    return out
+
+
+BENCHMARKS = {"import": bench_import, "single": bench_single, "batch": bench_batch, "svg": bench_svg, "export": bench_export,
+              "transient": bench_transient, "server": bench_server}
+
+
+# --- REFERENCE OUTPUTS ---
+def _reference_outputs():
+    outputs = {}
+    for name, overrides in REFERENCE_CASES.items():
+        inputs = {**DEFAULT_INPUTS, **overrides}
+        res = optimize_pancake_coil(**inputs)
+        outputs[name] = {"inputs": overrides, "outputs": {k: res[k] for k in RESULT_FIELDS}}
+    return outputs
+
+
+def check_reference(rtol=1e-9):
+    """Compares scalar and batch results with the pinned reference; returns a list of mismatches."""
+    with open(REFERENCE_PATH) as f:
+        reference = json.load(f)
+    mismatches = []
+    for name, case in reference.items():
+        inputs = {**DEFAULT_INPUTS, **case["inputs"]}
+        scalar = optimize_pancake_coil(**inputs)
+        batch_inputs = {k: v for k, v in inputs.items() if k != "cooling_plates_mm"}
+        batch_inputs["plates_axial_mm"] = sum(inputs["cooling_plates_mm"])
+        batch = optimize_pancake_coil_batch(**batch_inputs)
+        for k, expected in case["outputs"].items():
+            for path, value in (("scalar", scalar[k]), ("batch", batch[k].item())):
+                if isinstance(expected, (bool, str)) or expected is None:
+                    ok = value == expected
+                else:
+                    ok = np.isclose(value, expected, rtol=rtol, atol=0.0)
+                if not ok:
+                    mismatches.append(f"{name}.{k} ({path}): {value!r} != {expected!r}")
+    return mismatches
+
+
+# --- RESULTS ---
+def _commit():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE, capture_output=True, text=True)
+        return rev.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline, threshold):
+    """Lines of a comparison table and the names of benchmarks slower than 1 + threshold."""
+    lines, regressions = [], []
+    for name, r in results.items():
+        for problem in r.get("over_budget", ()):
+            lines.append(f"{name:32s} {problem}  << OVER BUDGET")
+            regressions.append(name)
+        base = baseline.get(name)
+        if not base:
+            lines.append(f"{name:32s} {r['seconds'] * 1e3:12.3f} ms  (new)")
+            continue
+        ratio = r["seconds"] / base["seconds"]
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = "  << REGRESSION"
+            regressions.append(name)
+        lines.append(f"{name:32s} {r['seconds'] * 1e3:12.3f} ms  {base['seconds'] * 1e3:12.3f} ms  x{ratio:5.2f}{flag}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run only these groups (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes (batch up to 1e6, SVG up to 200 pancakes)")
+    parser.add_argument("--out", help="result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="flag benchmarks slower than baseline by this fraction (default: 0.25)")
+    parser.add_argument("--update-reference", action="store_true", help="re-pin reference.json from the current code and exit")
+    args = parser.parse_args(argv)
+
+    if args.update_reference:
+        with open(REFERENCE_PATH, "w") as f:
+            json.dump(_reference_outputs(), f, indent=1)
+            f.write("\n")
+        print(f"wrote {REFERENCE_PATH}")
+        return 0
+
+    mismatches = check_reference()
+    for m in mismatches:
+        print(f"REFERENCE MISMATCH {m}", file=sys.stderr)
+    if mismatches:
+        return 2
+
+    results = {}
+    for group in args.only or BENCHMARKS:
+        results.update(BENCHMARKS[group](args.quick))
+
+    commit = _commit()
+    report = {
+        "meta": {"commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "quick": args.quick,
+                 "python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+                 "cpus": os.cpu_count()},
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=1)
+        f.write("\n")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    lines, regressions = compare(results, baseline, args.threshold)
+    print(f"{'benchmark':32s} {'this run':>15s}  {'baseline':>15s}" if baseline else f"{'benchmark':32s} {'this run':>15s}")
+    print("\n".join(lines))
+    print(f"\nsaved {out}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} or over budget: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
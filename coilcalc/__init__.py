@@ -0,0 +1 @@
+"""Calculation core for the Pancake Coil Designer (importable without Streamlit)."""
@@ -0,0 +1,5 @@
+import sys
+
+from coilcalc.cli import main
+
+sys.exit(main())
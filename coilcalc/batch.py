@@ -0,0 +1,202 @@
+"""Vectorized batch engine: optimize_pancake_coil() over arrays of designs."""
+import numpy as np
+
+from coilcalc.core import (CONSTRAINT_TYPES, DEFAULT_INPUTS, SHAPE_TYPES, _check_turn_model, cp_water, density_al,
+                           density_cu, density_epoxy, density_mylar, rho, rho_water, spiral_arc_length_mm)
+
+
+# ================= VECTORIZED BATCH ENGINE =================
+def _batch_inputs(inputs):
+    """Merges inputs over DEFAULT_INPUTS and broadcasts them to one common shape."""
+    unknown = set(inputs) - set(DEFAULT_INPUTS) - {"plates_axial_mm"}
+    if unknown:
+        raise TypeError(f"Unknown design inputs: {', '.join(sorted(unknown))}")
+
+    merged = {**DEFAULT_INPUTS, **inputs}
+    plates = merged.pop("cooling_plates_mm")
+    if "plates_axial_mm" not in inputs:
+        if isinstance(plates, np.ndarray) and plates.ndim == 2:
+            # One plate stack per row (pad shorter stacks with 0.0)
+            merged["plates_axial_mm"] = plates.sum(axis=1)
+        else:
+            merged["plates_axial_mm"] = float(sum(plates))
+
+    names = list(merged)
+    arrays = np.broadcast_arrays(*[np.asarray(merged[k]) for k in names])
+    return dict(zip(names, arrays))
+
+
+def optimize_pancake_coil_batch(turn_model="mlt", **inputs):
+    """Vectorized optimize_pancake_coil(): takes arrays of design inputs, returns columnar results.
+
+    Every keyword of DEFAULT_INPUTS may be a scalar or an array; all are broadcast together
+    and missing ones fall back to the app defaults. `cooling_plates_mm` is either one shared
+    stack (a list) or a 2D array with one stack per row; `plates_axial_mm` may be given
+    instead as the per-row total plate thickness. `turn_model` applies to every row.
+
+    Designs optimize_pancake_coil() rejects with DesignError are flagged through masks instead:
+    `dims_ok` (positive copper and mylar dimensions, at least one pancake), `mylar_ok` (mylar
+    at least as wide as the copper), `turns_ok` (at least one turn) and `valid` (all three).
+    Columns of invalid rows are still filled but carry no meaning.
+    Valid rows match the scalar path up to floating-point rounding (a few ulp).
+    """
+    _check_turn_model(turn_model)
+    d = _batch_inputs(inputs)
+
+    a_mm = d["a_mm"].astype(float)
+    b_max_mm = d["b_max_mm"].astype(float)
+    plate_margin_mm = d["plate_margin_mm"].astype(float)
+    t_cu_mm = d["t_cu_mm"].astype(float)
+    w_cu_mm = d["w_cu_mm"].astype(float)
+    t_mylar_mm = d["t_mylar_mm"].astype(float)
+    w_mylar_mm = d["w_mylar_mm"].astype(float)
+    num_pancakes = d["num_pancakes"].astype(np.int64)
+    I_const = d["I_const"].astype(float)
+    dT_water = d["dT_water"].astype(float)
+    MLT_input_m = d["MLT_input_m"].astype(float)
+    space_mode = d["constraint_mode"] == 1
+
+    dims_ok = (np.minimum(np.minimum(t_cu_mm, w_cu_mm), np.minimum(t_mylar_mm, w_mylar_mm)) > 0) & (num_pancakes >= 1)
+    mylar_ok = ~(w_mylar_mm < w_cu_mm)
+
+    winding_a_mm = a_mm + plate_margin_mm
+    winding_b_max_mm = b_max_mm - plate_margin_mm
+    available_build_mm = winding_b_max_mm - winding_a_mm
+    layer_thickness_mm = t_cu_mm + t_mylar_mm
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        max_turns = np.floor(available_build_mm / layer_thickness_mm)
+    max_turns = np.where(np.isfinite(max_turns), max_turns, 0.0).astype(np.int64)
+    N_per_pancake = np.where(space_mode, max_turns, d["target_turns_per_pancake"].astype(np.int64))
+    turns_ok = N_per_pancake > 0
+
+    actual_build_mm = N_per_pancake * layer_thickness_mm
+    winding_b_actual_mm = winding_a_mm + actual_build_mm
+    unused_space_mm = available_build_mm - actual_build_mm
+    fits_window = actual_build_mm <= available_build_mm
+
+    fixed_mlt = MLT_input_m > 0
+    if turn_model == "spiral":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            circular_mlt_m = spiral_arc_length_mm(winding_a_mm, layer_thickness_mm, N_per_pancake) / N_per_pancake / 1000.0
+        shape_code = np.where(fixed_mlt, 1, 2)
+    else:
+        mean_radius_mm = winding_a_mm + (actual_build_mm / 2.0)
+        circular_mlt_m = (2 * np.pi * mean_radius_mm) / 1000.0
+        shape_code = fixed_mlt.astype(np.intp)
+    MLT_m = np.where(fixed_mlt, MLT_input_m, circular_mlt_m)
+
+    w_pancake_axial_mm = w_mylar_mm
+    total_pancakes_axial_mm = num_pancakes * w_pancake_axial_mm
+    total_plates_axial_mm = d["plates_axial_mm"].astype(float)
+    interface_thickness_mm = d["fiberglass_layers"] * d["t_fiberglass_mm"].astype(float)
+    num_interfaces = num_pancakes * 2
+    total_insulation_axial_mm = num_interfaces * interface_thickness_mm
+    total_assembly_axial_mm = total_pancakes_axial_mm + total_plates_axial_mm + total_insulation_axial_mm
+
+    total_turns = N_per_pancake * num_pancakes
+    total_length_m = total_turns * MLT_m
+    with np.errstate(divide="ignore", invalid="ignore"):
+        length_per_pancake_m = total_length_m / num_pancakes
+
+    # Weight, Volume & Current Density Math
+    t_cu_m = t_cu_mm / 1000.0
+    w_cu_m = w_cu_mm / 1000.0
+    A_cu = t_cu_m * w_cu_m
+    A_cu_mm2 = t_cu_mm * w_cu_mm
+    with np.errstate(divide="ignore", invalid="ignore"):
+        J_A_mm2 = I_const / A_cu_mm2
+
+    volume_cu_m3 = A_cu * total_length_m
+    weight_cu_kg = volume_cu_m3 * density_cu
+
+    # Mylar Weight Math
+    t_mylar_m = t_mylar_mm / 1000.0
+    w_mylar_m = w_mylar_mm / 1000.0
+    A_mylar = t_mylar_m * w_mylar_m
+    volume_mylar_m3 = A_mylar * total_length_m
+    weight_mylar_kg = volume_mylar_m3 * density_mylar
+
+    r_in_m = a_mm / 1000.0
+    plate_r_out_m = (winding_a_mm + actual_build_mm + plate_margin_mm) / 1000.0
+    area_plate_m2 = np.pi * (plate_r_out_m**2 - r_in_m**2)
+    total_plates_axial_m = total_plates_axial_mm / 1000.0
+    volume_al_m3 = area_plate_m2 * total_plates_axial_m
+    weight_al_kg = volume_al_m3 * density_al
+
+    r_out_max_m = b_max_mm / 1000.0
+    v_gross_mold_m3 = np.pi * (r_out_max_m**2 - r_in_m**2) * (total_assembly_axial_mm / 1000.0)
+    winding_a_m = winding_a_mm / 1000.0
+    winding_b_m = winding_b_actual_mm / 1000.0
+    v_winding_block_m3 = np.pi * (winding_b_m**2 - winding_a_m**2) * (total_pancakes_axial_mm / 1000.0)
+    v_plates_insul_m3 = np.pi * (plate_r_out_m**2 - r_in_m**2) * ((total_plates_axial_mm + total_insulation_axial_mm) / 1000.0)
+
+    volume_epoxy_m3 = np.maximum(0.0, v_gross_mold_m3 - v_winding_block_m3 - v_plates_insul_m3)
+    vol_epoxy_L = volume_epoxy_m3 * 1000.0
+    weight_epoxy_kg = volume_epoxy_m3 * density_epoxy
+
+    total_weight_kg = weight_cu_kg + weight_al_kg + weight_mylar_kg + weight_epoxy_kg
+
+    # Electrical Math
+    with np.errstate(divide="ignore", invalid="ignore"):
+        R_total = rho * (total_length_m / A_cu)
+        V_req = I_const * R_total
+        P_total = (I_const ** 2) * R_total
+        NI_total = total_turns * I_const
+        mass_flow_kg_per_s = P_total / (cp_water * dT_water)
+        vol_flow_L_per_min = (mass_flow_kg_per_s / rho_water) * 1000.0 * 60.0
+
+    constraint_labels = np.array([CONSTRAINT_TYPES[2], CONSTRAINT_TYPES[1]], dtype=object)
+    shape_labels = np.array(SHAPE_TYPES, dtype=object)
+
+    return {
+        "valid": dims_ok & mylar_ok & turns_ok,
+        "dims_ok": dims_ok,
+        "mylar_ok": mylar_ok,
+        "turns_ok": turns_ok,
+        "constraint_type": constraint_labels[space_mode.astype(np.intp)],
+        "winding_a_mm": winding_a_mm,
+        "winding_b_actual_mm": winding_b_actual_mm,
+        "available_space_mm": available_build_mm,
+        "unused_space_mm": unused_space_mm,
+        "fits_window": fits_window,
+        "turns_per_pancake": N_per_pancake,
+        "total_turns": total_turns,
+        "MLT_m": MLT_m,
+        "shape_type": shape_labels[shape_code],
+        "length_m": total_length_m,
+        "length_per_pancake_m": length_per_pancake_m,
+        "A_cu_mm2": A_cu_mm2,
+        "J_A_mm2": J_A_mm2,
+        "build_mm": actual_build_mm,
+        "wt_cu_kg": weight_cu_kg,
+        "wt_al_kg": weight_al_kg,
+        "wt_mylar_kg": weight_mylar_kg,
+        "vol_epoxy_L": vol_epoxy_L,
+        "wt_epoxy_kg": weight_epoxy_kg,
+        "wt_total_kg": total_weight_kg,
+        "R": R_total,
+        "V": V_req,
+        "P": P_total,
+        "NI": NI_total,
+        "Flow_LPM": vol_flow_L_per_min,
+        "ax_pancakes_mm": total_pancakes_axial_mm,
+        "ax_plates_mm": total_plates_axial_mm,
+        "ax_insul_mm": total_insulation_axial_mm,
+        "ax_total_mm": total_assembly_axial_mm
+    }
+
+
+def iter_batches(chunk_size=1_000_000, turn_model="mlt", **inputs):
+    """Evaluates a large broadcast sweep in chunks of rows so peak memory stays bounded.
+
+    Yields (start, stop, results) with row indices into the flattened broadcast shape.
+    """
+    d = _batch_inputs(inputs)
+    shape = next(iter(d.values())).shape
+    n = int(np.prod(shape))
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        # Index the broadcast views directly so the full sweep is never materialized
+        idx = np.unravel_index(np.arange(start, stop), shape)
+        yield start, stop, optimize_pancake_coil_batch(turn_model, **{k: v[idx] for k, v in d.items()})
@@ -0,0 +1,191 @@
+"""Catalog of standard foil, film and glass-cloth stock, and a best-fit search over it."""
+import csv
+import math
+import os
+import time
+
+import numpy as np
+
+from coilcalc.batch import optimize_pancake_coil_batch
+from coilcalc.core import DEFAULT_INPUTS
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalog.csv")
+KINDS = ("foil", "film", "cloth")
+
+# Result columns a search can rank by, with their sense: +1 = minimize, -1 = maximize.
+RANK_BY = {"P": 1.0, "wt_total_kg": 1.0, "Flow_LPM": 1.0, "J_A_mm2": 1.0, "NI": -1.0, "unused_space_mm": 1.0}
+
+# Columns of the ranked table, ahead of the design results.
+STOCK_FIELDS = ("foil_sku", "film_sku", "cloth_sku", "t_cu_mm", "w_cu_mm", "t_mylar_mm", "w_mylar_mm", "t_fiberglass_mm")
+
+_loaded = {}
+
+
+class StockTable:
+    """One kind of stock as parallel arrays, sorted by (thickness, width).
+
+    Rows of equal thickness form a group whose widths are sorted, so a thickness range is
+    one searchsorted on the group thicknesses and a width range is one searchsorted inside
+    each group.
+    """
+
+    def __init__(self, sku, thickness_mm, width_mm, description):
+        thickness_mm = np.asarray(thickness_mm, dtype=float)
+        width_mm = np.asarray(width_mm, dtype=float)
+        order = np.lexsort((width_mm, thickness_mm))
+        self.sku = np.asarray(sku, dtype=object)[order]
+        self.description = np.asarray(description, dtype=object)[order]
+        self.thickness_mm = thickness_mm[order]
+        self.width_mm = width_mm[order]
+        self.group_start = np.flatnonzero(np.r_[True, self.thickness_mm[1:] != self.thickness_mm[:-1]])
+        self.group_end = np.r_[self.group_start[1:], self.thickness_mm.size]
+        self.group_thickness_mm = self.thickness_mm[self.group_start]
+
+    def __len__(self):
+        return self.sku.size
+
+
+class Catalog:
+    """Stock tables by kind (see KINDS), built from one or more catalog CSV files."""
+
+    def __init__(self, rows):
+        self.tables = {}
+        for kind in KINDS:
+            sel = [r for r in rows if r["kind"] == kind]
+            self.tables[kind] = StockTable([r["sku"] for r in sel], [float(r["thickness_mm"]) for r in sel],
+                                           [float(r["width_mm"]) for r in sel], [r.get("description", "") for r in sel])
+
+    def __getitem__(self, kind):
+        return self.tables[kind]
+
+    def __len__(self):
+        return sum(len(t) for t in self.tables.values())
+
+
+def _read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(line for line in f if not line.startswith("#")))
+    missing = {"sku", "kind", "thickness_mm", "width_mm"} - set(rows[0] if rows else ())
+    if missing:
+        raise ValueError(f"{path}: missing catalog columns {', '.join(sorted(missing))}")
+    unknown = {r["kind"] for r in rows} - set(KINDS)
+    if unknown:
+        raise ValueError(f"{path}: unknown stock kinds {', '.join(sorted(unknown))} (expected {', '.join(KINDS)})")
+    return rows
+
+
+def load_catalog(*extra_paths, builtin=True):
+    """The built-in catalog plus any extra CSV files with the same columns.
+
+    Catalogs are kept per (paths, modification times) for the life of the process, so
+    every caller and session shares the sorted index until a file changes.
+    """
+    paths = ((CATALOG_PATH,) if builtin else ()) + tuple(os.fspath(p) for p in extra_paths)
+    key = tuple((p, os.path.getmtime(p)) for p in paths)
+    if key not in _loaded:
+        rows = [r for p in paths for r in _read_rows(p)]
+        _loaded[key] = Catalog(rows)
+    return _loaded[key]
+
+
+# ================= BEST-FIT SEARCH =================
+def _film_pairs(foil, film, t_max_mm, overhang_mm):
+    """(foil index, film index) of the pairs worth evaluating.
+
+    A pair needs w_film - w_foil within `overhang_mm` and t_foil + t_film <= t_max_mm[foil].
+    A wider film of the same thickness only adds mass, so each foil only pairs with the
+    narrowest fitting film of every thickness. One vectorized pass per film thickness
+    group: the thickness bound picks the foils, the overhang window is a searchsorted on
+    that group's sorted widths.
+    """
+    lo_w, hi_w = overhang_mm
+    fi_parts, mi_parts = [], []
+    for g0, g1, t in zip(film.group_start, film.group_end, film.group_thickness_mm):
+        foils = np.flatnonzero(foil.thickness_mm + t <= t_max_mm)
+        if not foils.size:
+            continue
+        widths = film.width_mm[g0:g1]
+        lo = np.searchsorted(widths, foil.width_mm[foils] + lo_w - 1e-9, side="left")
+        hit = lo < widths.size
+        hit[hit] = widths[lo[hit]] <= foil.width_mm[foils[hit]] + hi_w + 1e-9
+        fi_parts.append(foils[hit])
+        mi_parts.append(g0 + lo[hit])
+    if not fi_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(fi_parts), np.concatenate(mi_parts)
+
+
+def best_fit(catalog, a_mm, b_max_mm, plate_margin_mm, num_pancakes, cooling_plates_mm, I_const,
+             NI_min=None, J_max=None, mass_max_kg=None, min_cloth_mm=0.0, overhang_mm=(0.3, 2.0),
+             rank_by="P", top=25, turn_model="mlt", **fixed):
+    """Ranks real foil x film stock combinations that fit the radial window.
+
+    With NI_min every pair is wound with just enough turns for it (turns constrained),
+    otherwise it fills the window (max turns). Candidates are pruned on the sorted index
+    before anything is evaluated: J_max sets a minimum foil cross-section, the turn count
+    a maximum pitch, and the film must overhang the foil by `overhang_mm` (min, max). The
+    thinnest cloth of at least `min_cloth_mm` is used for the interfaces. Survivors are
+    evaluated in one batch, filtered on NI_min, J_max and mass_max_kg (total assembly)
+    and the best `top` by `rank_by` (see RANK_BY), lighter first on ties, are returned.
+    Other optimize_pancake_coil() inputs can be fixed through `fixed`.
+
+    Returns (ranked, stats): STOCK_FIELDS + result columns as arrays, and search statistics.
+    """
+    t0 = time.perf_counter()
+    if rank_by not in RANK_BY:
+        raise ValueError(f"rank_by must be one of {', '.join(RANK_BY)}, not {rank_by!r}")
+    foil, film, cloth = catalog["foil"], catalog["film"], catalog["cloth"]
+    available_mm = (b_max_mm - plate_margin_mm) - (a_mm + plate_margin_mm)
+    n_turns = max(1, math.ceil(NI_min / (num_pancakes * I_const))) if NI_min else None
+    stats = {"skus": len(catalog), "candidates": len(foil) * len(film), "pruned": 0, "evaluated": 0, "feasible": 0}
+
+    cloth_ok = np.flatnonzero(cloth.thickness_mm >= min_cloth_mm - 1e-9)
+    foil_ok = np.ones(len(foil), dtype=bool)
+    if J_max:
+        foil_ok &= foil.thickness_mm * foil.width_mm >= I_const / J_max
+    # Pitch bound: n_turns (or at least one turn) must fit the window
+    t_max_mm = np.where(foil_ok, available_mm / (n_turns or 1), -np.inf)
+    fi, mi = _film_pairs(foil, film, t_max_mm, overhang_mm)
+    stats["pruned"] = stats["candidates"] - fi.size
+
+    ranked = {k: np.empty(0) for k in STOCK_FIELDS}
+    if fi.size and cloth_ok.size:
+        ci = cloth_ok[np.argmin(cloth.thickness_mm[cloth_ok])]
+        inputs = {k: v for k, v in {**DEFAULT_INPUTS, **fixed}.items() if k != "cooling_plates_mm"}
+        inputs.update(
+            constraint_mode=2 if n_turns else 1, target_turns_per_pancake=n_turns or 1,
+            a_mm=a_mm, b_max_mm=b_max_mm, plate_margin_mm=plate_margin_mm, num_pancakes=num_pancakes,
+            plates_axial_mm=float(sum(cooling_plates_mm)), I_const=I_const,
+            t_cu_mm=foil.thickness_mm[fi], w_cu_mm=foil.width_mm[fi],
+            t_mylar_mm=film.thickness_mm[mi], w_mylar_mm=film.width_mm[mi],
+            t_fiberglass_mm=cloth.thickness_mm[ci],
+        )
+        res = optimize_pancake_coil_batch(turn_model, **inputs)
+        stats["evaluated"] = fi.size
+
+        ok = res["valid"] & res["fits_window"]
+        if NI_min:
+            ok &= res["NI"] >= NI_min
+        if J_max:
+            ok &= res["J_A_mm2"] <= J_max * (1 + 1e-9)
+        if mass_max_kg:
+            ok &= res["wt_total_kg"] <= mass_max_kg
+        idx = np.flatnonzero(ok)
+        stats["feasible"] = int(idx.size)
+
+        # Best `top` by rank_by, ties going to the lighter assembly
+        key = RANK_BY[rank_by] * res[rank_by][idx]
+        if idx.size > top:
+            near = key <= np.partition(key, top - 1)[top - 1]
+            idx, key = idx[near], key[near]
+        idx = idx[np.lexsort((res["wt_total_kg"][idx], key))[:top]]
+        ranked = {
+            "foil_sku": foil.sku[fi[idx]], "film_sku": film.sku[mi[idx]],
+            "cloth_sku": np.full(idx.size, cloth.sku[ci], dtype=object),
+            "t_cu_mm": inputs["t_cu_mm"][idx], "w_cu_mm": inputs["w_cu_mm"][idx],
+            "t_mylar_mm": inputs["t_mylar_mm"][idx], "w_mylar_mm": inputs["w_mylar_mm"][idx],
+            "t_fiberglass_mm": np.full(idx.size, cloth.thickness_mm[ci]),
+        }
+        ranked.update({k: v[idx] for k, v in res.items() if k not in ("valid", "dims_ok", "mylar_ok", "turns_ok")})
+    stats["seconds"] = time.perf_counter() - t0
+    return ranked, stats
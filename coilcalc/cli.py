@@ -0,0 +1,185 @@
+"""Headless batch evaluation: python -m coilcalc designs.csv results.parquet
+
+Reads a CSV, Parquet or Arrow file with one design per row, evaluates every row with the
+same physics as the app and streams the results out chunk by chunk (see coilcalc.export;
+'.csv.gz' is gzipped, Arrow files are left uncompressed so they memory-map). Columns are named like the
+inputs of optimize_pancake_coil(); missing columns fall back to the app defaults (or to
+--set overrides). Cooling plates are given either as `cooling_plates_mm` ("6.0, 6.0, 6.0")
+or as the total stack thickness `plates_axial_mm`. --turn-model picks the conductor length
+model for circular coils (mlt or the per-turn spiral). With --store, designs already in the
+result store (coilcalc.store) are read from it instead of recomputed.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from coilcalc.batch import optimize_pancake_coil_batch
+from coilcalc.core import DEFAULT_INPUTS, TURN_MODELS
+from coilcalc.export import TableWriter, format_of, open_table
+
+MASK_FIELDS = ("valid", "dims_ok", "mylar_ok", "turns_ok")
+INPUT_FIELDS = tuple(k for k in DEFAULT_INPUTS if k != "cooling_plates_mm") + ("plates_axial_mm",)
+
+
+# --- CHUNK EVALUATION (runs in the worker processes) ---
+_stores = {}
+
+
+def evaluate_chunk(columns, overrides=None, store_path=None, turn_model="mlt"):
+    """Evaluates one chunk of input columns and returns input + result columns.
+
+    `columns` maps input names to equally long arrays. Result columns of rows that
+    optimize_pancake_coil() would reject are set to NaN. With `store_path`, designs
+    already in that result store are read from it and new ones are added.
+    """
+    if not columns:
+        raise ValueError(f"no design input columns (expected some of: {', '.join(INPUT_FIELDS)})")
+    inputs = {**(overrides or {}), **{k: v for k, v in columns.items() if k in INPUT_FIELDS}}
+    if store_path:
+        from coilcalc.store import ResultStore, evaluate_cached
+        if store_path not in _stores:
+            _stores[store_path] = ResultStore(store_path)
+        res = evaluate_cached(_stores[store_path], turn_model, **inputs)
+        res.pop("cached")
+    else:
+        res = optimize_pancake_coil_batch(turn_model, **inputs)
+    n = len(next(iter(columns.values())))
+    out = {k: np.broadcast_to(np.asarray(v), (n,)) for k, v in inputs.items()}
+    valid = res["valid"]
+    for k, v in res.items():
+        if k not in MASK_FIELDS and v.dtype.kind == "f":
+            v = np.where(valid, v, np.nan)
+        out[k] = v
+    return out
+
+
+def _plates_totals(values):
+    """Sums comma-separated plate stacks ("6.0, 6.0, 6.0"), parsing each distinct string once."""
+    values = np.asarray(values, dtype=object)
+    uniq, inverse = np.unique(values.astype(str), return_inverse=True)
+    totals = np.array([sum(float(x) for x in u.split(",") if x.strip()) for u in uniq])
+    return totals[inverse]
+
+
+def _prepare(columns):
+    """Maps raw file columns to numeric input arrays, dropping unknown columns."""
+    out = {}
+    for k, v in columns.items():
+        if k == "cooling_plates_mm":
+            if "plates_axial_mm" not in columns:
+                out["plates_axial_mm"] = _plates_totals(v)
+        elif k in INPUT_FIELDS:
+            out[k] = np.asarray(v)
+    return out
+
+
+# --- STREAMING READERS / WRITERS ---
+def iter_input_chunks(path, chunk_size):
+    """Yields dicts of column arrays, never holding more than one chunk of the file."""
+    fmt = "csv" if path == "-" else format_of(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield {name: col.to_numpy(zero_copy_only=False) for name, col in zip(batch.schema.names, batch.columns)}
+    elif fmt == "arrow":
+        # Memory-mapped: each batch is read from the mapping only when it is converted
+        for batch in open_table(path).to_batches(max_chunksize=chunk_size):
+            yield {name: col.to_numpy(zero_copy_only=False) for name, col in zip(batch.schema.names, batch.columns)}
+    else:
+        import pandas as pd
+        source = sys.stdin if path == "-" else path
+        for df in pd.read_csv(source, chunksize=chunk_size, skipinitialspace=True):
+            yield {k: df[k].to_numpy() for k in df.columns}
+
+
+# --- DRIVER ---
+def run_batch(input_path, output_path, workers=None, chunk_size=200_000, overrides=None, progress=None,
+              store_path=None, turn_model="mlt"):
+    """Streams input_path through the batch engine into output_path; returns the row count.
+
+    Chunks are evaluated on a pool of `workers` processes (1 = in-process). At most two
+    chunks per worker are in flight, so memory stays bounded whatever the input size, and
+    results are written in input order. `store_path` checks a result store first (see
+    coilcalc.store); `turn_model` is one of TURN_MODELS.
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = TableWriter(output_path)
+    rows = 0
+    t0 = time.perf_counter()
+    try:
+        chunks = (_prepare(c) for c in iter_input_chunks(input_path, chunk_size))
+        if workers == 1:
+            for chunk in chunks:
+                out = evaluate_chunk(chunk, overrides, store_path, turn_model)
+                writer.write(out)
+                rows += len(out["valid"])
+                if progress:
+                    progress(rows, time.perf_counter() - t0)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(evaluate_chunk, chunk, overrides, store_path, turn_model))
+                    while len(pending) >= 2 * workers:
+                        out = pending.popleft().result()
+                        writer.write(out)
+                        rows += len(out["valid"])
+                        if progress:
+                            progress(rows, time.perf_counter() - t0)
+                while pending:
+                    out = pending.popleft().result()
+                    writer.write(out)
+                    rows += len(out["valid"])
+                    if progress:
+                        progress(rows, time.perf_counter() - t0)
+    finally:
+        writer.close()
+    return rows
+
+
+def _parse_override(text):
+    key, _, value = text.partition("=")
+    key = key.strip()
+    if key not in INPUT_FIELDS and key != "cooling_plates_mm":
+        raise argparse.ArgumentTypeError(f"unknown input '{key}'")
+    if key == "cooling_plates_mm":
+        return "plates_axial_mm", float(_plates_totals([value])[0])
+    return key, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m coilcalc", description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV, Parquet or Arrow file of designs ('-' reads CSV from stdin)")
+    parser.add_argument("output", help="CSV (.csv/.csv.gz), Parquet or Arrow result file ('-' writes CSV to stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=200_000, help="rows per chunk (default: 200000)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], type=_parse_override,
+                        metavar="KEY=VALUE", help="value for an input missing from the file, e.g. --set I_const=80")
+    parser.add_argument("--store", nargs="?", const="", default=None, metavar="PATH",
+                        help="reuse and extend a result store (default path: ~/.cache/coilcalc/results.sqlite)")
+    parser.add_argument("--turn-model", choices=TURN_MODELS, default="mlt",
+                        help="conductor length of circular coils: mean turn length or per-turn spiral (default: mlt)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't report progress on stderr")
+    args = parser.parse_args(argv)
+
+    def progress(rows, seconds):
+        print(f"\r{rows:,} designs in {seconds:.1f} s ({rows / max(seconds, 1e-9):,.0f}/s)", end="", file=sys.stderr)
+
+    store_path = args.store
+    if store_path == "":
+        from coilcalc.store import DEFAULT_STORE_PATH
+        store_path = DEFAULT_STORE_PATH
+    rows = run_batch(args.input, args.output, args.workers, args.chunk_size, dict(args.overrides),
+                     None if args.quiet else progress, store_path, args.turn_model)
+    if not args.quiet:
+        print(file=sys.stderr)
+    return 0 if rows else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
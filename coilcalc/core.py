@@ -0,0 +1,243 @@
+"""Physics constants and the scalar design calculation; imports no third-party packages."""
+import math
+
+# --- CONSTANTS ---
+rho = 1.68e-8
+density_cu = 8960.0       # kg/m^3
+density_al = 2700.0       # kg/m^3
+density_epoxy = 1150.0    # kg/m^3
+density_mylar = 1390.0    # kg/m^3
+cp_water = 4186.0
+rho_water = 1000.0
+
+# Sidebar defaults of the Streamlit app, used for any input a batch call leaves out.
+DEFAULT_INPUTS = {
+    "constraint_mode": 2,
+    "target_turns_per_pancake": 172,
+    "a_mm": 50.0,
+    "b_max_mm": 129.5,
+    "plate_margin_mm": 0.5,
+    "num_pancakes": 2,
+    "cooling_plates_mm": [6.0, 6.0, 6.0],
+    "t_cu_mm": 0.381,
+    "w_cu_mm": 38.1,
+    "t_mylar_mm": 0.0762,
+    "w_mylar_mm": 38.8,
+    "t_fiberglass_mm": 0.23,
+    "fiberglass_layers": 2,
+    "MLT_input_m": 0.0,
+    "I_const": 50.0,
+    "dT_water": 10.0,
+}
+
+CONSTRAINT_TYPES = {1: "Space Constrained (Max Turns)", 2: "Turns Constrained"}
+SHAPE_TYPES = ("Circular (Dynamic MLT)", "Irregular (Fixed MLT)", "Circular (Per-Turn Spiral)")
+
+# "mlt": every turn has the mean-radius length. "spiral": exact Archimedean spiral length.
+TURN_MODELS = ("mlt", "spiral")
+
+# Numeric result columns, in the order optimize_pancake_coil() returns them.
+RESULT_FIELDS = (
+    "winding_a_mm", "winding_b_actual_mm", "available_space_mm", "unused_space_mm",
+    "fits_window", "turns_per_pancake", "total_turns", "MLT_m", "length_m",
+    "length_per_pancake_m", "A_cu_mm2", "J_A_mm2", "build_mm", "wt_cu_kg", "wt_al_kg",
+    "wt_mylar_kg", "vol_epoxy_L", "wt_epoxy_kg", "wt_total_kg", "R", "V", "P", "NI",
+    "Flow_LPM", "ax_pancakes_mm", "ax_plates_mm", "ax_insul_mm", "ax_total_mm",
+)
+
+
+class DesignError(ValueError):
+    """Raised for designs that can't be built; the message is shown to the user as-is."""
+
+
+def _check_turn_model(turn_model):
+    if turn_model not in TURN_MODELS:
+        raise ValueError(f"turn_model must be one of {TURN_MODELS}, not {turn_model!r}")
+
+
+def spiral_arc_length_mm(winding_a_mm, layer_thickness_mm, turns):
+    """Centerline length (mm) of an Archimedean spiral of pitch layer_thickness_mm.
+
+    The centerline starts at winding_a_mm and grows by one pitch per turn, so turn k has
+    mean radius winding_a_mm + (k + 0.5) * pitch, as in the mean-turn model; `turns` may be
+    fractional. With r = c * phi and c = pitch / 2pi, the arc length from the origin is
+    s(phi) = c / 2 * (phi * sqrt(1 + phi^2) + asinh(phi)). Vectorized over all arguments.
+    """
+    import numpy as np
+    c = layer_thickness_mm / (2 * np.pi)
+    phi0 = winding_a_mm / c
+    phi1 = phi0 + 2 * np.pi * turns
+
+    def s(phi):
+        return c / 2.0 * (phi * np.sqrt(1.0 + phi**2) + np.arcsinh(phi))
+
+    return s(phi1) - s(phi0)
+
+
+# ================= CALCULATION LOGIC =================
+def optimize_pancake_coil(constraint_mode, target_turns_per_pancake, a_mm, b_max_mm, plate_margin_mm,
+                          num_pancakes, cooling_plates_mm, t_cu_mm, w_cu_mm, t_mylar_mm, w_mylar_mm,
+                          t_fiberglass_mm, fiberglass_layers, MLT_input_m, I_const, dT_water, turn_model="mlt"):
+    """Works out one pancake coil design; raises DesignError if it can't be built.
+
+    turn_model picks how conductor length is found for circular coils (see TURN_MODELS);
+    a fixed MLT_input_m always takes precedence.
+    """
+    _check_turn_model(turn_model)
+    if min(t_cu_mm, w_cu_mm, t_mylar_mm, w_mylar_mm) <= 0:
+        raise DesignError("Copper and mylar thicknesses and widths must be positive.")
+    if num_pancakes < 1:
+        raise DesignError("The stack needs at least one pancake.")
+    if w_mylar_mm < w_cu_mm:
+        raise DesignError(f"Mylar width ({w_mylar_mm} mm) cannot be smaller than copper width ({w_cu_mm} mm).")
+        
+    winding_a_mm = a_mm + plate_margin_mm
+    winding_b_max_mm = b_max_mm - plate_margin_mm
+    available_build_mm = winding_b_max_mm - winding_a_mm
+    layer_thickness_mm = t_cu_mm + t_mylar_mm
+    
+    if constraint_mode == 1:
+        N_per_pancake = math.floor(available_build_mm / layer_thickness_mm)
+        constraint_type = "Space Constrained (Max Turns)"
+    else:
+        N_per_pancake = int(target_turns_per_pancake)
+        constraint_type = "Turns Constrained"
+        
+    if N_per_pancake <= 0:
+        raise DesignError("Available radial space is too small for even one turn.")
+        
+    actual_build_mm = N_per_pancake * layer_thickness_mm
+    winding_b_actual_mm = winding_a_mm + actual_build_mm
+    unused_space_mm = available_build_mm - actual_build_mm
+    fits_window = actual_build_mm <= available_build_mm
+    
+    if MLT_input_m > 0:
+        MLT_m = MLT_input_m
+        shape_type = "Irregular (Fixed MLT)"
+    elif turn_model == "spiral":
+        MLT_m = spiral_arc_length_mm(winding_a_mm, layer_thickness_mm, N_per_pancake) / N_per_pancake / 1000.0
+        shape_type = "Circular (Per-Turn Spiral)"
+    else:
+        mean_radius_mm = winding_a_mm + (actual_build_mm / 2.0)
+        MLT_m = (2 * math.pi * mean_radius_mm) / 1000.0
+        shape_type = "Circular (Dynamic MLT)"
+        
+    w_pancake_axial_mm = w_mylar_mm
+    total_pancakes_axial_mm = num_pancakes * w_pancake_axial_mm
+    total_plates_axial_mm = sum(cooling_plates_mm)
+    interface_thickness_mm = fiberglass_layers * t_fiberglass_mm
+    num_interfaces = num_pancakes * 2
+    total_insulation_axial_mm = num_interfaces * interface_thickness_mm
+    total_assembly_axial_mm = total_pancakes_axial_mm + total_plates_axial_mm + total_insulation_axial_mm
+    
+    total_turns = N_per_pancake * num_pancakes
+    total_length_m = total_turns * MLT_m
+    length_per_pancake_m = total_length_m / num_pancakes
+    
+    # Weight, Volume & Current Density Math
+    t_cu_m = t_cu_mm / 1000.0
+    w_cu_m = w_cu_mm / 1000.0
+    A_cu = t_cu_m * w_cu_m
+    A_cu_mm2 = t_cu_mm * w_cu_mm
+    J_A_mm2 = I_const / A_cu_mm2
+    
+    volume_cu_m3 = A_cu * total_length_m
+    weight_cu_kg = volume_cu_m3 * density_cu
+
+    # Mylar Weight Math
+    t_mylar_m = t_mylar_mm / 1000.0
+    w_mylar_m = w_mylar_mm / 1000.0
+    A_mylar = t_mylar_m * w_mylar_m
+    volume_mylar_m3 = A_mylar * total_length_m
+    weight_mylar_kg = volume_mylar_m3 * density_mylar
+    
+    r_in_m = a_mm / 1000.0
+    plate_r_out_m = (winding_a_mm + actual_build_mm + plate_margin_mm) / 1000.0
+    area_plate_m2 = math.pi * (plate_r_out_m**2 - r_in_m**2)
+    total_plates_axial_m = total_plates_axial_mm / 1000.0
+    volume_al_m3 = area_plate_m2 * total_plates_axial_m
+    weight_al_kg = volume_al_m3 * density_al
+    
+    r_out_max_m = b_max_mm / 1000.0
+    v_gross_mold_m3 = math.pi * (r_out_max_m**2 - r_in_m**2) * (total_assembly_axial_mm / 1000.0)
+    winding_a_m = winding_a_mm / 1000.0
+    winding_b_m = winding_b_actual_mm / 1000.0
+    v_winding_block_m3 = math.pi * (winding_b_m**2 - winding_a_m**2) * (total_pancakes_axial_mm / 1000.0)
+    v_plates_insul_m3 = math.pi * (plate_r_out_m**2 - r_in_m**2) * ((total_plates_axial_mm + total_insulation_axial_mm) / 1000.0)
+    
+    volume_epoxy_m3 = max(0.0, v_gross_mold_m3 - v_winding_block_m3 - v_plates_insul_m3)
+    vol_epoxy_L = volume_epoxy_m3 * 1000.0
+    weight_epoxy_kg = volume_epoxy_m3 * density_epoxy
+    
+    total_weight_kg = weight_cu_kg + weight_al_kg + weight_mylar_kg + weight_epoxy_kg
+    
+    # Electrical Math
+    R_total = rho * (total_length_m / A_cu)
+    V_req = I_const * R_total
+    P_total = (I_const ** 2) * R_total
+    NI_total = total_turns * I_const
+    mass_flow_kg_per_s = P_total / (cp_water * dT_water)
+    vol_flow_L_per_min = (mass_flow_kg_per_s / rho_water) * 1000.0 * 60.0
+    
+    return {
+        "constraint_type": constraint_type,
+        "winding_a_mm": winding_a_mm,
+        "winding_b_actual_mm": winding_b_actual_mm,
+        "available_space_mm": available_build_mm,
+        "unused_space_mm": unused_space_mm,
+        "fits_window": fits_window,
+        "turns_per_pancake": N_per_pancake,
+        "total_turns": total_turns,
+        "MLT_m": MLT_m,
+        "shape_type": shape_type,
+        "length_m": total_length_m,
+        "length_per_pancake_m": length_per_pancake_m,
+        "A_cu_mm2": A_cu_mm2,
+        "J_A_mm2": J_A_mm2,
+        "build_mm": actual_build_mm,
+        "wt_cu_kg": weight_cu_kg,
+        "wt_al_kg": weight_al_kg,
+        "wt_mylar_kg": weight_mylar_kg,
+        "vol_epoxy_L": vol_epoxy_L,
+        "wt_epoxy_kg": weight_epoxy_kg,
+        "wt_total_kg": total_weight_kg,
+        "R": R_total,
+        "V": V_req,
+        "P": P_total,
+        "NI": NI_total,
+        "Flow_LPM": vol_flow_L_per_min,
+        "ax_pancakes_mm": total_pancakes_axial_mm,
+        "ax_plates_mm": total_plates_axial_mm,
+        "ax_insul_mm": total_insulation_axial_mm,
+        "ax_total_mm": total_assembly_axial_mm
+    }
+
+
+def stack_layers(res, cooling_plates_mm, num_pancakes):
+    """Axial stack of a design from the bottom up, as (kind, z_start_mm, height_mm) tuples.
+
+    kind is "al" (cooling plate), "insul" (fiberglass interface) or "cu" (pancake). Plates
+    are placed below each pancake and one on top, for as many plates as the list holds.
+    """
+    layers = []
+    z_mm = 0.0
+    pancake_height_mm = res['ax_pancakes_mm'] / num_pancakes
+    insul_height_mm = res['ax_insul_mm'] / (num_pancakes * 2)
+
+    def add(kind, h_mm):
+        nonlocal z_mm
+        layers.append((kind, z_mm, h_mm))
+        z_mm += h_mm
+
+    plate_idx = 0
+    for i in range(num_pancakes):
+        if plate_idx < len(cooling_plates_mm):
+            add("al", cooling_plates_mm[plate_idx])
+            plate_idx += 1
+        add("insul", insul_height_mm)
+        add("cu", pancake_height_mm)
+        add("insul", insul_height_mm)
+
+    if plate_idx < len(cooling_plates_mm):
+        add("al", cooling_plates_mm[plate_idx])
+    return layers
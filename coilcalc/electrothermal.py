@@ -0,0 +1,81 @@
+"""Self-consistent hot resistance: copper resistivity follows the winding temperature."""
+import numpy as np
+
+from coilcalc.batch import optimize_pancake_coil_batch
+from coilcalc.core import DEFAULT_INPUTS, cp_water, rho_water
+from coilcalc.thermal import h_plate_default, k_cu, k_fiberglass, k_mylar
+
+# Temperature coefficient of copper resistivity at the 20 degC reference of core.rho (1/K)
+alpha_cu = 0.00393
+T_ref_C = 20.0
+
+
+def lumped_theta(winding_a_mm, winding_b_actual_mm, num_pancakes, w_cu_mm, t_cu_mm, t_mylar_mm,
+                 t_fiberglass_mm, fiberglass_layers, h_plate=h_plate_default):
+    """Mean winding temperature rise per watt (K/W) above the mean coolant temperature.
+
+    Every pancake dissipates its share through both faces: half the winding's axial height
+    of Cu/mylar laminate (mean rise of a slab with uniform heating, w / 12kA overall), the
+    fiberglass interface, then the plate's film coefficient over the winding's face area.
+    A quick closed-form estimate for whole sweeps; StackThermalModel resolves the real
+    stack (plate count, radial spreading) for one design. Vectorized over all arguments.
+    """
+    area_m2 = np.pi * ((winding_b_actual_mm / 1000.0) ** 2 - (winding_a_mm / 1000.0) ** 2)
+    k_axial = (t_cu_mm * k_cu + t_mylar_mm * k_mylar) / (t_cu_mm + t_mylar_mm)
+    r_slab = (w_cu_mm / 1000.0) / (12.0 * k_axial * area_m2)
+    r_face = (t_fiberglass_mm * fiberglass_layers / 1000.0) / (k_fiberglass * area_m2) + 1.0 / (h_plate * area_m2)
+    return (r_slab + r_face / 2.0) / num_pancakes
+
+
+def solve_winding_temperature(R20, I, T_coolant_C, theta, alpha=alpha_cu):
+    """Solves T = T_coolant + theta * I^2 * R20 * (1 + alpha (T - 20)) for every element.
+
+    The balance is linear in T: T = (T_coolant + theta I^2 R20 (1 - 20 alpha)) / (1 - theta I^2 R20 alpha).
+    Where the denominator is <= 0 there is no steady state (thermal runaway): T is inf and
+    the element is flagged. Returns (T_C, runaway) arrays.
+    """
+    R20, I, T_coolant_C, theta = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (R20, I, T_coolant_C, theta)))
+    P20 = I * I * R20
+    denom = 1.0 - theta * P20 * alpha           # 1 - loop gain of the resistance/temperature feedback
+    runaway = denom <= 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        T = (T_coolant_C + theta * P20 * (1.0 - alpha * T_ref_C)) / denom
+    return np.where(runaway, np.inf, T), runaway
+
+
+def electrothermal_batch(T_water_in_C=20.0, theta=None, h_plate=h_plate_default, alpha=alpha_cu, turn_model="mlt", **inputs):
+    """optimize_pancake_coil_batch() with R, V, P and Flow_LPM at the self-consistent hot temperature.
+
+    The coolant's mean temperature is the inlet plus half the allowed rise dT_water; the
+    flow is sized for the hot power at that rise. `theta` (K/W, broadcastable) defaults to
+    lumped_theta() of each design. Adds columns T_winding_C, R20, theta_K_per_W and runaway;
+    runaway designs get inf temperature and NaN electrical results.
+    """
+    res = optimize_pancake_coil_batch(turn_model=turn_model, **inputs)
+    shape = res['R'].shape
+
+    def column(k):
+        return np.broadcast_to(np.asarray(inputs.get(k, DEFAULT_INPUTS[k]), dtype=float), shape)
+
+    if theta is None:
+        theta = lumped_theta(res['winding_a_mm'], res['winding_b_actual_mm'], column("num_pancakes"), column("w_cu_mm"),
+                             column("t_cu_mm"), column("t_mylar_mm"), column("t_fiberglass_mm"),
+                             column("fiberglass_layers"), h_plate)
+    I = column("I_const")
+    dT_water = column("dT_water")
+    T, runaway = solve_winding_temperature(res['R'], I, T_water_in_C + dT_water / 2.0, theta, alpha)
+
+    R_hot = np.where(runaway, np.nan, res['R'] * (1.0 + alpha * (T - T_ref_C)))
+    P_hot = I * I * R_hot
+    res.update(
+        R20=res['R'],
+        R=R_hot,
+        V=I * R_hot,
+        P=P_hot,
+        Flow_LPM=P_hot / (cp_water * dT_water) / rho_water * 1000.0 * 60.0,
+        T_winding_C=T,
+        theta_K_per_W=np.broadcast_to(theta, shape),
+        runaway=runaway,
+    )
+    return res
+
@@ -0,0 +1,116 @@
+"""Self-inductance of a design: mutual inductance summed over turn pairs, with strip GMD self terms."""
+import numpy as np
+
+from coilcalc.core import stack_layers
+from coilcalc.field import MU0, ellipke
+
+
+# ================= FILAMENT KERNELS =================
+def loop_mutual_inductance(a, b, dz):
+    """Mutual inductance (H) of coaxial circular filaments of radii a, b at axial distance dz (m)."""
+    m = 4.0 * a * b / ((a + b) ** 2 + dz * dz)
+    k = np.sqrt(m)
+    K, E = ellipke(m)
+    return MU0 * np.sqrt(a * b) * ((2.0 / k - k) * K - 2.0 / k * E)
+
+
+def _log_gmd_phi(u, d):
+    """Second antiderivative in u of 0.5 * ln(u^2 + d^2), used for the strip GMD."""
+    s = u * u + d * d
+    log_s = np.log(np.where(s > 0, s, 1.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        atan_term = np.where(d > 0, 2.0 * d * u * np.arctan(u / np.where(d > 0, d, 1.0)), 0.0)
+    return 0.5 * (0.5 * (u * u - d * d) * log_s - 1.5 * u * u + atan_term)
+
+
+def strip_gmd(dr, dz, w):
+    """Geometric mean distance between two parallel strips of height w, offset dr across and dz along."""
+    phi = _log_gmd_phi
+    dr = np.abs(dr)
+    log_g = (phi(dz + w, dr) + phi(dz - w, dr) - 2.0 * phi(dz, dr)) / (w * w)
+    return np.exp(log_g)
+
+
+def _curvature_correction(r_in_m, r_out_m, dz, w, nodes=12, u_nodes=16):
+    """Mean error of the GMD substitution for strip pairs spread over [r_in_m, r_out_m].
+
+    The exact strip-pair inductance is the filament M averaged over the strips' heights. Its
+    log singularity (a straight strip's GMD) is integrated analytically, the smooth rest
+    with Gauss-Legendre; the difference to the GMD filament is smooth in both radii, so a
+    small tensor grid of radii gives its mean over the winding.
+    """
+    x, wx = np.polynomial.legendre.leggauss(nodes)
+    r = r_in_m + (x + 1.0) / 2.0 * (r_out_m - r_in_m)
+    ri, rj = r[:, None], r[None, :]
+    weight = (wx[:, None] * wx[None, :]) / 4.0
+    dr = rj - ri
+    g = strip_gmd(dr, dz, w)
+    r_mean = np.sqrt(ri * rj)
+    m_gmd = loop_mutual_inductance(ri, rj, np.sqrt(np.maximum(g * g - dr * dr, 0.0)))
+
+    m_exact = MU0 * r_mean * (np.log(8.0 * r_mean / g) - 2.0)
+    xu, wu = np.polynomial.legendre.leggauss(u_nodes)
+    for lo in (dz - w, dz):
+        for u, wt in zip(lo + (xu + 1.0) / 2.0 * w, wu / 2.0):
+            tri = wt * (w - abs(u - dz)) / w          # triangular weight of the height difference
+            log_part = MU0 * r_mean * (np.log(8.0 * r_mean / np.hypot(dr, u)) - 2.0)
+            m_exact = m_exact + tri * (loop_mutual_inductance(ri, rj, u) - log_part)
+    return float(((m_exact - m_gmd) * weight).sum())
+
+
+# ================= COIL INDUCTANCE =================
+def _offset_kernel_sum(radius_m, gmd_m, block):
+    """Sum of M over all turn pairs (i, j) of two pancakes with identical radii.
+
+    `gmd_m[k]` is the GMD for radial index offset k = j - i + (N - 1); because the radii are
+    evenly spaced it only depends on the offset. The matrix is symmetric, so only blocks
+    on and above the diagonal are evaluated, never more than block x block at a time.
+    """
+    N = radius_m.size
+    total = 0.0
+    for i0 in range(0, N, block):
+        ri = radius_m[i0:i0 + block, None]
+        ii = np.arange(i0, min(i0 + block, N))[:, None]
+        for j0 in range(i0, N, block):
+            rj = radius_m[None, j0:j0 + block]
+            jj = np.arange(j0, min(j0 + block, N))[None, :]
+            g = gmd_m[jj - ii + N - 1]
+            # Filament loops whose spacing equals the strips' GMD
+            dz = np.sqrt(np.maximum(g * g - (rj - ri) ** 2, 0.0))
+            s = loop_mutual_inductance(ri, rj, dz).sum()
+            total += s if j0 == i0 else 2.0 * s
+    return total
+
+
+def coil_inductance(res, cooling_plates_mm, num_pancakes, t_cu_mm, w_cu_mm, t_mylar_mm, block=1024):
+    """Self inductance of the stack from every turn-to-turn mutual inductance.
+
+    Each turn is a circular strip of height w_cu at its mean radius, replaced by a filament
+    loop at the strips' geometric mean distance (Maxwell's method); a turn's own GMD is
+    0.2235 (w + t). A quadrature correction for the strips' curvature brings the total
+    within ~0.01% of a finely subdivided filament model. Pancakes have identical radii, so
+    the N x N kernel of a pair of pancakes only depends on their axial offset: it is summed
+    once per distinct offset and reused. Returns {"L_H", "M_pancake_H"} with the (np x np)
+    pancake inductance matrix.
+    """
+    N = int(res['turns_per_pancake'])
+    pitch_m = (t_cu_mm + t_mylar_mm) / 1000.0
+    w_m = w_cu_mm / 1000.0
+    radius_m = res['winding_a_mm'] / 1000.0 + (np.arange(N) + 0.5) * pitch_m
+    z_m = np.array([z0 + h / 2.0 for kind, z0, h in stack_layers(res, cooling_plates_mm, num_pancakes) if kind == "cu"]) / 1000.0
+
+    dr_m = np.arange(-(N - 1), N) * pitch_m
+    offsets = np.abs(z_m[:, None] - z_m[None, :])
+    keys = np.round(offsets / 1e-9).astype(np.int64)          # nm buckets: equal offsets share a kernel
+    cache = {}
+    M = np.empty_like(offsets)
+    for idx, key in np.ndenumerate(keys):
+        if key not in cache:
+            gmd_m = strip_gmd(dr_m, offsets[idx], w_m)
+            if key == 0:
+                gmd_m[N - 1] = 0.2235 * (w_m + t_cu_mm / 1000.0)
+            r_in_m, r_out_m = radius_m[0] - pitch_m / 2.0, radius_m[-1] + pitch_m / 2.0
+            cache[key] = (_offset_kernel_sum(radius_m, gmd_m, block)
+                          + N * N * _curvature_correction(r_in_m, r_out_m, offsets[idx], w_m))
+        M[idx] = cache[key]
+    return {"L_H": float(M.sum()), "M_pancake_H": M}
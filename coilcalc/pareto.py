@@ -0,0 +1,257 @@
+"""Pareto-front search over a grid of designs: most ampere-turns for the least mass, power and flow."""
+import time
+
+import numpy as np
+
+from coilcalc.batch import optimize_pancake_coil_batch
+from coilcalc.core import DEFAULT_INPUTS
+
+# Objective columns and their sense: +1 = minimize, -1 = maximize.
+OBJECTIVES = (("NI", -1.0), ("wt_total_kg", 1.0), ("P", 1.0), ("Flow_LPM", 1.0))
+
+# Swept inputs, in the order they are returned next to the results.
+SEARCH_FIELDS = ("t_cu_mm", "w_cu_mm", "t_mylar_mm", "w_mylar_mm", "num_pancakes", "plate_od_mm")
+
+
+# ================= NON-DOMINATED FILTERING =================
+def _peel_front(obj):
+    """General k-objective filter, O(front size x rows).
+
+    Rows are peeled in order of their normalized objective sum: the row with the smallest
+    sum can't be dominated, so it joins the front and every row it weakly dominates is
+    discarded in one vectorized step.
+    """
+    keep = np.zeros(obj.shape[0], dtype=bool)
+    span = np.ptp(obj, axis=0)
+    scale = 1.0 / np.where(span > 0, span, 1.0)
+    idx = np.argsort((obj * scale).sum(axis=1), kind="stable")
+    pts = obj[idx]
+    while idx.size:
+        keep[idx[0]] = True
+        survivors = ~np.all(pts[1:] >= pts[0], axis=1)
+        idx = idx[1:][survivors]
+        pts = pts[1:][survivors]
+    return keep
+
+
+def _sweep_front_3d(obj):
+    """Three-objective filter: sweeps levels of the first objective against a 2D staircase.
+
+    Rows sharing a first-objective value form one level. A row survives when it is a 2D
+    minimum of (obj1, obj2) inside its level and no row of a better level has both smaller
+    or equal obj1 and obj2. The better levels are summarised by their staircase, kept
+    sorted by obj1 with strictly decreasing obj2, so each level costs one searchsorted.
+    """
+    n = obj.shape[0]
+    order = np.lexsort((obj[:, 2], obj[:, 1], obj[:, 0]))
+    o = obj[order]
+    keep_sorted = np.zeros(n, dtype=bool)
+    starts = np.flatnonzero(np.r_[True, o[1:, 0] != o[:-1, 0]])
+    ends = np.r_[starts[1:], n]
+
+    stair_x = np.empty(0)
+    stair_y = np.empty(0)
+    for s, e in zip(starts, ends):
+        x = o[s:e, 1]
+        y = o[s:e, 2]
+        # 2D minima inside the level (rows are sorted by x, then y)
+        cand = y < np.minimum.accumulate(np.r_[np.inf, y[:-1]])
+        if stair_x.size:
+            pos = np.searchsorted(stair_x, x[cand], side="right")
+            best = np.where(pos > 0, stair_y[np.maximum(pos - 1, 0)], np.inf)
+            cand[cand] = y[cand] < best
+        if not cand.any():
+            continue
+        keep_sorted[s:e] = cand
+        nx = np.concatenate([stair_x, x[cand]])
+        ny = np.concatenate([stair_y, y[cand]])
+        o2 = np.lexsort((ny, nx))
+        nx = nx[o2]
+        ny = ny[o2]
+        m = ny < np.minimum.accumulate(np.r_[np.inf, ny[:-1]])
+        stair_x = nx[m]
+        stair_y = ny[m]
+
+    keep = np.zeros(n, dtype=bool)
+    keep[order] = keep_sorted
+    return keep
+
+
+def nondominated_mask(obj):
+    """Boolean mask of the rows of `obj` (n x k, every column minimized) that no other row dominates.
+
+    Exact duplicates are reduced to a single row.
+    """
+    obj = np.asarray(obj, dtype=float)
+    if obj.shape[0] == 0:
+        return np.zeros(0, dtype=bool)
+    if obj.shape[1] == 3:
+        return _sweep_front_3d(obj)
+    return _peel_front(obj)
+
+
+def _objective_matrix(cols):
+    """Minimization matrix of the tested objectives.
+
+    Flow_LPM is P scaled by the fixed cp_water * dT_water, so it orders designs exactly
+    like P and is left out of the dominance test.
+    """
+    return np.column_stack([sign * np.asarray(cols[name], dtype=float)
+                            for name, sign in OBJECTIVES if name != "Flow_LPM"])
+
+
+# ================= BOUND-PRUNED GRID SEARCH =================
+def _coarse_dominated(front_obj, obj, bins=256):
+    """Conservative, O(n) pre-filter of `obj` against a three-objective front.
+
+    The front is binned on its first two objectives and a 2D running minimum of the third is
+    taken over the bins. A row is flagged only when a front point from a strictly lower bin on
+    both axes is no worse on the third objective, so every flagged row is truly dominated;
+    the exact filter then only has to look at the rows that are left.
+    """
+    if len(front_obj) == 0:
+        return np.zeros(len(obj), dtype=bool)
+    e0 = np.unique(np.quantile(front_obj[:, 0], np.linspace(0.0, 1.0, bins)))
+    e1 = np.unique(np.quantile(front_obj[:, 1], np.linspace(0.0, 1.0, bins)))
+    table = np.full((e0.size + 1, e1.size + 1), np.inf)
+    np.minimum.at(table, (np.searchsorted(e0, front_obj[:, 0], side="right"),
+                          np.searchsorted(e1, front_obj[:, 1], side="right")), front_obj[:, 2])
+    table = np.minimum.accumulate(np.minimum.accumulate(table, axis=0), axis=1)
+
+    i = np.searchsorted(e0, obj[:, 0], side="right")
+    j = np.searchsorted(e1, obj[:, 1], side="right")
+    below = np.full(obj.shape[0], np.inf)
+    inside = (i > 0) & (j > 0)
+    below[inside] = table[i[inside] - 1, j[inside] - 1]
+    return below <= obj[:, 2]
+
+
+def pareto_front(t_cu_mm, w_cu_mm, t_mylar_mm, num_pancakes, plate_od_mm, plate_thickness_mm=6.0,
+                 mylar_overhang_mm=0.7, chunk_size=1_048_576, turn_model="mlt", **fixed):
+    """Searches the full grid of the given input values and returns its Pareto front.
+
+    The front is non-dominated in NI (max) versus total mass, P and Flow_LPM (min), using
+    max-turns (fill space) winding for every candidate. Mylar width follows the copper width
+    plus `mylar_overhang_mm`, and each stack gets num_pancakes + 1 cooling plates of
+    `plate_thickness_mm`. Any other DEFAULT_INPUTS key may be fixed through `fixed`, and
+    `turn_model` is passed on to the batch engine.
+
+    Within a (pancakes, plate OD, Cu thickness, mylar thickness) cell only the Cu width
+    varies: the turn count and conductor length don't depend on it, mass grows with it and
+    P falls as 1 / width. So no design in a block of consecutive Cu widths beats (NI, mass
+    of the narrowest, P of the widest) on any objective, and a block whose bound the running
+    front already dominates is skipped. Every cell starts as one block between its narrowest
+    and widest design; blocks that survive are split at their middle width, level by level,
+    until no block has untested widths inside.
+
+    Returns (front, stats): the front as columnar arrays (SEARCH_FIELDS + result fields,
+    sorted by descending NI) and a dict of search statistics.
+    """
+    t0 = time.perf_counter()
+    params = {**DEFAULT_INPUTS, **fixed}
+    params.pop("cooling_plates_mm")
+    params["constraint_mode"] = 1
+
+    t_cu_mm = np.unique(np.asarray(t_cu_mm, dtype=float))
+    w_cu_mm = np.unique(np.asarray(w_cu_mm, dtype=float))
+    t_mylar_mm = np.unique(np.asarray(t_mylar_mm, dtype=float))
+    num_pancakes = np.unique(np.asarray(num_pancakes, dtype=np.int64))
+    plate_od_mm = np.unique(np.asarray(plate_od_mm, dtype=float))
+    n_candidates = t_cu_mm.size * w_cu_mm.size * t_mylar_mm.size * num_pancakes.size * plate_od_mm.size
+    # No Cu width at or below zero can be built; the rest are valid or not independently of the width
+    w_cu_mm = w_cu_mm[w_cu_mm > 0]
+
+    # Cells: every (pancakes, plate OD, Cu thickness, mylar thickness) combination
+    cp, co, ct, cm = (g.ravel() for g in np.meshgrid(
+        np.arange(num_pancakes.size), np.arange(plate_od_mm.size), np.arange(t_cu_mm.size),
+        np.arange(t_mylar_mm.size), indexing="ij"))
+
+    front_cols = None
+    front_obj = np.empty((0, 3))
+    evaluated = 0
+
+    def run(cell, iw):
+        """Evaluates (cell, Cu width index) rows chunk by chunk, merging valid ones into the front."""
+        nonlocal front_cols, front_obj, evaluated
+        obj = np.empty((cell.size, 3))
+        valid = np.empty(cell.size, dtype=bool)
+        for start in range(0, cell.size, chunk_size):
+            c = cell[start:start + chunk_size]
+            cand = {
+                "t_cu_mm": t_cu_mm[ct[c]],
+                "w_cu_mm": w_cu_mm[iw[start:start + chunk_size]],
+                "t_mylar_mm": t_mylar_mm[cm[c]],
+                "num_pancakes": num_pancakes[cp[c]],
+                "plate_od_mm": plate_od_mm[co[c]],
+            }
+            cand["w_mylar_mm"] = cand["w_cu_mm"] + mylar_overhang_mm
+            inputs = {k: v for k, v in params.items() if k not in cand}
+            inputs.update({k: cand[k] for k in ("t_cu_mm", "w_cu_mm", "t_mylar_mm", "w_mylar_mm", "num_pancakes")})
+            inputs["b_max_mm"] = cand["plate_od_mm"] / 2.0
+            inputs["plates_axial_mm"] = (cand["num_pancakes"] + 1) * plate_thickness_mm
+            res = optimize_pancake_coil_batch(turn_model, **inputs)
+            evaluated += c.size
+
+            ok = res["valid"]
+            chunk_obj = obj[start:start + c.size]
+            chunk_obj[:] = _objective_matrix(res)
+            valid[start:start + c.size] = ok
+            # Only rows the running front doesn't already cover are copied out and filtered exactly
+            fresh = ok.copy()
+            fresh[ok] = ~_coarse_dominated(front_obj, chunk_obj[ok])
+            cols = {k: cand[k][fresh] for k in SEARCH_FIELDS}
+            cols.update({k: v[fresh] for k, v in res.items() if k not in ("valid", "dims_ok", "mylar_ok", "turns_ok")})
+            new_obj = chunk_obj[fresh]
+            if front_cols is not None:
+                cols = {k: np.concatenate([front_cols[k], cols[k]]) for k in cols}
+                new_obj = np.concatenate([front_obj, new_obj])
+            keep = nondominated_mask(new_obj)
+            front_cols = {k: v[keep] for k, v in cols.items()}
+            front_obj = new_obj[keep]
+        return obj, valid
+
+    # Level 0: the narrowest and widest design of every cell. Cells that can't be built at
+    # one width can't be built at any, and count as pruned blocks.
+    n_cells = cp.size if w_cu_mm.size else 0
+    edges = np.unique([0, max(w_cu_mm.size - 1, 0)])
+    obj, valid = run(np.repeat(np.arange(n_cells), edges.size), np.tile(edges, n_cells))
+    obj = obj.reshape(n_cells, edges.size, 3)
+    feasible = valid.reshape(n_cells, edges.size).all(axis=1)
+    n_blocks = pruned = int((~feasible).sum())
+
+    # Open blocks: cell, the evaluated widths at both ends, and their bound (NI, mass at lo, P at hi)
+    cell = np.flatnonzero(feasible)
+    lo = np.zeros(cell.size, dtype=np.intp)
+    hi = np.full(cell.size, edges[-1], dtype=np.intp)
+    bound = np.column_stack([obj[feasible, 0, 0], obj[feasible, 0, 1], obj[feasible, -1, 2]])
+    while True:
+        inside = hi - lo > 1
+        cell, lo, hi, bound = cell[inside], lo[inside], hi[inside], bound[inside]
+        if not cell.size:
+            break
+        alive = ~_coarse_dominated(front_obj, bound)
+        n_blocks += cell.size
+        pruned += int((~alive).sum())
+        cell, lo, hi, bound = cell[alive], lo[alive], hi[alive], bound[alive]
+        mid = (lo + hi) // 2
+        obj_mid, _ = run(cell, mid)
+        cell = np.concatenate([cell, cell])
+        lo, hi = np.concatenate([lo, mid]), np.concatenate([mid, hi])
+        bound = np.concatenate([np.column_stack([bound[:, 0], bound[:, 1], obj_mid[:, 2]]),
+                                np.column_stack([bound[:, 0], obj_mid[:, 1], bound[:, 2]])])
+
+    if front_cols is None:
+        front_cols = {k: np.empty(0) for k in SEARCH_FIELDS}
+    elif front_obj.shape[0]:
+        by_ni = np.argsort(front_obj[:, 0], kind="stable")
+        front_cols = {k: v[by_ni] for k, v in front_cols.items()}
+
+    stats = {
+        "candidates": int(n_candidates),
+        "evaluated": evaluated,
+        "blocks": int(n_blocks),
+        "blocks_pruned": pruned,
+        "front_size": int(front_obj.shape[0]),
+        "seconds": time.perf_counter() - t0,
+    }
+    return front_cols, stats
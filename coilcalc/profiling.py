@@ -0,0 +1,261 @@
+"""Per-stage wall time and allocation instrumentation for app reruns, aggregated across sessions.
+
+A rerun is begin_run() ... end_run(). Inside it, lap(name) closes the segment since the
+previous checkpoint under `name`, and `with stage(name):` times a nested block. Finished
+runs are aggregated per stage (count, mean, p50/p95, max, allocations) process-wide, the
+last RECENT_RUNS kept for a Chrome trace (chrome://tracing, ui.perfetto.dev).
+
+Everything is off unless enabled (configure(enabled=True), or COILCALC_PROFILE=1 / =alloc
+in the environment): then stage() hands out one shared no-op context manager and lap() is
+a flag check, so instrumented code costs well under a microsecond per call. Allocation tracking uses
+tracemalloc, which slows allocation-heavy code by 2-3x and counts every thread: the
+figures are exact with one active session. With profile_over_s set, every rerun runs
+under cProfile and the profiles of reruns slower than that are kept (PROFILES_KEPT).
+"""
+import contextlib
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+RECENT_RUNS = 200
+STAGE_SAMPLES = 512       # durations kept per stage for the percentiles
+PROFILES_KEPT = 5
+
+_NULL = contextlib.nullcontext()
+_enabled = False
+_allocations = False
+_profile_over_s = None
+_local = threading.local()
+_lock = threading.Lock()
+_stages = {}
+_runs = deque(maxlen=RECENT_RUNS)
+_profiles = deque(maxlen=PROFILES_KEPT)
+_t_origin = time.perf_counter()
+
+
+def configure(enabled=None, allocations=None, profile_over_s=False):
+    """Turns recording, allocation tracking and the slow-rerun profiler on or off (None/False: unchanged).
+
+    profile_over_s: keep cProfile profiles of reruns slower than this many seconds; 0 or a
+    negative value turns the profiler off.
+    """
+    global _enabled, _allocations, _profile_over_s
+    if enabled is not None:
+        _enabled = bool(enabled)
+    if allocations is not None or not _enabled:
+        _allocations = bool(allocations if allocations is not None else _allocations) and _enabled
+        if _allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not _allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    if profile_over_s is not False:
+        _profile_over_s = profile_over_s if profile_over_s and profile_over_s > 0 else None
+
+
+def settings():
+    return {"enabled": _enabled, "allocations": _allocations, "profile_over_s": _profile_over_s}
+
+
+class _Run:
+    __slots__ = ("session", "label", "thread", "t0", "spans", "stack", "profiler", "finished")
+
+    def __init__(self, session, label):
+        self.session = session
+        self.label = label
+        self.thread = threading.get_ident()
+        self.spans = []          # (name, start s, duration s, depth, alloc net bytes, alloc peak bytes)
+        self.stack = []          # open spans [start, traced bytes at start, peak traced bytes]; [0] is the segment
+        self.profiler = None
+        self.finished = False
+        self.t0 = time.perf_counter()
+        self._open()
+
+    def _open(self):
+        span = [time.perf_counter(), 0, 0]
+        if _allocations and tracemalloc.is_tracing():
+            # tracemalloc keeps one peak: fold it into the enclosing span before restarting it
+            current, peak = tracemalloc.get_traced_memory()
+            if self.stack:
+                self.stack[-1][2] = max(self.stack[-1][2], peak)
+            tracemalloc.reset_peak()
+            span[1] = span[2] = current
+        self.stack.append(span)
+
+    def _close(self, name):
+        end = time.perf_counter()
+        span = self.stack.pop()
+        net = peak = 0
+        if _allocations and tracemalloc.is_tracing():
+            current, pk = tracemalloc.get_traced_memory()
+            span[2] = max(span[2], pk)
+            net, peak = current - span[1], span[2] - span[1]
+            if self.stack:
+                self.stack[-1][2] = max(self.stack[-1][2], span[2])
+            tracemalloc.reset_peak()
+        self.spans.append((name, span[0] - _t_origin, end - span[0], len(self.stack), net, peak))
+
+
+def _current():
+    run = getattr(_local, "run", None)
+    return run if run is not None and not run.finished else None
+
+
+def begin_run(session="", label="rerun"):
+    """Starts timing a rerun on this thread (closing any run the thread left open)."""
+    end_run()
+    if not _enabled:
+        return None
+    run = _local.run = _Run(session, label)
+    if _profile_over_s:
+        run.profiler = cProfile.Profile()
+        run.profiler.enable()
+    return run
+
+
+def lap(name):
+    """Records the time since the previous lap (or the run's start) as segment `name`."""
+    if not _enabled:
+        return
+    run = _current()
+    if run is None:
+        return
+    while len(run.stack) > 1:
+        run._close("unclosed stage")
+    run._close(name)
+    run._open()
+
+
+@contextlib.contextmanager
+def _stage(run, name):
+    run._open()
+    try:
+        yield
+    finally:
+        run._close(name)
+
+
+def stage(name):
+    """Context manager timing a block inside the current segment; a shared no-op when disabled."""
+    if not _enabled:
+        return _NULL
+    run = _current()
+    return _stage(run, name) if run is not None else _NULL
+
+
+def end_run(tail="rest"):
+    """Finishes this thread's run: the open segment is recorded as `tail` (if it took any time)."""
+    run = _current()
+    if run is None:
+        return None
+    if run.profiler is not None:
+        run.profiler.disable()
+    while len(run.stack) > 1:
+        run._close("unclosed stage")
+    if time.perf_counter() - run.stack[0][0] > 1e-4:
+        run._close(tail)
+    run.finished = True
+    seconds = time.perf_counter() - run.t0
+    record = {"session": run.session, "label": run.label, "thread": run.thread, "start_s": run.t0 - _t_origin,
+              "seconds": seconds, "wall_time": time.time() - seconds, "spans": run.spans}
+    with _lock:
+        _runs.append(record)
+        for name, _, duration, depth, net, peak in run.spans:
+            s = _stages.get(name)
+            if s is None:
+                s = _stages[name] = {"depth": depth, "count": 0, "seconds": 0.0, "max_s": 0.0,
+                                     "recent": deque(maxlen=STAGE_SAMPLES), "alloc_net": 0, "alloc_peak": 0}
+            s["count"] += 1
+            s["seconds"] += duration
+            s["max_s"] = max(s["max_s"], duration)
+            s["recent"].append(duration)
+            s["alloc_net"] += net
+            s["alloc_peak"] = max(s["alloc_peak"], peak)
+    if run.profiler is not None and _profile_over_s and seconds >= _profile_over_s:
+        _keep_profile(run.profiler, record)
+    return record
+
+
+def _keep_profile(profiler, record):
+    profiler.create_stats()
+    # marshal of the stats dict is the .prof format pstats/snakeviz read (taken first: Stats() empties it)
+    prof = marshal.dumps(profiler.stats)
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(40)
+    with _lock:
+        _profiles.append({"session": record["session"], "wall_time": record["wall_time"], "seconds": record["seconds"],
+                          "text": text.getvalue(), "prof": prof})
+
+
+# --- REPORTS ---
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def summary():
+    """One row per stage (first-seen order): count, total/mean/p50/p95/max seconds, allocations."""
+    with _lock:
+        stages = [(name, dict(s, recent=list(s["recent"]))) for name, s in _stages.items()]
+        runs = len(_runs)
+    rows = []
+    for name, s in stages:
+        rows.append({
+            "stage": name, "depth": s["depth"], "count": s["count"], "total_s": s["seconds"],
+            "mean_s": s["seconds"] / s["count"], "p50_s": _percentile(s["recent"], 0.5),
+            "p95_s": _percentile(s["recent"], 0.95), "max_s": s["max_s"],
+            "alloc_net_bytes": s["alloc_net"] / s["count"], "alloc_peak_bytes": s["alloc_peak"], "runs": runs,
+        })
+    return rows
+
+
+def recent_runs(limit=RECENT_RUNS):
+    """The last finished runs, newest first."""
+    with _lock:
+        return list(_runs)[::-1][:limit]
+
+
+def profiles():
+    """Kept slow-rerun profiles, newest first: text report (top 40 by cumulative time) and .prof bytes."""
+    with _lock:
+        return list(_profiles)[::-1]
+
+
+def chrome_trace(runs=None):
+    """Chrome trace event JSON (dict) of the given runs (default: all recent runs).
+
+    Every run is one slice with its spans nested below it; sessions are separate processes
+    in the viewer, so concurrent sessions don't overlap.
+    """
+    runs = recent_runs() if runs is None else runs
+    sessions = {}
+    events = []
+    for run in runs:
+        pid = sessions.setdefault(run["session"], len(sessions) + 1)
+        tid = run["thread"] % 100_000
+        events.append({"name": run["label"], "cat": "run", "ph": "X", "pid": pid, "tid": tid,
+                       "ts": run["start_s"] * 1e6, "dur": run["seconds"] * 1e6})
+        for name, start, duration, depth, net, peak in run["spans"]:
+            events.append({"name": name, "cat": "stage" if depth else "segment", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": start * 1e6, "dur": duration * 1e6,
+                           "args": {"alloc_net_bytes": net, "alloc_peak_bytes": peak}})
+    events += [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"session {session or '?'}"}}
+               for session, pid in sessions.items()]
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _runs.clear()
+        _profiles.clear()
+
+
+_env = os.environ.get("COILCALC_PROFILE", "").lower()
+if _env and _env not in ("0", "false", "no"):
+    configure(enabled=True, allocations=_env == "alloc")
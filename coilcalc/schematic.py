@@ -0,0 +1,256 @@
+"""Cross-section schematic of a design as a standalone SVG document."""
+import math
+
+from coilcalc.core import stack_layers
+
+# Stacks with more pancakes than this are drawn in compact mode by default
+COMPACT_MIN_PANCAKES = 12
+# Turn lines closer than this (px) are decimated to every k-th turn
+MIN_TURN_PX = 3.0
+# Periods (plate + pancake unit) thinner than this (px) are drawn as one shaded block
+MIN_PERIOD_PX = 3.0
+
+
+def _stack_runs(layers, max_tile=8):
+    """Groups the pancakes into runs of a repeating tile of periods (a plate below, then insul/cu/insul).
+
+    A tile is the tuple of plate heights (0.0 for none) of up to max_tile consecutive
+    pancakes, bottom up. Each run takes the tile that repeats over the most pancakes from
+    where it starts, so alternating plates such as 6/4/6/4 form a single run.
+    Returns (runs, top_plate): runs as [(tile, z_start_mm, count)] from the bottom,
+    top_plate as (z_mm, h_mm) of a plate above the last pancake, or None.
+    """
+    periods = []
+    plate = None
+    for i, (kind, z_mm, h_mm) in enumerate(layers):
+        if kind == "al":
+            plate = (z_mm, h_mm)
+        elif kind == "cu":
+            periods.append((plate[1] if plate else 0.0, plate[0] if plate else layers[i - 1][1]))
+            plate = None
+
+    heights = [h for h, _ in periods]
+    runs = []
+    i = 0
+    while i < len(heights):
+        best_len, best_count = 1, 1
+        for length in range(1, min(max_tile, len(heights) - i) + 1):
+            tile = heights[i:i + length]
+            count = 1
+            while heights[i + count * length:i + (count + 1) * length] == tile:
+                count += 1
+            if count > 1 and count * length > best_len * best_count:
+                best_len, best_count = length, count
+        runs.append((tuple(heights[i:i + best_len]), periods[i][1], best_count))
+        i += best_len * best_count
+    return runs, plate
+
+
+def generate_cross_section_svg(res, a_mm, b_max_mm, rad_dim_mode, plate_margin_mm, cooling_plates_list, num_pancakes,
+                               mode="auto", show_turns=False):
+    """Generates a proportional SVG cross-section drawing with dynamic Light/Dark mode and adaptive labels.
+
+    mode="detailed" draws every plate, insulation layer and pancake. mode="compact" defines
+    the insul/cu/insul unit once and one pattern per repeating plate sequence, shared by
+    every run of that sequence, and draws runs too fine to resolve as one shaded block, so
+    the document size no longer grows with the stack; "auto" switches to compact above
+    COMPACT_MIN_PANCAKES. show_turns overlays the turn boundaries, decimated to every k-th
+    turn when they would be closer than MIN_TURN_PX.
+    """
+    if mode == "auto":
+        mode = "compact" if num_pancakes > COMPACT_MIN_PANCAKES else "detailed"
+    
+    max_dim_mm = max(b_max_mm * 1.1, res['ax_total_mm'] * 1.1)
+    target_svg_size = 600 
+    scale = target_svg_size / max_dim_mm 
+    
+    pad_left = 80
+    pad_right = 150
+    pad_top = 50
+    pad_bottom = 50
+
+    svg_width = (b_max_mm * scale) + pad_left + pad_right
+    svg_height = (res['ax_total_mm'] * scale) + pad_top + pad_bottom
+    
+    origin_x = pad_left
+    origin_y = svg_height - pad_bottom
+
+    svg_elements = []
+    svg_defs = []
+
+    def rect_px(x_px, y_px, w_px, h_px, css_class, opacity=1.0):
+        return f'<rect x="{x_px:.1f}" y="{y_px:.1f}" width="{w_px:.1f}" height="{h_px:.1f}" class="{css_class} box-border" fill-opacity="{opacity}" />'
+
+    def draw_rect(x_mm, y_start_mm, w_mm, h_mm, css_class, label=None, opacity=1.0):
+        x_px = origin_x + (x_mm * scale)
+        y_px = origin_y - ((y_start_mm + h_mm) * scale) 
+        w_px = w_mm * scale
+        h_px = h_mm * scale
+        svg_elements.append(rect_px(x_px, y_px, w_px, h_px, css_class, opacity))
+        if label:
+             svg_elements.append(f'<text x="{x_px + w_px/2:.1f}" y="{y_px + h_px/2 + 5:.1f}" class="label-text" text-anchor="middle">{label}</text>')
+
+    def draw_dim_line(x1_mm, y1_mm, x2_mm, y2_mm, label_text, offset_mm=0, is_vertical=False):
+        x1_px = origin_x + (x1_mm * scale)
+        y1_px = origin_y - (y1_mm * scale)
+        x2_px = origin_x + (x2_mm * scale)
+        y2_px = origin_y - (y2_mm * scale)
+        off_px = offset_mm * scale
+        
+        if is_vertical:
+            svg_elements.append(f'<line x1="{x1_px+off_px}" y1="{y1_px}" x2="{x2_px+off_px}" y2="{y2_px}" class="dim-line" marker-start="url(#arrow)" marker-end="url(#arrow)"/>')
+            svg_elements.append(f'<line x1="{x1_px}" y1="{y1_px}" x2="{x1_px+off_px+5}" y2="{y1_px}" class="dim-line-thin"/>')
+            svg_elements.append(f'<line x1="{x2_px}" y1="{y2_px}" x2="{x2_px+off_px+5}" y2="{y2_px}" class="dim-line-thin"/>')
+            svg_elements.append(f'<text x="{x1_px+off_px+10}" y="{(y1_px+y2_px)/2}" class="dim-text" dominant-baseline="middle">{label_text}</text>')
+        else:
+            svg_elements.append(f'<line x1="{x1_px}" y1="{y1_px+off_px}" x2="{x2_px}" y2="{y2_px+off_px}" class="dim-line" marker-start="url(#arrow)" marker-end="url(#arrow)"/>')
+            svg_elements.append(f'<line x1="{x1_px}" y1="{y1_px}" x2="{x1_px}" y2="{y1_px+off_px+5}" class="dim-line-thin"/>')
+            svg_elements.append(f'<line x1="{x2_px}" y1="{y2_px}" x2="{x2_px}" y2="{y2_px+off_px+5}" class="dim-line-thin"/>')
+            svg_elements.append(f'<text x="{(x1_px+x2_px)/2}" y="{y1_px+off_px+15}" class="dim-text" text-anchor="middle">{label_text}</text>')
+
+    # Background / Mold Limits
+    svg_elements.append(f'<line x1="{origin_x}" y1="{pad_top}" x2="{origin_x}" y2="{svg_height-pad_bottom}" class="dim-line" stroke-dasharray="5,5"/>')
+    draw_rect(a_mm, 0, b_max_mm-a_mm, res['ax_total_mm'], "epoxy", opacity=0.5) 
+    svg_elements.append(f'<line x1="{origin_x + a_mm*scale}" y1="{pad_top}" x2="{origin_x + a_mm*scale}" y2="{svg_height-pad_bottom}" class="mold-line"/>')
+    svg_elements.append(f'<line x1="{origin_x + b_max_mm*scale}" y1="{pad_top}" x2="{origin_x + b_max_mm*scale}" y2="{svg_height-pad_bottom}" class="mold-line"/>')
+
+    # Turn boundaries: one pattern of vertical hairlines, every k-th turn at small scales
+    cu_x_px = origin_x + res['winding_a_mm'] * scale
+    cu_w_px = res['build_mm'] * scale
+    turns_fill = None
+    if show_turns and res['turns_per_pancake'] > 1:
+        pitch_px = cu_w_px / res['turns_per_pancake']
+        turn_step = math.ceil(MIN_TURN_PX / pitch_px)
+        svg_defs.append(f'<pattern id="turns" patternUnits="userSpaceOnUse" x="{cu_x_px:.2f}" y="0" width="{turn_step * pitch_px:.3f}" height="8">'
+                        f'<rect x="0" y="0" width="0.6" height="8" class="turn-line"/></pattern>')
+        turns_fill = "url(#turns)"
+        if turn_step > 1:
+            svg_elements.append(f'<text x="{svg_width/2}" y="46" class="dim-text" text-anchor="middle">turn lines: every {turn_step} turns</text>')
+
+    # Draw The Stack
+    layers = stack_layers(res, cooling_plates_list, num_pancakes)
+    if mode == "detailed":
+        for kind, z_mm, h_mm in layers:
+            if kind == "cu":
+                draw_rect(res['winding_a_mm'], z_mm, res['build_mm'], h_mm, "cu", label="Cu")
+                if turns_fill:
+                    y_px = origin_y - (z_mm + h_mm) * scale
+                    svg_elements.append(f'<rect x="{cu_x_px:.1f}" y="{y_px:.1f}" width="{cu_w_px:.1f}" height="{h_mm * scale:.1f}" fill="{turns_fill}"/>')
+            else:
+                draw_rect(a_mm, z_mm, b_max_mm-a_mm, h_mm, kind)
+    else:
+        runs, top_plate = _stack_runs(layers)
+        insul_px = res['ax_insul_mm'] / (num_pancakes * 2) * scale
+        cake_px = res['ax_pancakes_mm'] / num_pancakes * scale
+        unit_px = 2 * insul_px + cake_px
+        plate_x_px = origin_x + a_mm * scale
+        plate_w_px = (b_max_mm - a_mm) * scale
+
+        # The repeated unit, top down from y = 0: insul, cu, insul
+        unit = [rect_px(plate_x_px, 0, plate_w_px, insul_px, "insul"),
+                rect_px(cu_x_px, insul_px, cu_w_px, cake_px, "cu"),
+                rect_px(plate_x_px, insul_px + cake_px, plate_w_px, insul_px, "insul")]
+        if turns_fill:
+            unit.append(f'<rect x="{cu_x_px:.1f}" y="{insul_px:.1f}" width="{cu_w_px:.1f}" height="{cake_px:.1f}" fill="{turns_fill}"/>')
+        if cake_px >= 14:
+            unit.append(f'<text x="{cu_x_px + cu_w_px/2:.1f}" y="{insul_px + cake_px/2 + 5:.1f}" class="label-text" text-anchor="middle">Cu</text>')
+        svg_defs.append(f'<g id="unit">{"".join(unit)}</g>')
+
+        def shaded_block(bottom_px, height_px, pancakes, plated):
+            # Too fine to resolve: one block, the winding shaded by its share of the height
+            top_px = bottom_px - height_px
+            svg_elements.append(rect_px(plate_x_px, top_px, plate_w_px, height_px, "al" if plated else "insul"))
+            svg_elements.append(rect_px(cu_x_px, top_px, cu_w_px, height_px, "cu", opacity=round(pancakes * cake_px / height_px, 2)))
+
+        tiles = {}      # tile -> pattern id
+        block = None    # adjacent fine runs: [bottom_px, height_px, pancakes, plated]
+        for tile, z_mm, count in runs:
+            tile_px = len(tile) * unit_px + sum(tile) * scale
+            bottom_px = origin_y - z_mm * scale
+            if tile_px / len(tile) < MIN_PERIOD_PX:
+                if block is None:
+                    block = [bottom_px, 0.0, 0, False]
+                block[1] += count * tile_px
+                block[2] += count * len(tile)
+                block[3] = block[3] or any(tile)
+                continue
+            if block:
+                shaded_block(*block)
+                block = None
+            if tile not in tiles:
+                tiles[tile] = f"tile{len(tiles)}"
+                # Top down: the tile's last pancake first, each unit with its plate below it
+                parts = []
+                y_px = 0.0
+                for plate_h_mm in reversed(tile):
+                    parts.append(f'<use href="#unit" y="{y_px:.3f}"/>')
+                    if plate_h_mm:
+                        parts.append(rect_px(plate_x_px, y_px + unit_px, plate_w_px, plate_h_mm * scale, "al"))
+                    y_px += unit_px + plate_h_mm * scale
+                svg_defs.append(f'<pattern id="{tiles[tile]}" patternUnits="userSpaceOnUse" width="{svg_width:.1f}" height="{tile_px:.3f}">'
+                                f'{"".join(parts)}</pattern>')
+            # The pattern starts at the run's top edge: its user space is translated there
+            svg_elements.append(f'<rect x="0" y="0" width="{svg_width:.1f}" height="{count * tile_px:.1f}" '
+                                f'transform="translate(0 {bottom_px - count * tile_px:.3f})" fill="url(#{tiles[tile]})"/>')
+        if block:
+            shaded_block(*block)
+        if top_plate:
+            draw_rect(a_mm, top_plate[0], b_max_mm-a_mm, top_plate[1], "al")
+
+    # Adaptive Labels
+    if rad_dim_mode == "Diameter":
+        label_in = f"Plate ID: {a_mm*2:.1f}"
+        label_out = f"Plate OD: {b_max_mm*2:.1f}"
+        label_wind = f"Winding OD: {res['winding_b_actual_mm']*2:.1f}"
+    else:
+        label_in = f"Plate Inner Rad: {a_mm:.1f}"
+        label_out = f"Plate Max Rad: {b_max_mm:.1f}"
+        label_wind = f"Winding Outer Rad: {res['winding_b_actual_mm']:.1f}"
+
+    draw_dim_line(0, 0, a_mm, 0, label_in, offset_mm=-20)
+    draw_dim_line(0, 0, res['winding_b_actual_mm'], 0, label_wind, offset_mm=-45)
+    draw_dim_line(0, 0, b_max_mm, 0, label_out, offset_mm=-70)
+    draw_dim_line(b_max_mm, 0, b_max_mm, res['ax_total_mm'], f"Total Axial: {res['ax_total_mm']:.1f} mm", offset_mm=20, is_vertical=True)
+
+    svg_header = f"""<svg width="{svg_width}" height="{svg_height}" xmlns="http://www.w3.org/2000/svg">
+    <style>
+        .cu {{ fill: #B87333; }}
+        .al {{ fill: #A0A0A4; }}
+        .epoxy {{ fill: #E0E0E0; }}
+        .insul {{ fill: #F0E68C; }}
+        .mold-line {{ stroke: #FF0000; stroke-width: 2px; }}
+        .box-border {{ stroke: #000000; stroke-width: 1px; }}
+        .dim-line {{ stroke: #000000; stroke-width: 1px; }}
+        .dim-line-thin {{ stroke: #000000; stroke-width: 0.5px; }}
+        .dim-text {{ font-family: Arial; font-size: 14px; fill: #000000; }}
+        .label-text {{ font-family: Arial; font-size: 12px; fill: #000000; font-weight: bold; }}
+        .title-text {{ font-family: Arial; font-size: 20px; font-weight: bold; fill: #000000; }}
+        .arrow-head {{ fill: #000000; }}
+        .turn-line {{ fill: #5A3010; }}
+
+        @media (prefers-color-scheme: dark) {{
+            .cu {{ fill: #C88343; }}
+            .al {{ fill: #606064; }}
+            .epoxy {{ fill: #303030; }}
+            .insul {{ fill: #B3A95B; }}
+            .mold-line {{ stroke: #FF5555; }}
+            .box-border {{ stroke: #E0E0E0; }}
+            .dim-line {{ stroke: #E0E0E0; }}
+            .dim-line-thin {{ stroke: #A0A0A0; }}
+            .dim-text {{ fill: #E0E0E0; }}
+            .label-text {{ fill: #1E1E1E; }}
+            .title-text {{ fill: #FFFFFF; }}
+            .arrow-head {{ fill: #E0E0E0; }}
+            .turn-line {{ fill: #3A1A00; }}
+        }}
+    </style>
+    <defs>
+        <marker id="arrow" markerWidth="10" markerHeight="10" refX="9" refY="3" orient="auto" markerUnits="strokeWidth">
+            <path d="M0,0 L0,6 L9,3 z" class="arrow-head" />
+        </marker>{"".join(svg_defs)}
+    </defs>
+    <text x="{svg_width/2}" y="30" class="title-text" text-anchor="middle">Dynamic Cross-Section Schematic</text>
+    """
+    svg_footer = "</svg>"
+    
+    return svg_header + "".join(svg_elements) + svg_footer
@@ -0,0 +1,637 @@
+"""Local HTTP JSON API: python -m coilcalc.server [--port 8765]
+
+Endpoints (JSON bodies; design inputs are named like optimize_pancake_coil()'s, missing ones
+fall back to the app defaults, `turn_model` is "mlt" or "spiral"):
+
+  POST /design      one design -> its results (422 with {"error": ...} if it can't be built)
+  POST /designs     {"designs": [...]} -> {"results": [...]}, an error object per bad design
+  POST /sweep       {"columns": {...}} or {"grid": {...}}, optional "format" -> sweep results
+  POST /schematic   one design + optional rad_dim_mode, show_turns, mode -> SVG
+  POST /field       one design + optional grid_n, lumped -> |B| map and axial Bz
+  GET  /metrics     request counts, latencies and batch sizes (Prometheus text; ?format=json)
+  GET  /health
+
+Concurrent /design requests are coalesced into one optimize_pancake_coil_batch() call, so
+throughput comes from the vectorized engine rather than from one evaluation per request.
+Sweeps, schematics and field maps run on a process pool. Client and LocalServer make the
+service usable from scripts and testable without opening a public port.
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from coilcalc.batch import optimize_pancake_coil_batch
+from coilcalc.core import DEFAULT_INPUTS, RESULT_FIELDS, TURN_MODELS, DesignError, optimize_pancake_coil
+
+DEFAULT_PORT = 8765
+MAX_BODY = 64 << 20
+MAX_SWEEP_ROWS = 5_000_000
+
+# Coalesced batches smaller than this go through the scalar path: it costs ~12 us per
+# design, while a batch call has ~0.3 ms of fixed overhead and ~5 us per design.
+BATCH_MIN = 128
+
+# Everything the batch engine takes per row (the plate stack as its total thickness)
+INPUT_FIELDS = tuple(k for k in DEFAULT_INPUTS if k != "cooling_plates_mm") + ("plates_axial_mm",)
+# Inputs that must be > 0 (checked by parse_design)
+POSITIVE_FIELDS = ("t_cu_mm", "w_cu_mm", "t_mylar_mm", "w_mylar_mm", "dT_water")
+# Result keys in optimize_pancake_coil()'s order
+RESPONSE_FIELDS = ("constraint_type",) + RESULT_FIELDS[:8] + ("shape_type",) + RESULT_FIELDS[8:]
+
+# Latency histogram bucket bounds (s) for /metrics
+LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+BATCH_BUCKETS = (1, 4, 16, 64, 256, 1024, 4096)
+
+ROUTES = ("/design", "/designs", "/sweep", "/schematic", "/field", "/metrics", "/health")
+
+_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- INPUTS ---
+def parse_design(obj):
+    """(turn_model, inputs) of a JSON design: numeric INPUT_FIELDS, the plate stack as plates_axial_mm.
+
+    Returns the plate list too when one was given, for the endpoints that draw the stack.
+    Raises HTTPError(400) on unknown keys, non-numeric values and out-of-range dimensions.
+    """
+    if not isinstance(obj, dict):
+        raise HTTPError(400, "a design must be a JSON object")
+    obj = dict(obj)
+    turn_model = obj.pop("turn_model", "mlt")
+    if turn_model not in TURN_MODELS:
+        raise HTTPError(400, f"turn_model must be one of {', '.join(TURN_MODELS)}, not {turn_model!r}")
+    plates = obj.pop("cooling_plates_mm", None)
+    unknown = set(obj) - set(INPUT_FIELDS)
+    if unknown:
+        raise HTTPError(400, f"unknown design inputs: {', '.join(sorted(unknown))}")
+    try:
+        inputs = {k: float(v) for k, v in obj.items()}
+        if plates is not None:
+            plates = [float(p) for p in plates]
+            inputs.setdefault("plates_axial_mm", float(sum(plates)))
+    except (TypeError, ValueError):
+        raise HTTPError(400, "design inputs must be numbers (cooling_plates_mm a list of numbers)") from None
+    if not all(math.isfinite(v) for v in inputs.values()):
+        raise HTTPError(400, "design inputs must be finite")
+    # Checked here rather than left to the engine: the scalar path would divide by zero
+    if min(inputs.get(k, 1.0) for k in POSITIVE_FIELDS) <= 0:
+        raise HTTPError(400, f"{', '.join(POSITIVE_FIELDS)} must be positive")
+    if inputs.get("num_pancakes", 1) < 1:
+        raise HTTPError(400, "num_pancakes must be at least 1")
+    if inputs.get("plates_axial_mm", 1.0) <= 0 or (plates is not None and min(plates, default=0.0) <= 0):
+        raise HTTPError(400, "cooling plates must have positive thicknesses")
+    return turn_model, inputs, plates
+
+
+def _scalar_design(turn_model, inputs, plates=None):
+    """optimize_pancake_coil() keyword arguments of parsed inputs."""
+    design = {**DEFAULT_INPUTS, **{k: v for k, v in inputs.items() if k != "plates_axial_mm"}}
+    for k in ("constraint_mode", "target_turns_per_pancake", "num_pancakes", "fiberglass_layers"):
+        design[k] = int(design[k])
+    if plates is not None:
+        design["cooling_plates_mm"] = plates
+    elif "plates_axial_mm" in inputs:
+        design["cooling_plates_mm"] = [inputs["plates_axial_mm"]]
+    return dict(design, turn_model=turn_model)
+
+
+def evaluate_designs(turn_model, designs):
+    """Results of parsed designs (dicts of inputs): a dict per design, or the exception it raised.
+
+    From BATCH_MIN designs on, one batch call; valid designs then match optimize_pancake_coil()
+    up to floating-point rounding (a few ulp), rejected ones are re-run through the scalar
+    path for its error message. Below that, each design is evaluated (and fails) on its own.
+    """
+    n = len(designs)
+    if n < BATCH_MIN:
+        out = []
+        for d in designs:
+            try:
+                out.append(optimize_pancake_coil(**_scalar_design(turn_model, d)))
+            except Exception as e:
+                out.append(e)
+        return out
+    columns = {}
+    for k in INPUT_FIELDS:
+        if any(k in d for d in designs):
+            default = DEFAULT_INPUTS.get(k, math.nan)
+            columns[k] = np.fromiter((d.get(k, default) for d in designs), np.float64, n)
+    if "plates_axial_mm" in columns:
+        missing = np.isnan(columns["plates_axial_mm"])
+        columns["plates_axial_mm"][missing] = float(sum(DEFAULT_INPUTS["cooling_plates_mm"]))
+    res = optimize_pancake_coil_batch(turn_model, **columns)
+    rows = zip(*(np.broadcast_to(res[k], (n,)).tolist() for k in RESPONSE_FIELDS))
+    out = [dict(zip(RESPONSE_FIELDS, row)) for row in rows]
+    for i in np.flatnonzero(~np.broadcast_to(res["valid"], (n,))):
+        try:
+            optimize_pancake_coil(**_scalar_design(turn_model, designs[i]))
+        except Exception as e:
+            out[i] = e
+    return out
+
+
+def _jsonable(value):
+    """value with arrays as lists and NaN/Infinity as None, so strict JSON can encode it."""
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f" and not np.isfinite(value).all():
+            value = np.where(np.isfinite(value), value.astype(object), None)
+        return value.tolist()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def json_bytes(value):
+    """Strict JSON (no NaN or Infinity tokens) of a response body; non-finite numbers become null."""
+    return json.dumps(_jsonable(value), allow_nan=False).encode()
+
+
+# --- POOL JOBS (run in worker processes) ---
+def sweep_job(columns, turn_model, fmt):
+    """Evaluates a sweep; returns (body, content type)."""
+    from coilcalc.cli import evaluate_chunk
+    from coilcalc.export import export_bytes, iter_chunks
+    out = evaluate_chunk(columns, turn_model=turn_model)
+    if fmt == "json":
+        return json_bytes({"rows": len(out["valid"]), "columns": out}), "application/json"
+    data, _, mime = export_bytes(iter_chunks(out), fmt)
+    return data, mime
+
+
+def schematic_job(design, rad_dim_mode, show_turns, mode):
+    from coilcalc.schematic import generate_cross_section_svg
+    res = optimize_pancake_coil(**design)
+    svg = generate_cross_section_svg(res, design["a_mm"], design["b_max_mm"], rad_dim_mode, design["plate_margin_mm"],
+                                     design["cooling_plates_mm"], design["num_pancakes"], mode=mode, show_turns=show_turns)
+    return svg.encode("utf-8"), "image/svg+xml"
+
+
+def field_job(design, grid_n, lumped):
+    from coilcalc.field import field_grid
+    res = optimize_pancake_coil(**design)
+    grid = field_grid(res, design["cooling_plates_mm"], design["num_pancakes"], design["t_cu_mm"], design["t_mylar_mm"],
+                      design["I_const"], lumped, grid_n)
+    body = dict(grid, B_max_T=float(grid["B_T"].max()))
+    return json_bytes(body), "application/json"
+
+
+# --- METRICS ---
+class Metrics:
+    """Counters and histograms per route, plus coalesced batch sizes."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.routes = {}
+        self.batches = 0
+        self.batched_designs = 0
+        self.batch_hist = [0] * (len(BATCH_BUCKETS) + 1)
+        self.in_flight = 0
+        self._recent = deque()   # completion times over the last 10 s, for the current rate
+
+    def observe(self, route, status, seconds):
+        r = self.routes.get(route)
+        if r is None:
+            r = self.routes[route] = {"count": 0, "errors": 0, "seconds": 0.0, "hist": [0] * (len(LATENCY_BUCKETS) + 1)}
+        r["count"] += 1
+        r["errors"] += status >= 400
+        r["seconds"] += seconds
+        r["hist"][np.searchsorted(LATENCY_BUCKETS, seconds)] += 1
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent[0] < now - 10.0:
+            self._recent.popleft()
+
+    def observe_batch(self, size):
+        self.batches += 1
+        self.batched_designs += size
+        self.batch_hist[np.searchsorted(BATCH_BUCKETS, size)] += 1
+
+    def _quantile(self, hist, q):
+        target = q * sum(hist)
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS + (math.inf,), hist):
+            total += count
+            if total >= target:
+                return bound
+        return math.inf
+
+    def snapshot(self):
+        uptime = time.time() - self.started
+        now = time.monotonic()
+        recent = sum(1 for t in self._recent if t >= now - 10.0)
+        return {
+            "uptime_s": uptime,
+            "in_flight": self.in_flight,
+            "requests": sum(r["count"] for r in self.routes.values()),
+            "requests_per_s_10s": recent / min(10.0, max(uptime, 1e-9)),
+            "batches": self.batches,
+            "mean_batch_size": self.batched_designs / self.batches if self.batches else 0.0,
+            "routes": {route: {"count": r["count"], "errors": r["errors"],
+                               "mean_latency_s": r["seconds"] / r["count"],
+                               "p50_latency_s": self._quantile(r["hist"], 0.5),
+                               "p99_latency_s": self._quantile(r["hist"], 0.99)}
+                       for route, r in self.routes.items()},
+        }
+
+    def prometheus(self):
+        lines = [
+            "# TYPE coilcalc_uptime_seconds gauge", f"coilcalc_uptime_seconds {time.time() - self.started:.3f}",
+            "# TYPE coilcalc_in_flight gauge", f"coilcalc_in_flight {self.in_flight}",
+            "# TYPE coilcalc_requests_total counter",
+        ]
+        for route, r in self.routes.items():
+            lines.append(f'coilcalc_requests_total{{route="{route}"}} {r["count"]}')
+        lines.append("# TYPE coilcalc_errors_total counter")
+        for route, r in self.routes.items():
+            lines.append(f'coilcalc_errors_total{{route="{route}"}} {r["errors"]}')
+        lines.append("# TYPE coilcalc_request_seconds histogram")
+        for route, r in self.routes.items():
+            cumulative = np.cumsum(r["hist"])
+            for bound, count in zip(LATENCY_BUCKETS + (math.inf,), cumulative):
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                lines.append(f'coilcalc_request_seconds_bucket{{route="{route}",le="{le}"}} {count}')
+            lines.append(f'coilcalc_request_seconds_sum{{route="{route}"}} {r["seconds"]:.6f}')
+            lines.append(f'coilcalc_request_seconds_count{{route="{route}"}} {r["count"]}')
+        lines.append("# TYPE coilcalc_batch_size histogram")
+        for bound, count in zip(BATCH_BUCKETS + (math.inf,), np.cumsum(self.batch_hist)):
+            le = "+Inf" if bound == math.inf else f"{bound:g}"
+            lines.append(f'coilcalc_batch_size_bucket{{le="{le}"}} {count}')
+        lines.append(f"coilcalc_batch_size_sum {self.batched_designs}")
+        lines.append(f"coilcalc_batch_size_count {self.batches}")
+        return "\n".join(lines) + "\n"
+
+
+# --- SERVER ---
+class DesignServer:
+    """asyncio HTTP/1.1 server (keep-alive) for the endpoints in the module docstring.
+
+    /design requests queue up while a batch is being evaluated and are then evaluated
+    together, up to `max_batch` at a time; `batch_wait_s` > 0 additionally holds a partly
+    filled batch that long for more requests (more throughput, more latency). The batch runs
+    on the event loop: at a few microseconds per design it is cheaper than handing it off.
+    Pool jobs are capped at twice the worker count in flight; the rest wait in order.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, workers=None, max_batch=4096, batch_wait_s=0.0):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.batch_wait_s = batch_wait_s
+        self.metrics = Metrics()
+        self._queue = None
+        self._pool = None
+        self._pool_slots = None
+        self._server = None
+        self._batcher = None
+        self._connections = {}
+
+    async def start(self):
+        from concurrent.futures import ProcessPoolExecutor
+        self._queue = asyncio.Queue()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._pool_slots = asyncio.Semaphore(2 * self.workers)
+        self._batcher = asyncio.create_task(self._run_batches())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        # Idle keep-alive connections would otherwise outlive the server: closing them ends their handlers
+        for writer in list(self._connections.values()):
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self._batcher.cancel()
+        self._pool.shutdown(cancel_futures=True)
+
+    async def serve_forever(self):
+        """Serves until cancelled; call start() first."""
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    # --- coalescing ---
+    async def _run_batches(self):
+        while True:
+            pending = [await self._queue.get()]
+            if self.batch_wait_s > 0:
+                await asyncio.sleep(self.batch_wait_s)
+            while len(pending) < self.max_batch and not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            groups = {}
+            for item in pending:
+                groups.setdefault(item[0], []).append(item)
+            for turn_model, items in groups.items():
+                try:
+                    results = evaluate_designs(turn_model, [inputs for _, inputs, _ in items])
+                except Exception:
+                    # A failed batch call must not fail every request in it: evaluate them one by one
+                    results = [evaluate_designs(turn_model, [inputs])[0] for _, inputs, _ in items]
+                for (_, _, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+            self.metrics.observe_batch(len(pending))
+
+    async def design(self, turn_model, inputs):
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((turn_model, inputs, future))
+        result = await future
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _in_pool(self, job, *args):
+        async with self._pool_slots:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, job, *args)
+
+    # --- routes ---
+    async def _route(self, method, path, query, body):
+        if path in ("/health", "/metrics"):
+            if method != "GET":
+                raise HTTPError(405, f"{path} takes GET")
+            if path == "/health":
+                return {"status": "ok", "workers": self.workers}
+            if query.get("format", ["prometheus"])[0] == "json":
+                return self.metrics.snapshot()
+            return self.metrics.prometheus().encode(), "text/plain; version=0.0.4"
+        if path not in ROUTES:
+            raise HTTPError(404, f"no endpoint {path}")
+        if method != "POST":
+            raise HTTPError(405, f"{path} takes POST")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body must be JSON") from None
+
+        if path == "/design":
+            return await self.design(*parse_design(payload)[:2])
+        if path == "/designs":
+            designs = payload.get("designs") if isinstance(payload, dict) else payload
+            if not isinstance(designs, list):
+                raise HTTPError(400, 'expected {"designs": [...]}')
+            parsed = [parse_design(d) for d in designs]
+            results = await asyncio.gather(*(self.design(t, inputs) for t, inputs, _ in parsed), return_exceptions=True)
+            for r in results:
+                if isinstance(r, Exception) and not isinstance(r, DesignError):
+                    raise r
+            return {"results": [{"error": str(r)} if isinstance(r, DesignError) else r for r in results]}
+        if path == "/sweep":
+            return await self._in_pool(sweep_job, *self._sweep_args(payload))
+
+        options = {k: payload.pop(k) for k in ("rad_dim_mode", "show_turns", "mode", "grid_n", "lumped") if k in payload}
+        turn_model, inputs, plates = parse_design(payload)
+        design = _scalar_design(turn_model, inputs, plates)
+        if path == "/schematic":
+            return await self._in_pool(schematic_job, design, options.get("rad_dim_mode", "Diameter"),
+                                       bool(options.get("show_turns", False)), options.get("mode", "auto"))
+        grid_n = int(options.get("grid_n", 60))
+        if not 2 <= grid_n <= 400:
+            raise HTTPError(400, "grid_n must be between 2 and 400")
+        return await self._in_pool(field_job, design, grid_n, bool(options.get("lumped", True)))
+
+    def _sweep_args(self, payload):
+        if not isinstance(payload, dict):
+            raise HTTPError(400, 'expected {"columns": {...}} or {"grid": {...}}')
+        turn_model = payload.get("turn_model", "mlt")
+        fmt = payload.get("format", "json")
+        if turn_model not in TURN_MODELS:
+            raise HTTPError(400, f"turn_model must be one of {', '.join(TURN_MODELS)}")
+        if fmt not in ("json", "csv", "parquet", "arrow"):
+            raise HTTPError(400, "format must be json, csv, parquet or arrow")
+        columns = dict(payload.get("columns") or {})
+        grid = payload.get("grid") or {}
+        unknown = (set(columns) | set(grid)) - set(INPUT_FIELDS)
+        if unknown:
+            raise HTTPError(400, f"unknown design inputs: {', '.join(sorted(unknown))}")
+        try:
+            columns = {k: np.asarray(v, dtype=float) for k, v in columns.items()}
+            axes = [np.asarray(v, dtype=float).ravel() for v in grid.values()]
+            # Grid axes vary along their own dimension; columns must match the grid size.
+            # The size is checked before anything of that size is allocated.
+            shapes = [v.shape for v in columns.values()] + ([(math.prod(a.size for a in axes),)] if axes else [])
+            shape = np.broadcast_shapes(*shapes) if shapes else (1,)
+        except ValueError as e:
+            raise HTTPError(400, f"sweep columns must be numeric and broadcastable: {e}") from None
+        n = math.prod(shape)
+        if n > MAX_SWEEP_ROWS:
+            raise HTTPError(413, f"sweep has {n:,} rows (limit {MAX_SWEEP_ROWS:,})")
+        if axes:
+            mesh = np.meshgrid(*axes, indexing="ij")
+            columns.update({k: m.ravel() for k, m in zip(grid, mesh)})
+        columns = {k: np.broadcast_to(v, shape).ravel() for k, v in columns.items()} or {"a_mm": np.array([DEFAULT_INPUTS["a_mm"]])}
+        return columns, turn_model, fmt
+
+    # --- HTTP ---
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                t0 = time.perf_counter()
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    writer.write(self._response(413, {"error": f"body over {MAX_BODY >> 20} MB"}, False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                url = urlsplit(target)
+                self.metrics.in_flight += 1
+                try:
+                    status, result = 200, await self._route(method, url.path, parse_qs(url.query), body)
+                except HTTPError as e:
+                    status, result = e.status, {"error": str(e)}
+                except DesignError as e:
+                    status, result = 422, {"error": str(e)}
+                except Exception as e:
+                    status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+                finally:
+                    self.metrics.in_flight -= 1
+                writer.write(self._response(status, result, keep_alive))
+                await writer.drain()
+                self.metrics.observe(url.path if url.path in ROUTES else "other", status, time.perf_counter() - t0)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    @staticmethod
+    def _response(status, result, keep_alive):
+        if isinstance(result, tuple):
+            body, content_type = result
+        else:
+            body, content_type = json_bytes(result), "application/json"
+        head = (f"HTTP/1.1 {status} {_STATUS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + body
+
+
+class LocalServer:
+    """A DesignServer on its own event loop thread, for scripts and offline tests.
+
+        with LocalServer() as server:
+            Client(server.url).design(I_const=80)
+
+    Binds 127.0.0.1 on a free port by default; keyword arguments go to DesignServer.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, **options):
+        self.server = DesignServer(host, port, **options)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="coilcalc-server", daemon=True)
+
+    @property
+    def url(self):
+        return f"http://{self.server.host}:{self.server.port}"
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self._loop).result()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# --- CLIENT ---
+class Client:
+    """Blocking client over one keep-alive connection (use one per thread).
+
+    Methods mirror the endpoints; design() raises DesignError like optimize_pancake_coil().
+    """
+
+    def __init__(self, url=f"http://127.0.0.1:{DEFAULT_PORT}", timeout=60.0):
+        parts = urlsplit(url)
+        self._conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            self._conn.request(method, path, body, headers)
+            response = self._conn.getresponse()
+        except (ConnectionError, http.client.HTTPException):
+            # The server closed an idle keep-alive connection: reconnect once
+            self._conn.close()
+            self._conn.request(method, path, body, headers)
+            response = self._conn.getresponse()
+        data = response.read()
+        content_type = response.getheader("Content-Type", "")
+        if response.status == 422:
+            raise DesignError(json.loads(data)["error"])
+        if response.status >= 400:
+            message = json.loads(data)["error"] if content_type.startswith("application/json") else data.decode()
+            raise RuntimeError(f"{method} {path}: {response.status} {message}")
+        return json.loads(data) if content_type.startswith("application/json") else data
+
+    def design(self, turn_model="mlt", **inputs):
+        return self._request("POST", "/design", dict(inputs, turn_model=turn_model))
+
+    def designs(self, designs):
+        """Results of a list of design dicts; designs that can't be built come back as {"error": ...}."""
+        return self._request("POST", "/designs", {"designs": list(designs)})["results"]
+
+    def sweep(self, columns=None, grid=None, turn_model="mlt", format="json"):
+        """Sweep results: {"rows", "columns"} for JSON, otherwise the compressed file's bytes."""
+        def lists(d):
+            return {k: np.asarray(v).tolist() for k, v in (d or {}).items()}
+        return self._request("POST", "/sweep", {"columns": lists(columns), "grid": lists(grid), "turn_model": turn_model,
+                                                "format": format})
+
+    def schematic(self, rad_dim_mode="Diameter", show_turns=False, mode="auto", **design):
+        return self._request("POST", "/schematic", dict(design, rad_dim_mode=rad_dim_mode, show_turns=show_turns,
+                                                        mode=mode)).decode("utf-8")
+
+    def field(self, grid_n=60, lumped=True, **design):
+        return self._request("POST", "/field", dict(design, grid_n=grid_n, lumped=lumped))
+
+    def metrics(self, format="json"):
+        result = self._request("GET", "/metrics?format=" + format)
+        return result if format == "json" else result.decode()
+
+    def health(self):
+        return self._request("GET", "/health")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m coilcalc.server", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="pool processes for sweeps, schematics and field maps (default: all cores)")
+    parser.add_argument("--max-batch", type=int, default=4096, help="most /design requests evaluated together (default: 4096)")
+    parser.add_argument("--batch-wait-ms", type=float, default=0.0, help="hold partly filled batches this long for more requests (default: 0)")
+    args = parser.parse_args(argv)
+
+    server = DesignServer(args.host, args.port, args.workers, args.max_batch, args.batch_wait_ms / 1000.0)
+
+    async def run():
+        await server.start()
+        print(f"coilcalc API on http://{server.host}:{server.port} ({server.workers} pool workers)", file=sys.stderr)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
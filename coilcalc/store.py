@@ -0,0 +1,341 @@
+"""Persistent, content-addressed store of evaluated designs (SQLite), size-bounded with LRU eviction."""
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from coilcalc.batch import _batch_inputs, optimize_pancake_coil_batch
+from coilcalc.core import (CONSTRAINT_TYPES, DEFAULT_INPUTS, RESULT_FIELDS, SHAPE_TYPES, TURN_MODELS,
+                           _check_turn_model, optimize_pancake_coil)
+
+# Part of every key: bump it whenever the physics changes, so older entries simply miss.
+STORE_VERSION = 1
+
+# Everything optimize_pancake_coil() reads, in key order. The plate stack only enters the
+# results through its total thickness, so that is what gets keyed.
+KEY_FIELDS = tuple(k for k in DEFAULT_INPUTS if k != "cooling_plates_mm") + ("plates_axial_mm", "turn_model")
+INT_FIELDS = ("constraint_mode", "target_turns_per_pancake", "num_pancakes", "fiberglass_layers")
+RESULT_DTYPES = {"fits_window": bool, "turns_per_pancake": np.int64, "total_turns": np.int64}
+
+DEFAULT_STORE_PATH = os.environ.get("COILCALC_STORE") or os.path.join(os.path.expanduser("~"), ".cache", "coilcalc", "results.sqlite")
+
+# Bound parameters per IN (...) query; SQLite allows 32766 since 3.32.
+QUERY_BATCH = 30_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS designs (
+    key INTEGER PRIMARY KEY,     -- first 64 bits of the content hash
+    chk INTEGER NOT NULL,        -- second 64 bits, checked on every hit
+    inputs BLOB NOT NULL,        -- canonical KEY_FIELDS row, float64
+    result BLOB NOT NULL,        -- RESULT_FIELDS row, float64
+    plates TEXT,                 -- plate stack as entered, when known
+    source TEXT,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS access (key INTEGER PRIMARY KEY, last_access REAL NOT NULL);
+"""
+
+
+# ================= CANONICAL KEYS =================
+def canonical_inputs(turn_model="mlt", **inputs):
+    """(n, len(KEY_FIELDS)) float64 matrix of the flattened, broadcast design inputs.
+
+    Inputs that can't change the result are normalized so equal designs share a key: the
+    target turns of a max-turns design, the turn model of a fixed-MLT design, -0.0.
+    """
+    _check_turn_model(turn_model)
+    d = _batch_inputs(inputs)
+    n = next(iter(d.values())).size
+    canon = np.empty((n, len(KEY_FIELDS)), order="F")     # column-major: hashing walks columns
+    for j, k in enumerate(KEY_FIELDS[:-1]):
+        canon[:, j] = np.ravel(d[k])
+    col = {k: canon[:, j] for j, k in enumerate(KEY_FIELDS)}
+    space_mode = col["constraint_mode"] == 1
+    col["constraint_mode"][:] = np.where(space_mode, 1, 2)
+    col["target_turns_per_pancake"][:] = np.where(space_mode, 0, np.trunc(col["target_turns_per_pancake"]))
+    col["turn_model"][:] = np.where(col["MLT_input_m"] > 0, 0, TURN_MODELS.index(turn_model))
+    canon += 0.0
+    return canon
+
+
+def _mix64(h):
+    """splitmix64 finalizer, in place on a uint64 array."""
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def design_keys(canon):
+    """Two independent 64-bit hash lanes of each canonical row, as int64 (key, chk) arrays.
+
+    Vectorized over rows: each lane folds the rows' float64 bit patterns through splitmix64,
+    seeded with STORE_VERSION, so 10^6 keys take a fraction of a second.
+    """
+    words = np.asarray(canon, dtype=np.float64).view(np.uint64)
+    lanes = []
+    for lane in (1, 2):
+        h = np.full(words.shape[0], (STORE_VERSION << 8 | lane) * 0x9E3779B97F4A7C15 & (2**64 - 1), dtype=np.uint64)
+        for j in range(words.shape[1]):
+            h ^= words[:, j]
+            _mix64(h)
+        lanes.append(h.view(np.int64))
+    return lanes[0], lanes[1]
+
+
+def _design_dict(row):
+    """optimize_pancake_coil() keyword arguments of a canonical row (plates as one total)."""
+    design = {k: (int(v) if k in INT_FIELDS else float(v)) for k, v in zip(KEY_FIELDS[:-1], row[:-1])}
+    design["turn_model"] = TURN_MODELS[int(row[-1])]
+    return design
+
+
+def _result_dict(row):
+    """RESULT_FIELDS of a stored row with the scalar path's types (bool, int, float)."""
+    return {k: np.asarray(v, dtype=RESULT_DTYPES.get(k, np.float64)).item() for k, v in zip(RESULT_FIELDS, row)}
+
+
+def _labels(canon):
+    """constraint_type and shape_type columns, as the engine would label them."""
+    col = {k: canon[:, j] for j, k in enumerate(KEY_FIELDS)}
+    constraint = np.where(col["constraint_mode"] == 1, CONSTRAINT_TYPES[1], CONSTRAINT_TYPES[2]).astype(object)
+    shape = np.array(SHAPE_TYPES, dtype=object)[np.where(col["MLT_input_m"] > 0, 1, np.where(col["turn_model"] == 1, 2, 0))]
+    return constraint, shape
+
+
+# ================= STORE =================
+class ResultStore:
+    """SQLite file of evaluated designs keyed by the hash of their canonical inputs.
+
+    Lookups and inserts go through a few large IN (...) / executemany statements on
+    sorted keys, never one statement per design. A sorted in-memory copy of the stored keys
+    answers misses without touching SQLite; it is reloaded only when another connection
+    has written (PRAGMA data_version). Every hit refreshes the design's last access in a
+    narrow side table; once the file's live pages exceed `max_bytes`, the least recently
+    used designs are dropped down to 90% of it. Safe to share between threads, and between
+    processes through SQLite's WAL locking.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, max_bytes=256 << 20):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._keys = None
+        self._data_version = None
+        self._db = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- bulk operations ---
+    def _known_keys(self):
+        version, = self._db.execute("PRAGMA data_version").fetchone()
+        if self._keys is None or version != self._data_version:
+            cur = self._db.execute("SELECT key FROM designs")
+            self._keys = np.sort(np.fromiter((r[0] for r in cur), np.int64))
+            self._data_version = version
+        return self._keys
+
+    def get_many(self, key, chk):
+        """(hit mask, RESULT_FIELDS matrix of the hits, in query order) for key/chk arrays."""
+        order = np.argsort(key, kind="stable")
+        uniq = np.unique(key)
+        found = []
+        with self._lock, self._db:
+            known = self._known_keys()
+            pos = np.minimum(np.searchsorted(known, uniq), max(known.size - 1, 0))
+            uniq = uniq[known[pos] == uniq] if known.size else uniq[:0]
+            for s in range(0, uniq.size, QUERY_BATCH):
+                part = uniq[s:s + QUERY_BATCH].tolist()
+                marks = ",".join("?" * len(part))
+                found += self._db.execute(f"SELECT key, chk, result FROM designs WHERE key IN ({marks})", part).fetchall()
+                self._db.execute(f"UPDATE access SET last_access = ? WHERE key IN ({marks})", [time.time()] + part)
+        hit = np.zeros(key.size, dtype=bool)
+        values = np.empty((0, len(RESULT_FIELDS)))
+        if found:
+            fk = np.fromiter((r[0] for r in found), np.int64, len(found))
+            fc = np.fromiter((r[1] for r in found), np.int64, len(found))
+            fo = np.argsort(fk)
+            pos = np.searchsorted(fk[fo], key[order])
+            pos = np.minimum(pos, fk.size - 1)
+            ok = (fk[fo][pos] == key[order]) & (fc[fo][pos] == chk[order])
+            hit[order[ok]] = True
+            blobs = [found[i][2] for i in fo[pos[ok]]]
+            values = np.frombuffer(b"".join(blobs), dtype=np.float64).reshape(-1, len(RESULT_FIELDS))
+            # Rows come out in sorted-key order; put them back in query order
+            values = values[np.argsort(order[ok], kind="stable")]
+        self.hits += int(hit.sum())
+        self.misses += int(key.size - hit.sum())
+        return hit, values
+
+    def put_many(self, key, chk, canon, values, plates=None, source="batch"):
+        """Inserts (or replaces) designs: key/chk arrays, canonical input and result matrices.
+
+        `plates` is the plate stack text stored with every row (the app's single designs).
+        """
+        now = time.time()
+        order = np.argsort(key, kind="stable")
+        canon = np.ascontiguousarray(canon[order], dtype=np.float64)
+        values = np.ascontiguousarray(values[order], dtype=np.float64)
+        keys = key[order].tolist()
+        rows = zip(keys, chk[order].tolist(), map(bytes, canon), map(bytes, values),
+                   [plates] * len(keys), [source] * len(keys), [now] * len(keys))
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO designs VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.executemany("INSERT OR REPLACE INTO access VALUES (?, ?)", zip(keys, [now] * len(keys)))
+            if self._keys is not None:
+                self._keys = np.union1d(self._keys, key)
+            if self._evict():
+                self._keys = None
+
+    def _evict(self):
+        page_size, = self._db.execute("PRAGMA page_size").fetchone()
+        pages, = self._db.execute("PRAGMA page_count").fetchone()
+        free, = self._db.execute("PRAGMA freelist_count").fetchone()
+        used = (pages - free) * page_size
+        if used <= self.max_bytes:
+            return 0
+        count, = self._db.execute("SELECT COUNT(*) FROM access").fetchone()
+        drop = int(np.ceil(count * (1.0 - 0.9 * self.max_bytes / used)))
+        self._db.execute("CREATE TEMP TABLE IF NOT EXISTS evict (key INTEGER PRIMARY KEY)")
+        self._db.execute("DELETE FROM evict")
+        self._db.execute("INSERT INTO evict SELECT key FROM access ORDER BY last_access LIMIT ?", (drop,))
+        self._db.execute("DELETE FROM designs WHERE key IN (SELECT key FROM evict)")
+        self._db.execute("DELETE FROM access WHERE key IN (SELECT key FROM evict)")
+        return drop
+
+    # --- browsing ---
+    def recent(self, limit=200):
+        """Most recently used designs, newest first, as a list of dicts.
+
+        Each has the design's optimize_pancake_coil() inputs (with plates_axial_mm, plus
+        cooling_plates_mm when it was stored from the app), RESULT_FIELDS, and the entry's
+        key, source, created and last_access.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT d.key, d.inputs, d.result, d.plates, d.source, d.created, a.last_access "
+                "FROM access a JOIN designs d ON d.key = a.key ORDER BY a.last_access DESC LIMIT ?", (limit,)).fetchall()
+        out = []
+        for key, inputs, result, plates, source, created, last_access in rows:
+            entry = _design_dict(np.frombuffer(inputs, dtype=np.float64))
+            if plates:
+                entry["cooling_plates_mm"] = [float(x) for x in plates.split(",")]
+            entry.update(_result_dict(np.frombuffer(result, dtype=np.float64)))
+            entry.update(key=f"{key & (2**64 - 1):016x}", source=source, created=created, last_access=last_access)
+            out.append(entry)
+        return out
+
+    def iter_columns(self, chunk_size=1 << 16):
+        """Every stored design as chunks of columns: KEY_FIELDS inputs, the engine's result columns, key, source, created.
+
+        Rows come out in key order, a chunk per query (keyset paging), so only a chunk is in
+        memory at a time and the lock is only held while a chunk is read: other callers, the
+        consumer included, can use the store between chunks.
+        """
+        last = None
+        while True:
+            with self._lock:
+                if last is None:
+                    rows = self._db.execute("SELECT key, inputs, result, source, created FROM designs ORDER BY key LIMIT ?",
+                                            (chunk_size,)).fetchall()
+                else:
+                    rows = self._db.execute("SELECT key, inputs, result, source, created FROM designs WHERE key > ? ORDER BY key LIMIT ?",
+                                            (last, chunk_size)).fetchall()
+            if not rows:
+                break
+            last = rows[-1][0]
+            canon = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float64).reshape(len(rows), -1)
+            values = np.frombuffer(b"".join(r[2] for r in rows), dtype=np.float64).reshape(len(rows), -1)
+            out = {k: canon[:, j].astype(np.int64) if k in INT_FIELDS else canon[:, j] for j, k in enumerate(KEY_FIELDS)}
+            out["turn_model"] = np.array(TURN_MODELS, dtype=object)[canon[:, -1].astype(np.int64)]
+            out["constraint_type"], out["shape_type"] = _labels(canon)
+            out.update({k: values[:, j].astype(RESULT_DTYPES.get(k, np.float64)) for j, k in enumerate(RESULT_FIELDS)})
+            out["key"] = np.fromiter((r[0] for r in rows), np.int64, len(rows))
+            out["source"] = np.array([r[3] for r in rows], dtype=object)
+            out["created"] = np.fromiter((r[4] for r in rows), np.float64, len(rows))
+            yield out
+
+    def stats(self):
+        with self._lock:
+            count, = self._db.execute("SELECT COUNT(*) FROM designs").fetchone()
+            page_size, = self._db.execute("PRAGMA page_size").fetchone()
+            pages, = self._db.execute("PRAGMA page_count").fetchone()
+            free, = self._db.execute("PRAGMA freelist_count").fetchone()
+        return {"designs": count, "bytes": (pages - free) * page_size, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM designs")
+            self._db.execute("DELETE FROM access")
+            self._keys = None
+
+
+# ================= CACHED EVALUATION =================
+def optimize_cached(store, **design):
+    """optimize_pancake_coil() through the store; raises DesignError like it (nothing stored)."""
+    plates = design.get("cooling_plates_mm", DEFAULT_INPUTS["cooling_plates_mm"])
+    canon = canonical_inputs(**design)
+    key, chk = design_keys(canon)
+    hit, values = store.get_many(key, chk)
+    if hit[0]:
+        constraint, shape = _labels(canon)
+        res = _result_dict(values[0])
+        res.update(constraint_type=constraint[0], shape_type=shape[0])
+        return res
+    res = optimize_pancake_coil(**design)
+    store.put_many(key, chk, canon, np.array([[res[k] for k in RESULT_FIELDS]], dtype=np.float64),
+                   plates=", ".join(f"{float(p):g}" for p in plates), source="app")
+    return res
+
+
+def evaluate_cached(store, turn_model="mlt", **inputs):
+    """optimize_pancake_coil_batch() over the flattened inputs, evaluating only store misses.
+
+    Valid new results are added to the store. Returns the engine's columns (1-d) plus a
+    `cached` mask of the rows that came from the store.
+    """
+    canon = canonical_inputs(turn_model, **inputs)
+    key, chk = design_keys(canon)
+    hit, values = store.get_many(key, chk)
+    miss = np.flatnonzero(~hit)
+    n = key.size
+
+    out = {k: np.ones(n, dtype=bool) for k in ("valid", "dims_ok", "mylar_ok", "turns_ok")}
+    out["constraint_type"], out["shape_type"] = _labels(canon)
+    for j, k in enumerate(RESULT_FIELDS):
+        out[k] = np.empty(n, dtype=RESULT_DTYPES.get(k, np.float64))
+        out[k][hit] = values[:, j]
+    if miss.size:
+        d = _batch_inputs(inputs)
+        res = optimize_pancake_coil_batch(turn_model, **{k: np.ravel(v)[miss] for k, v in d.items()})
+        for k in ("valid", "dims_ok", "mylar_ok", "turns_ok") + RESULT_FIELDS:
+            out[k][miss] = res[k]
+        ok = res["valid"]
+        if ok.any():
+            fresh = np.column_stack([np.asarray(res[k], dtype=np.float64)[ok] for k in RESULT_FIELDS])
+            store.put_many(key[miss][ok], chk[miss][ok], canon[miss][ok], fresh)
+    # Same column order as the engine's
+    names = ["valid", "dims_ok", "mylar_ok", "turns_ok", "constraint_type", *RESULT_FIELDS]
+    names.insert(names.index("MLT_m") + 1, "shape_type")
+    out = {k: out[k] for k in names}
+    out["cached"] = hit
+    return out
@@ -0,0 +1,155 @@
+"""Steady-state r-z thermal field of the potted stack (needs scipy)."""
+import math
+
+import numpy as np
+
+from coilcalc.core import DesignError, stack_layers
+
+# --- THERMAL CONDUCTIVITIES (W/m.K) ---
+k_cu = 390.0
+k_mylar = 0.15
+k_fiberglass = 0.30      # epoxy-impregnated glass cloth, through-thickness
+k_epoxy = 0.20
+k_al = 167.0
+
+# Effective plate-to-water heat transfer coefficient, referred to the plate's face area.
+h_plate_default = 2000.0  # W/m^2.K
+
+MATERIALS = ("Epoxy", "Aluminum", "Fiberglass", "Winding")
+EPOXY, ALUMINUM, FIBERGLASS, WINDING = range(4)
+
+
+def _edges(breaks_mm, cell_mm, min_cells=2):
+    """Cell edges through every breakpoint; each segment gets >= min_cells cells of <= cell_mm."""
+    edges = [breaks_mm[0]]
+    for lo, hi in zip(breaks_mm[:-1], breaks_mm[1:]):
+        if hi - lo <= 1e-9:
+            continue
+        n = max(min_cells, math.ceil((hi - lo) / cell_mm))
+        edges.extend(np.linspace(lo, hi, n + 1)[1:])
+    return np.asarray(edges)
+
+
+class StackThermalModel:
+    """Finite-volume model of one design's cross-section, factorized once.
+
+    The mesh covers the mold from the plate ID to the plate OD and the full stack height.
+    Cells are Epoxy, Aluminum (plates), Fiberglass (interfaces) or Winding; the winding is
+    an anisotropic Cu/mylar laminate (layers in series radially, in parallel axially) that
+    carries the dissipated power uniformly. Each plate gives up heat to the coolant through
+    `h_plate` over its face area; every outer surface of the potting is adiabatic.
+
+    The system is linear with a source-independent matrix, so temperature is
+    T = T_coolant + P * unit_rise. The factorization is kept for other source
+    distributions (solve()), while current and coolant sweeps are just scalings of
+    unit_rise.
+
+    The sparse LU factorization dominates and grows faster than the cell count: about
+    0.1 s at 20k cells, 0.3 s at 50k, 0.6 s at 100k, 2 s at 250k and 10 s at 1M (one
+    core). Peak and mean thermal resistance already agree to 3-4 digits at 10k cells, so
+    the default is 50k.
+    """
+
+    def __init__(self, res, a_mm, b_max_mm, plate_margin_mm, cooling_plates_mm, num_pancakes,
+                 t_cu_mm, t_mylar_mm, h_plate=h_plate_default, target_cells=50_000):
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.linalg import splu
+
+        if any(t <= 0 for t in cooling_plates_mm):
+            raise DesignError("Every cooling plate needs a positive thickness.")
+        layers = stack_layers(res, cooling_plates_mm, num_pancakes)
+        wa_mm = res['winding_a_mm']
+        wb_mm = res['winding_b_actual_mm']
+        plate_r_out_mm = min(wa_mm + res['build_mm'] + plate_margin_mm, b_max_mm)
+        height_mm = layers[-1][1] + layers[-1][2]
+
+        cell_mm = math.sqrt((b_max_mm - a_mm) * height_mm / target_cells)
+        r_breaks = sorted({a_mm, min(wa_mm, b_max_mm), min(wb_mm, b_max_mm), plate_r_out_mm, b_max_mm})
+        self.r_edges_mm = _edges(r_breaks, cell_mm)
+        self.z_edges_mm = _edges([layers[0][1]] + [z0 + h for _, z0, h in layers], cell_mm)
+        rc = 0.5 * (self.r_edges_mm[1:] + self.r_edges_mm[:-1])
+        zc = 0.5 * (self.z_edges_mm[1:] + self.z_edges_mm[:-1])
+        nr, nz = rc.size, zc.size
+
+        # --- Materials, row by row (z) from the layer each row falls in ---
+        layer_tops = np.array([z0 + h for _, z0, h in layers])
+        row_layer = np.minimum(np.searchsorted(layer_tops, zc), len(layers) - 1)
+        kinds = np.array([kind for kind, _, _ in layers])[row_layer]
+        inside_plate = rc < plate_r_out_mm
+        in_winding = (rc >= wa_mm) & (rc < wb_mm)
+        mat = np.full((nz, nr), EPOXY, dtype=np.int8)
+        mat[(kinds == "al")[:, None] & inside_plate] = ALUMINUM
+        mat[(kinds == "insul")[:, None] & inside_plate] = FIBERGLASS
+        mat[(kinds == "cu")[:, None] & in_winding] = WINDING
+        self.material = mat
+
+        layer_mm = t_cu_mm + t_mylar_mm
+        k_wind_r = layer_mm / (t_cu_mm / k_cu + t_mylar_mm / k_mylar)
+        k_wind_z = (t_cu_mm * k_cu + t_mylar_mm * k_mylar) / layer_mm
+        kr = np.array([k_epoxy, k_al, k_fiberglass, k_wind_r])[mat]
+        kz = np.array([k_epoxy, k_al, k_fiberglass, k_wind_z])[mat]
+
+        # --- Geometry (SI) ---
+        re = self.r_edges_mm / 1000.0
+        ze = self.z_edges_mm / 1000.0
+        dz = np.diff(ze)
+        ring = np.pi * np.diff(re**2)                      # annulus area of each radial column
+        vol = dz[:, None] * ring[None, :]
+        rcm = rc / 1000.0
+        zcm = zc / 1000.0
+
+        idx = np.arange(nz * nr).reshape(nz, nr)
+        rows, cols, vals = [], [], []
+
+        def couple(i, j, g):
+            rows.extend([i.ravel(), j.ravel(), i.ravel(), j.ravel()])
+            cols.extend([i.ravel(), j.ravel(), j.ravel(), i.ravel()])
+            vals.extend([g.ravel(), g.ravel(), -g.ravel(), -g.ravel()])
+
+        # Radial faces: conductances of the two half-cells in series
+        area_r = 2 * np.pi * re[None, 1:-1] * dz[:, None]
+        d_in = re[1:-1] - rcm[:-1]
+        d_out = rcm[1:] - re[1:-1]
+        couple(idx[:, :-1], idx[:, 1:], area_r / (d_in / kr[:, :-1] + d_out / kr[:, 1:]))
+
+        # Axial faces
+        d_lo = ze[1:-1] - zcm[:-1]
+        d_hi = zcm[1:] - ze[1:-1]
+        couple(idx[:-1, :], idx[1:, :], ring[None, :] / (d_lo[:, None] / kz[:-1, :] + d_hi[:, None] / kz[1:, :]))
+
+        # Coolant sink: h over each plate's face area, spread through the plate thickness
+        plate_h_m = np.array([h for _, _, h in layers])[row_layer] / 1000.0
+        sink = np.where(mat == ALUMINUM, h_plate / plate_h_m[:, None], 0.0) * vol
+        rows.append(idx.ravel())
+        cols.append(idx.ravel())
+        vals.append(sink.ravel())
+
+        n = nz * nr
+        A = coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(n, n)).tocsc()
+        self._lu = splu(A, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options=dict(SymmetricMode=True))
+        self.shape = (nz, nr)
+        self.cell_volume_m3 = vol
+
+        # Unit rise: 1 W spread evenly over the winding volume
+        winding = mat == WINDING
+        q = np.where(winding, vol / vol[winding].sum(), 0.0)
+        self.unit_rise = self.solve(q)
+        self.theta_peak = float(self.unit_rise.max())
+        self.theta_mean = float((self.unit_rise * vol)[winding].sum() / vol[winding].sum())
+        self.hotspot_mm = (float(rc[np.argmax(self.unit_rise) % nr]), float(zc[np.argmax(self.unit_rise) // nr]))
+
+    @property
+    def cells(self):
+        return self.shape[0] * self.shape[1]
+
+    def solve(self, heat_W):
+        """Temperature rise (K) above the coolant for per-cell heat input (W), shape (nz, nr)."""
+        return self._lu.solve(np.asarray(heat_W, dtype=float).ravel()).reshape(self.shape)
+
+    def temperature(self, P_W, T_coolant_C):
+        """Temperature field (degC) for winding power P_W and mean coolant temperature."""
+        return T_coolant_C + P_W * self.unit_rise
+
+    def peak_temperature(self, P_W, T_coolant_C):
+        """Hot-spot temperature (degC); vectorized over P_W and T_coolant_C for sweeps."""
+        return np.asarray(T_coolant_C) + np.asarray(P_W) * self.theta_peak
@@ -0,0 +1,155 @@
+"""Monte Carlo tolerance analysis: sampled material/geometry inputs, streaming statistics only."""
+import time
+
+import numpy as np
+
+from coilcalc.batch import optimize_pancake_coil_batch
+from coilcalc.core import optimize_pancake_coil
+
+# Inputs that can be toleranced, and the result columns that are tracked.
+TOLERANCE_FIELDS = ("t_cu_mm", "t_mylar_mm", "w_cu_mm", "w_mylar_mm", "t_fiberglass_mm", "b_max_mm")
+TRACKED_FIELDS = ("R", "P", "wt_total_kg", "unused_space_mm", "build_mm", "V")
+
+# "normal": the tolerance is the +/-3 sigma band. "uniform": anywhere within +/- tolerance.
+# "triangular": peaked at nominal, zero at +/- tolerance.
+DISTRIBUTIONS = ("normal", "uniform", "triangular")
+
+
+class StreamingHistogram:
+    """Fixed-bin histogram over [lo, hi) that doubles as a quantile sketch.
+
+    Memory is constant whatever the number of values added. Quantiles are interpolated
+    within a bin, so they are exact to (hi - lo) / bins; values outside the range only
+    count towards under/overflow (and min/max), so the range should be set with margin.
+    Mean and variance are exact over all values: each chunk's mean and sum of squared
+    deviations are merged into the running ones (Chan et al.), which stays accurate for
+    narrow spreads around large values.
+    """
+
+    def __init__(self, lo, hi, bins=4096):
+        if not hi > lo:
+            hi = lo + max(abs(lo), 1.0) * 1e-9
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.n = 0
+        self._mean = 0.0
+        self._m2 = 0.0           # sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if not values.size:
+            return
+        lo, hi = self.edges[0], self.edges[-1]
+        bins = self.counts.size
+        idx = np.floor((values - lo) / (hi - lo) * bins).astype(np.int64)
+        inside = (idx >= 0) & (idx < bins)
+        self.counts += np.bincount(idx[inside], minlength=bins)
+        self.underflow += int((idx < 0).sum())
+        self.overflow += int((idx >= bins).sum())
+        chunk_mean = float(values.mean())
+        dev = values - chunk_mean
+        n = self.n + values.size
+        delta = chunk_mean - self._mean
+        self._mean += delta * values.size / n
+        self._m2 += float(np.dot(dev, dev)) + delta * delta * self.n * values.size / n
+        self.n = n
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def mean(self):
+        return self._mean if self.n else np.nan
+
+    @property
+    def std(self):
+        if self.n < 2:
+            return np.nan
+        return float(np.sqrt(self._m2 / (self.n - 1)))
+
+    def quantile(self, q):
+        """Approximate q-quantile(s), 0 <= q <= 1."""
+        q = np.asarray(q, dtype=float)
+        cum = np.concatenate(([self.underflow], self.underflow + np.cumsum(self.counts)))
+        target = q * self.n
+        # Interpolate linearly inside the bin that holds the target rank
+        k = np.clip(np.searchsorted(cum, target, side="left") - 1, 0, self.counts.size - 1)
+        frac = np.where(self.counts[k] > 0, (target - cum[k]) / np.maximum(self.counts[k], 1), 0.0)
+        out = self.edges[k] + np.clip(frac, 0.0, 1.0) * (self.edges[k + 1] - self.edges[k])
+        out = np.where(target <= self.underflow, self.min, out)
+        out = np.where(target > cum[-1], self.max, out)
+        return out
+
+    def rebinned(self, bins=60):
+        """(edges, counts) with `bins` coarser bins between the observed min and max, for plotting."""
+        lo = max(self.min, self.edges[0])
+        hi = min(self.max, self.edges[-1])
+        edges = np.linspace(lo, hi, bins + 1) if hi > lo else np.array([lo, lo + 1e-12])
+        centers = 0.5 * (self.edges[1:] + self.edges[:-1])
+        counts, _ = np.histogram(centers, bins=edges, weights=self.counts)
+        return edges, counts
+
+
+def _draw(rng, kind, nominal, tolerance, size):
+    if tolerance <= 0:
+        return np.full(size, float(nominal))
+    if kind == "normal":
+        return rng.normal(nominal, tolerance / 3.0, size)
+    if kind == "uniform":
+        return rng.uniform(nominal - tolerance, nominal + tolerance, size)
+    if kind == "triangular":
+        return rng.triangular(nominal - tolerance, nominal, nominal + tolerance, size)
+    raise ValueError(f"distribution must be one of {DISTRIBUTIONS}, not {kind!r}")
+
+
+def run_tolerance_analysis(design, tolerances, samples=1_000_000, chunk_size=1_000_000, seed=0,
+                           fields=TRACKED_FIELDS, bins=4096):
+    """Monte Carlo over input tolerances for one design, evaluated chunk by chunk.
+
+    `design` holds optimize_pancake_coil() inputs; `tolerances` maps TOLERANCE_FIELDS to
+    (distribution, tolerance) with the tolerance in the input's unit. The turn count is
+    fixed at the nominal design's (that is what gets wound), so thicker foil eats into the
+    slack and may no longer fit. Only StreamingHistograms and counters are kept, so memory
+    is flat in `samples`. The first chunk sets each histogram's range, with half its span
+    of margin on both sides.
+    """
+    unknown = set(tolerances) - set(TOLERANCE_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot tolerance: {', '.join(sorted(unknown))}")
+    t0 = time.perf_counter()
+    nominal = optimize_pancake_coil(**design)
+    inputs = {k: v for k, v in design.items() if k != "turn_model"}
+    inputs.update(constraint_mode=2, target_turns_per_pancake=nominal['turns_per_pancake'])
+    turn_model = design.get("turn_model", "mlt")
+
+    rng = np.random.default_rng(seed)
+    stats = {}
+    n = fit_failures = invalid = 0
+    while n < samples:
+        size = min(chunk_size, samples - n)
+        drawn = {k: np.maximum(_draw(rng, kind, design[k], tol, size), 1e-9) for k, (kind, tol) in tolerances.items()}
+        res = optimize_pancake_coil_batch(turn_model=turn_model, **{**inputs, **drawn})
+        valid = res['valid']
+        invalid += int(size - valid.sum())
+        fit_failures += int((valid & ~res['fits_window']).sum())
+        for k in fields:
+            values = res[k][valid]
+            if k not in stats:
+                lo, hi = (values.min(), values.max()) if values.size else (nominal[k], nominal[k])
+                margin = 0.5 * (hi - lo)
+                stats[k] = StreamingHistogram(lo - margin, hi + margin, bins)
+            stats[k].add(values)
+        n += size
+
+    return {
+        "nominal": nominal,
+        "samples": n,
+        "fit_failure_p": fit_failures / n,
+        "invalid_p": invalid / n,
+        "stats": stats,
+        "seconds": time.perf_counter() - t0,
+    }
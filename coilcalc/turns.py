@@ -0,0 +1,61 @@
+"""Per-turn spiral model: the length, resistance and voltage of every turn of an Archimedean pancake."""
+import numpy as np
+
+from coilcalc.core import rho, spiral_arc_length_mm
+
+
+# ================= PER-TURN SPIRAL MODEL =================
+def spiral_turn_lengths_mm(winding_a_mm, layer_thickness_mm, turns_per_pancake, max_turns=None):
+    """Length (mm) of every turn of one or many spiral pancakes.
+
+    Arguments broadcast over designs; the result has one extra trailing axis of
+    `max_turns` (default: the largest turn count) with NaN past each design's last turn,
+    so whole sweeps are handled in one vectorized call. Turn k runs from the spiral
+    centerline at k pitches to k + 1 pitches, so the lengths sum to the spiral total.
+    """
+    winding_a_mm, layer_thickness_mm, turns_per_pancake = np.broadcast_arrays(
+        np.asarray(winding_a_mm, dtype=float), np.asarray(layer_thickness_mm, dtype=float),
+        np.asarray(turns_per_pancake, dtype=np.int64))
+    if max_turns is None:
+        max_turns = int(turns_per_pancake.max(initial=0))
+    k = np.arange(max_turns + 1)
+
+    # Cumulative arc length at every turn boundary, then first differences
+    edges = spiral_arc_length_mm(winding_a_mm[..., None], layer_thickness_mm[..., None], k)
+    lengths = np.diff(edges, axis=-1)
+    return np.where(k[1:] <= turns_per_pancake[..., None], lengths, np.nan)
+
+
+def turn_table(winding_a_mm, t_cu_mm, t_mylar_mm, w_cu_mm, turns_per_pancake, num_pancakes, I_const):
+    """Per-turn radius, length, resistance and cumulative voltage for every pancake of a design.
+
+    Every array has shape (num_pancakes, turns_per_pancake) in geometric order: row p is
+    pancake p from the bottom of the stack, column k the k-th turn from the inside. The
+    pancakes are in series with alternating winding direction (even pancakes inside-out,
+    odd ones outside-in, as in double pancakes), and `V_cum_V` is the voltage from the
+    coil's input lead to the end of each turn along that path.
+    """
+    layer_thickness_mm = t_cu_mm + t_mylar_mm
+    N = int(turns_per_pancake)
+    k = np.arange(N)
+
+    radius_mm = winding_a_mm + (k + 0.5) * layer_thickness_mm
+    length_m = spiral_turn_lengths_mm(winding_a_mm, layer_thickness_mm, N) / 1000.0
+    R_ohm = rho * length_m / ((t_cu_mm / 1000.0) * (w_cu_mm / 1000.0))
+
+    # Walk the conductor path, then flip the outside-in pancakes back to geometric order
+    outside_in = (np.arange(num_pancakes) % 2 == 1)[:, None]
+    R_path = np.where(outside_in, R_ohm[::-1], R_ohm)
+    V_path = I_const * np.cumsum(R_path.ravel()).reshape(num_pancakes, N)
+    V_cum_V = np.where(outside_in, V_path[:, ::-1], V_path)
+
+    shape = (num_pancakes, N)
+    return {
+        "pancake": np.broadcast_to(np.arange(num_pancakes)[:, None], shape),
+        "turn": np.broadcast_to(k, shape),
+        "radius_mm": np.broadcast_to(radius_mm, shape),
+        "length_m": np.broadcast_to(length_m, shape),
+        "R_ohm": np.broadcast_to(R_ohm, shape),
+        "V_turn_V": np.broadcast_to(I_const * R_ohm, shape),
+        "V_cum_V": V_cum_V,
+    }
@@ -0,0 +1 @@
+# Lets `pytest` import coilcalc from the checkout without installing it.
@@ -0,0 +1,62 @@
+"""The batch engine against the scalar optimize_pancake_coil() it vectorizes."""
+import numpy as np
+import pytest
+
+from coilcalc.batch import optimize_pancake_coil_batch
+from coilcalc.core import DEFAULT_INPUTS, DesignError, optimize_pancake_coil
+
+DESIGNS = [
+    {},
+    {"constraint_mode": 1},
+    {"num_pancakes": 4, "cooling_plates_mm": [5.0] * 5, "t_cu_mm": 0.5, "I_const": 120.0},
+    {"constraint_mode": 1, "b_max_mm": 80.0, "t_mylar_mm": 0.05, "fiberglass_layers": 3},
+    {"target_turns_per_pancake": 10_000},       # more turns than fit: still built, fits_window False
+    {"MLT_input_m": 1.2},
+    {"w_mylar_mm": 10.0},                       # mylar narrower than copper
+    {"constraint_mode": 1, "b_max_mm": 50.6},  # no room for a single turn
+    {"t_cu_mm": 0.0},
+    {"constraint_mode": 1, "t_cu_mm": 0.0, "t_mylar_mm": 0.0},
+    {"w_cu_mm": -1.0},
+    {"num_pancakes": 0},
+]
+
+
+def _columns(rows):
+    columns = {k: np.array([r[k] for r in rows]) for k in DEFAULT_INPUTS if k != "cooling_plates_mm"}
+    columns["plates_axial_mm"] = np.array([sum(r["cooling_plates_mm"]) for r in rows])
+    return columns
+
+
+@pytest.mark.parametrize("turn_model", ["mlt", "spiral"])
+def test_batch_matches_scalar(turn_model):
+    rows = [{**DEFAULT_INPUTS, **d} for d in DESIGNS]
+    batch = optimize_pancake_coil_batch(turn_model, **_columns(rows))
+    rejected = 0
+    for i, row in enumerate(rows):
+        try:
+            ref = optimize_pancake_coil(**row, turn_model=turn_model)
+        except DesignError:
+            assert not batch["valid"][i]
+            rejected += 1
+            continue
+        assert batch["valid"][i]
+        for k, v in ref.items():
+            if isinstance(v, str):
+                assert batch[k][i] == v, k
+            else:
+                assert batch[k][i] == pytest.approx(v, rel=1e-12, abs=1e-12), k
+    assert rejected == 6
+
+
+def test_spiral_differs_from_mlt_only_for_circular_coils():
+    mlt = optimize_pancake_coil(**DEFAULT_INPUTS)
+    spiral = optimize_pancake_coil(**DEFAULT_INPUTS, turn_model="spiral")
+    assert spiral["R"] != mlt["R"]
+    assert spiral["R"] == pytest.approx(mlt["R"], rel=1e-3)
+    fixed = {**DEFAULT_INPUTS, "MLT_input_m": 1.2}
+    assert optimize_pancake_coil(**fixed, turn_model="spiral")["R"] == optimize_pancake_coil(**fixed)["R"]
+
+
+def test_unknown_turn_model():
+    with pytest.raises(ValueError):
+        optimize_pancake_coil_batch("helix", t_cu_mm=[0.3, 0.4])
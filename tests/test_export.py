@@ -0,0 +1,68 @@
+"""Chunked table export: every format reads back what was written."""
+import io
+
+import numpy as np
+import pytest
+
+from coilcalc.export import FORMATS, TableWriter, download_type, export_bytes, format_of, iter_chunks, open_table, write_table
+
+
+def _columns(n=2500):
+    rng = np.random.default_rng(0)
+    labels = np.array(["Turns Constrained", "Space Constrained (Max Turns)", "Circular, spiral"], dtype=object)
+    shape = labels[np.minimum(np.arange(n) // 1000, 2)]          # a new label only shows up in a later chunk
+    return {
+        "t_cu_mm": rng.uniform(0.1, 1.0, n),
+        "num_pancakes": rng.integers(1, 8, n),
+        "fits_window": rng.random(n) < 0.5,
+        "shape_type": shape,
+    }
+
+
+def _assert_same(table, columns):
+    df = table.to_pandas()
+    assert list(df.columns) == list(columns)
+    np.testing.assert_array_equal(df["t_cu_mm"].to_numpy(), columns["t_cu_mm"])
+    np.testing.assert_array_equal(df["num_pancakes"].to_numpy(), columns["num_pancakes"])
+    np.testing.assert_array_equal(df["fits_window"].to_numpy(dtype=bool), columns["fits_window"])
+    np.testing.assert_array_equal(df["shape_type"].astype(str).to_numpy(), columns["shape_type"].astype(str))
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow", ".csv", ".csv.gz"])
+def test_round_trip(tmp_path, suffix):
+    columns = _columns()
+    path = str(tmp_path / ("results" + suffix))
+    assert write_table(path, iter_chunks(columns, 1000)) == 2500
+    _assert_same(open_table(path), columns)
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def test_export_bytes_round_trip(tmp_path, fmt):
+    columns = _columns(300)
+    data, suffix, mime = export_bytes(iter_chunks(columns, 128), fmt)
+    assert (suffix, mime) == download_type(fmt)
+    path = tmp_path / ("download" + suffix)
+    path.write_bytes(data)
+    _assert_same(open_table(str(path)), columns)
+
+
+def test_open_table_selects_columns(tmp_path):
+    path = str(tmp_path / "results.arrow")
+    write_table(path, _columns())
+    assert open_table(path, columns=["num_pancakes"]).column_names == ["num_pancakes"]
+
+
+def test_format_of():
+    assert format_of("a/b.PARQUET") == "parquet"
+    assert format_of("x.feather") == "arrow"
+    assert format_of("x.csv.gz") == "csv"
+    assert format_of("-") == "csv"
+    with pytest.raises(ValueError):
+        format_of("results.xlsx")
+
+
+def test_file_object_needs_a_format():
+    with pytest.raises(ValueError):
+        TableWriter(io.BytesIO())
+    with pytest.raises(ValueError):
+        TableWriter(io.BytesIO(), fmt="xlsx")
@@ -0,0 +1,55 @@
+"""Bound-pruned Pareto search against a brute-force front."""
+import numpy as np
+import pytest
+
+from coilcalc.batch import optimize_pancake_coil_batch
+from coilcalc.core import DEFAULT_INPUTS
+from coilcalc.pareto import _objective_matrix, nondominated_mask, pareto_front
+
+GRID = dict(t_cu_mm=np.linspace(0.1, 1.0, 7), w_cu_mm=np.linspace(10.0, 60.0, 17), t_mylar_mm=np.linspace(0.025, 0.2, 4),
+            num_pancakes=np.arange(1, 6), plate_od_mm=np.linspace(150.0, 400.0, 8))
+
+
+def _brute_force(turn_model="mlt", **fixed):
+    t_cu, w_cu, t_mylar, pancakes, od = (g.ravel() for g in np.meshgrid(*GRID.values(), indexing="ij"))
+    inputs = {**DEFAULT_INPUTS, **fixed}
+    inputs.pop("cooling_plates_mm")
+    inputs.update(constraint_mode=1, t_cu_mm=t_cu, w_cu_mm=w_cu, t_mylar_mm=t_mylar, w_mylar_mm=w_cu + 0.7,
+                  num_pancakes=pancakes, b_max_mm=od / 2.0, plates_axial_mm=(pancakes + 1) * 6.0)
+    res = optimize_pancake_coil_batch(turn_model, **inputs)
+    obj = _objective_matrix(res)[res["valid"]]
+    return obj[nondominated_mask(obj)]
+
+
+def _sorted(obj):
+    return obj[np.lexsort(obj.T[::-1])]
+
+
+@pytest.mark.parametrize("turn_model, fixed", [("mlt", {}), ("spiral", {}), ("mlt", {"MLT_input_m": 1.5, "I_const": 80.0})])
+def test_front_matches_brute_force_and_prunes(turn_model, fixed):
+    front, stats = pareto_front(**GRID, turn_model=turn_model, **fixed)
+    assert stats["candidates"] == 7 * 17 * 4 * 5 * 8
+    assert stats["blocks_pruned"] > 0
+    assert stats["evaluated"] < stats["candidates"]
+    assert stats["front_size"] == len(front["NI"])
+    np.testing.assert_array_equal(_sorted(_objective_matrix(front)), _sorted(_brute_force(turn_model, **fixed)))
+    assert np.all(np.diff(front["NI"]) <= 0)
+
+
+def test_non_positive_widths_are_skipped():
+    grid = {**GRID, "w_cu_mm": np.r_[0.0, GRID["w_cu_mm"]]}
+    front, stats = pareto_front(**grid)
+    assert stats["candidates"] == 7 * 18 * 4 * 5 * 8
+    np.testing.assert_array_equal(_sorted(_objective_matrix(front)), _sorted(_brute_force()))
+    _, stats = pareto_front(**{**GRID, "w_cu_mm": [0.0]})
+    assert stats["front_size"] == 0 and stats["evaluated"] == 0
+
+
+@pytest.mark.parametrize("k", [3, 4])
+def test_nondominated_mask_matches_pairwise_check(k):
+    obj = np.random.default_rng(k).integers(0, 12, size=(400, k)).astype(float)
+    keep = nondominated_mask(obj)
+    dominated = np.array([np.any(np.all(obj <= row, axis=1) & np.any(obj < row, axis=1)) for row in obj])
+    # Every non-dominated objective vector appears exactly once
+    assert {tuple(r) for r in obj[keep]} == {tuple(r) for r in obj[~dominated]}
+    assert keep.sum() == len({tuple(r) for r in obj[~dominated]})
@@ -0,0 +1,45 @@
+"""Compact cross-section schematics: document size independent of the stack height."""
+import pytest
+
+from coilcalc.core import DEFAULT_INPUTS, optimize_pancake_coil, stack_layers
+from coilcalc.schematic import _stack_runs, generate_cross_section_svg
+
+
+def _svg(num_pancakes, plates, **kwargs):
+    d = {**DEFAULT_INPUTS, "num_pancakes": num_pancakes, "cooling_plates_mm": plates}
+    res = optimize_pancake_coil(**d)
+    return generate_cross_section_svg(res, d["a_mm"], d["b_max_mm"], "Diameter", d["plate_margin_mm"], plates, num_pancakes,
+                                      **kwargs)
+
+
+def _alternating(n):
+    return [6.0 if i % 2 == 0 else 4.0 for i in range(n + 1)]
+
+
+def test_alternating_plates_form_one_run():
+    res = optimize_pancake_coil(**{**DEFAULT_INPUTS, "num_pancakes": 40, "cooling_plates_mm": _alternating(40)})
+    runs, top_plate = _stack_runs(stack_layers(res, _alternating(40), 40))
+    assert runs == [((6.0, 4.0), 0.0, 20)]
+    assert top_plate[1] == 6.0
+
+
+def test_runs_cover_every_pancake():
+    plates = [6.0, 4.0, 4.0] * 5 + [5.0, 2.0]
+    res = optimize_pancake_coil(**{**DEFAULT_INPUTS, "num_pancakes": 20, "cooling_plates_mm": plates})
+    runs, top_plate = _stack_runs(stack_layers(res, plates, 20))
+    assert sum(len(tile) * count for tile, _, count in runs) == 20
+    assert runs[0] == ((6.0, 4.0, 4.0), 0.0, 5)
+    assert top_plate is None
+
+
+@pytest.mark.parametrize("plates", [_alternating, lambda n: [6.0] * (n + 1), lambda n: [6.0, 4.0, 5.0]])
+def test_compact_size_does_not_grow_with_the_stack(plates):
+    sizes = [len(_svg(n, plates(n), mode="compact", show_turns=True)) for n in (20, 200, 2000)]
+    assert max(sizes) < 1.5 * min(sizes)
+    assert max(sizes) < 8_000
+
+
+def test_turn_caption():
+    svg = _svg(2, [6.0, 6.0, 6.0], show_turns=True)
+    assert "turn lines: every 2 turns" in svg
+    assert "th turn" not in svg
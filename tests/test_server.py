@@ -0,0 +1,140 @@
+"""HTTP API: results match the engine, bad requests get the right 4xx."""
+import http.client
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from coilcalc.core import DEFAULT_INPUTS, DesignError, optimize_pancake_coil
+from coilcalc.server import BATCH_MIN, Client, LocalServer, evaluate_designs
+
+
+@pytest.fixture(scope="module")
+def server():
+    with LocalServer(workers=1) as srv:
+        yield srv
+
+
+@pytest.fixture
+def client(server):
+    with Client(server.url) as c:
+        yield c
+
+
+def _strict(token):
+    raise ValueError(f"{token} is not JSON")
+
+
+def _raw(server, method, path, body=None):
+    host, port = server.url.split("//")[1].split(":")
+    conn = http.client.HTTPConnection(host, int(port), timeout=30)
+    try:
+        conn.request(method, path, body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read(), parse_constant=_strict)
+    finally:
+        conn.close()
+
+
+def test_design_matches_engine(client):
+    res = client.design(turn_model="spiral", I_const=80.0, num_pancakes=3, cooling_plates_mm=[5.0] * 4)
+    ref = optimize_pancake_coil(**{**DEFAULT_INPUTS, "I_const": 80.0, "num_pancakes": 3, "cooling_plates_mm": [5.0] * 4},
+                                turn_model="spiral")
+    for k, v in ref.items():
+        assert res[k] == (v if isinstance(v, str) else pytest.approx(v, rel=1e-12)), k
+
+
+def test_design_error_is_422(client, server):
+    with pytest.raises(DesignError):
+        client.design(w_mylar_mm=10.0)
+    status, body = _raw(server, "POST", "/design", json.dumps({"w_mylar_mm": 10.0}))
+    assert status == 422 and "Mylar width" in body["error"]
+
+
+def test_designs_report_errors_per_design(client):
+    results = client.designs([{"I_const": 10.0}, {"w_mylar_mm": 1.0}])
+    assert "R" in results[0] and "error" in results[1]
+
+
+@pytest.mark.parametrize("method, path, body, status", [
+    ("POST", "/design", json.dumps({"foo": 1}), 400),                      # unknown input
+    ("POST", "/design", json.dumps({"I_const": "lots"}), 400),             # not a number
+    ("POST", "/design", json.dumps({"I_const": float("inf")}), 400),       # not finite
+    ("POST", "/design", json.dumps({"turn_model": "helix"}), 400),
+    ("POST", "/design", json.dumps({"t_cu_mm": 0}), 400),                  # would divide by zero
+    ("POST", "/design", json.dumps({"num_pancakes": 0}), 400),
+    ("POST", "/design", json.dumps({"cooling_plates_mm": [6.0, 0.0]}), 400),
+    ("POST", "/designs", json.dumps({"designs": [{}, {"w_cu_mm": -1}]}), 400),
+    ("POST", "/design", "{not json", 400),
+    ("POST", "/designs", json.dumps({"designs": 3}), 400),
+    ("POST", "/sweep", json.dumps({"columns": {"t_cu_mm": [0.3, 0.4]}, "grid": {"I_const": [1, 2, 3]}}), 400),
+    ("POST", "/sweep", json.dumps({"format": "xlsx"}), 400),
+    ("POST", "/field", json.dumps({"grid_n": 1}), 400),
+    ("POST", "/nowhere", "{}", 404),
+    ("GET", "/design", None, 405),
+    ("POST", "/health", "{}", 405),
+])
+def test_bad_requests(server, method, path, body, status):
+    got, result = _raw(server, method, path, body)
+    assert got == status
+    assert result["error"]
+
+
+def test_oversize_sweep_is_rejected_before_building_it(server):
+    grid = {k: list(range(1000)) for k in ("t_cu_mm", "w_cu_mm", "I_const")}    # 1e9 rows
+    status, result = _raw(server, "POST", "/sweep", json.dumps({"grid": grid}))
+    assert status == 413 and "1,000,000,000 rows" in result["error"]
+
+
+def test_sweep_grid_times_columns(client):
+    sweep = client.sweep(grid={"t_cu_mm": [0.2, 0.3, 0.4], "num_pancakes": [1, 2]}, columns={"I_const": 40.0})
+    assert sweep["rows"] == 6
+    assert sweep["columns"]["I_const"] == [40.0] * 6
+
+
+def _failing_engine(monkeypatch):
+    """Makes the engine raise a non-DesignError for I_const == 13 and the batch engine always raise."""
+    import coilcalc.server as server_module
+
+    def engine(**design):
+        if design["I_const"] == 13.0:
+            raise ZeroDivisionError("boom")
+        return optimize_pancake_coil(**design)
+
+    def batch(*args, **kwargs):
+        raise MemoryError
+
+    monkeypatch.setattr(server_module, "optimize_pancake_coil", engine)
+    monkeypatch.setattr(server_module, "optimize_pancake_coil_batch", batch)
+
+
+def test_scalar_path_isolates_failures(monkeypatch):
+    _failing_engine(monkeypatch)
+    results = evaluate_designs("mlt", [{"I_const": 50.0}, {"I_const": 13.0}, {"I_const": 60.0}])
+    assert isinstance(results[1], ZeroDivisionError)
+    assert "R" in results[0] and "R" in results[2]
+
+
+def test_failed_batch_falls_back_to_single_designs(monkeypatch, server):
+    _failing_engine(monkeypatch)
+    designs = [{"I_const": 13.0 if i == 1 else 50.0} for i in range(2 * BATCH_MIN)]
+    status, body = _raw(server, "POST", "/designs", json.dumps({"designs": designs}))
+    assert status == 500 and "ZeroDivisionError" in body["error"]     # /designs reports its own failure
+    status, body = _raw(server, "POST", "/designs", json.dumps({"designs": designs[2:]}))
+    assert status == 200 and all(r["R"] > 0 for r in body["results"])
+
+def test_concurrent_designs_with_a_bad_one(server):
+    bodies = [{"I_const": 10.0 + i} for i in range(40)] + [{"t_cu_mm": 0.0}, {"w_mylar_mm": 1.0}]
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(lambda b: _raw(server, "POST", "/design", json.dumps(b)), bodies))
+    assert all(status == 200 and body["R"] > 0 for status, body in results[:40])
+    assert [status for status, _ in results[40:]] == [400, 422]
+
+
+def test_non_finite_results_are_null(server):
+    # dT_water is range-checked for single designs, but sweeps report every row
+    columns = {"t_cu_mm": [0.3, 0.0], "dT_water": [10.0, 10.0]}
+    status, body = _raw(server, "POST", "/sweep", json.dumps({"columns": columns}))
+    assert status == 200
+    assert body["columns"]["valid"] == [True, False]
+    assert body["columns"]["R"][1] is None and body["columns"]["R"][0] > 0
@@ -0,0 +1,70 @@
+"""Result store: round trips through optimize_cached/evaluate_cached, LRU eviction, browsing."""
+import numpy as np
+import pytest
+
+from coilcalc.core import DEFAULT_INPUTS, DesignError, RESULT_FIELDS, optimize_pancake_coil
+from coilcalc.store import ResultStore, canonical_inputs, design_keys, evaluate_cached, optimize_cached
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultStore(str(tmp_path / "results.sqlite")) as s:
+        yield s
+
+
+def test_optimize_cached_round_trip(store):
+    design = {**DEFAULT_INPUTS, "I_const": 75.0, "turn_model": "spiral"}
+    ref = optimize_pancake_coil(**design)
+    first = optimize_cached(store, **design)
+    second = optimize_cached(store, **design)
+    assert store.hits == 1
+    for res in (first, second):
+        assert set(res) == set(ref)
+        for k, v in ref.items():
+            assert res[k] == (v if isinstance(v, str) else pytest.approx(v, rel=1e-15)), k
+    # Same design under the other turn model is a different entry
+    optimize_cached(store, **{**design, "turn_model": "mlt"})
+    assert store.stats()["designs"] == 2
+
+
+def test_optimize_cached_raises_without_storing(store):
+    with pytest.raises(DesignError):
+        optimize_cached(store, **{**DEFAULT_INPUTS, "w_mylar_mm": 10.0})
+    assert store.stats()["designs"] == 0
+
+
+def test_evaluate_cached_only_computes_misses(store):
+    t_cu = np.linspace(0.2, 0.6, 400)
+    first = evaluate_cached(store, t_cu_mm=t_cu[:300])
+    assert not first["cached"].any()
+    both = evaluate_cached(store, t_cu_mm=t_cu)
+    assert both["cached"][:300].all() and not both["cached"][300:].any()
+    fresh = evaluate_cached(ResultStore(":memory:"), t_cu_mm=t_cu)
+    for k in RESULT_FIELDS:
+        np.testing.assert_array_equal(both[k], fresh[k])
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    with ResultStore(str(tmp_path / "small.sqlite"), max_bytes=256 << 10) as store:
+        early = np.linspace(0.2, 0.3, 200)
+        evaluate_cached(store, t_cu_mm=early)
+        touched = design_keys(canonical_inputs(t_cu_mm=early[-1:]))
+        assert store.get_many(*touched)[0].all()          # now newer than the rest of `early`
+        inserted = early.size
+        while store.stats()["designs"] == inserted:
+            evaluate_cached(store, t_cu_mm=np.linspace(1.0, 2.0, 100) + inserted)
+            inserted += 100
+        assert store.get_many(*touched)[0].all()
+        early_hits = store.get_many(*design_keys(canonical_inputs(t_cu_mm=early)))[0]
+        assert not early_hits[0] and early_hits.sum() < early.size
+
+
+def test_iter_columns_allows_store_calls_between_chunks(store):
+    evaluate_cached(store, t_cu_mm=np.linspace(0.2, 0.6, 2500))
+    rows = 0
+    for chunk in store.iter_columns(chunk_size=1000):
+        # A store call from the consumer must not wait on the iterator's lock
+        store.get_many(chunk["key"][:1], np.zeros(1, dtype=np.int64))
+        assert np.all(np.diff(chunk["key"]) > 0)
+        rows += chunk["key"].size
+    assert rows == 2500
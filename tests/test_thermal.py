@@ -0,0 +1,74 @@
+"""Electro-thermal closed form and the finite-volume stack model."""
+import numpy as np
+import pytest
+
+from coilcalc.core import DEFAULT_INPUTS, DesignError, optimize_pancake_coil
+from coilcalc.electrothermal import T_ref_C, alpha_cu, electrothermal_batch, lumped_theta, solve_winding_temperature
+
+
+def test_closed_form_satisfies_heat_balance():
+    R20 = np.array([0.05, 0.2, 0.2, 1.0])
+    I = np.array([50.0, 100.0, 10.0, 0.0])
+    T, runaway = solve_winding_temperature(R20, I, 30.0, 0.02)
+    assert not runaway.any()
+    balance = 30.0 + 0.02 * I**2 * R20 * (1.0 + alpha_cu * (T - T_ref_C))
+    np.testing.assert_allclose(T, balance, rtol=1e-13)
+    assert T[3] == 30.0
+
+
+def test_runaway_where_the_loop_gain_reaches_one():
+    theta, R20 = 0.02, 0.2
+    I_crit = np.sqrt(1.0 / (theta * R20 * alpha_cu))
+    T, runaway = solve_winding_temperature(R20, [0.99 * I_crit, I_crit, 2 * I_crit], 25.0, theta)
+    np.testing.assert_array_equal(runaway, [False, True, True])
+    assert np.isfinite(T[0]) and np.isinf(T[1:]).all()
+
+
+def test_scalar_inputs_give_0d_results():
+    T, runaway = solve_winding_temperature(0.2, 100.0, 30.0, 0.02)
+    assert np.ndim(T) == 0 and not runaway
+    assert float(T) > 30.0
+
+
+def test_electrothermal_batch_is_self_consistent():
+    hot = electrothermal_batch(T_water_in_C=20.0, I_const=np.array([50.0, 150.0]))
+    np.testing.assert_allclose(hot["R"], hot["R20"] * (1.0 + alpha_cu * (hot["T_winding_C"] - T_ref_C)))
+    np.testing.assert_allclose(hot["P"], np.array([50.0, 150.0])**2 * hot["R"])
+    assert (hot["R"] > hot["R20"]).all()
+
+
+@pytest.fixture(scope="module")
+def model():
+    pytest.importorskip("scipy")
+    from coilcalc.thermal import StackThermalModel
+    d = DEFAULT_INPUTS
+    res = optimize_pancake_coil(**d)
+    return res, StackThermalModel(res, d["a_mm"], d["b_max_mm"], d["plate_margin_mm"], d["cooling_plates_mm"],
+                                  d["num_pancakes"], d["t_cu_mm"], d["t_mylar_mm"], target_cells=20_000)
+
+
+def test_stack_model_is_linear_in_power(model):
+    res, m = model
+    assert m.theta_peak >= m.theta_mean > 0
+    np.testing.assert_allclose(m.temperature(2 * res["P"], 25.0) - 25.0, 2 * (m.temperature(res["P"], 25.0) - 25.0))
+    q = np.where(m.material == 3, m.cell_volume_m3, 0.0)
+    np.testing.assert_allclose(m.solve(3 * q / q.sum()), 3 * m.unit_rise, rtol=1e-10)
+
+
+def test_stack_model_agrees_with_lumped_estimate(model):
+    res, m = model
+    d = DEFAULT_INPUTS
+    theta = lumped_theta(res["winding_a_mm"], res["winding_b_actual_mm"], d["num_pancakes"], d["w_cu_mm"], d["t_cu_mm"],
+                         d["t_mylar_mm"], d["t_fiberglass_mm"], d["fiberglass_layers"])
+    # Same physics, the lumped one without radial spreading: within a factor of two
+    assert 0.5 < m.theta_mean / theta < 2.0
+
+
+def test_stack_model_rejects_zero_thickness_plates():
+    pytest.importorskip("scipy")
+    from coilcalc.thermal import StackThermalModel
+    d = DEFAULT_INPUTS
+    res = optimize_pancake_coil(**d)
+    with pytest.raises(DesignError):
+        StackThermalModel(res, d["a_mm"], d["b_max_mm"], d["plate_margin_mm"], [6.0, 0.0, 6.0], d["num_pancakes"],
+                          d["t_cu_mm"], d["t_mylar_mm"])
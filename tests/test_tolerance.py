@@ -0,0 +1,25 @@
+"""Streaming statistics for the Monte Carlo tolerance analysis."""
+import numpy as np
+
+from coilcalc.tolerance import StreamingHistogram
+
+
+def test_std_stays_accurate_for_a_narrow_spread_at_a_large_value():
+    rng = np.random.default_rng(1)
+    values = 1e9 + rng.normal(0.0, 1e-3, 300_000)
+    h = StreamingHistogram(1e9 - 1.0, 1e9 + 1.0)
+    for chunk in np.array_split(values, 7):
+        h.add(chunk)
+    assert h.n == values.size
+    np.testing.assert_allclose(h.mean, values.mean(), rtol=1e-15)
+    # sum(x^2) - n mean^2 would cancel every digit here; float64 spacing at 1e9 limits us to ~1e-7
+    np.testing.assert_allclose(h.std, values.std(ddof=1), rtol=1e-5)
+
+
+def test_quantiles_and_out_of_range_values():
+    h = StreamingHistogram(0.0, 1.0, bins=1000)
+    h.add(np.linspace(0.0, 1.0, 100_001, endpoint=False))
+    h.add([-1.0, 2.0, np.nan])
+    assert (h.underflow, h.overflow, h.n) == (1, 1, 100_003)
+    assert (h.min, h.max) == (-1.0, 2.0)
+    np.testing.assert_allclose(h.quantile([0.25, 0.5, 0.75]), [0.25, 0.5, 0.75], atol=2e-3)
@@ -0,0 +1,22 @@
+"""Waveform loading for the transient simulation."""
+import io
+
+import numpy as np
+import pytest
+
+from coilcalc.transient import load_waveform
+
+
+@pytest.mark.parametrize("text", ["12.5\n20\n-3\n", "I_A\n12.5\n20\n-3\n", "I_A,t_s\n12.5,0\n20,1\n-3,2\n"])
+def test_csv_with_or_without_header(text):
+    for source in (io.StringIO(text), io.BytesIO(text.encode())):
+        np.testing.assert_array_equal(np.concatenate(list(load_waveform(source, chunk_size=2))), [12.5, 20.0, -3.0])
+
+
+def test_csv_and_npy_paths(tmp_path):
+    csv = tmp_path / "pulse.csv"
+    csv.write_text("1\n2\n3\n")
+    np.testing.assert_array_equal(np.concatenate(list(load_waveform(str(csv)))), [1.0, 2.0, 3.0])
+    npy = tmp_path / "pulse.npy"
+    np.save(npy, np.arange(5.0))
+    np.testing.assert_array_equal(np.concatenate(list(load_waveform(str(npy), chunk_size=2))), np.arange(5.0))